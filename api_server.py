@@ -0,0 +1,348 @@
+# HTTP API service - JSON endpoints for resume ingestion, question generation and HEARS feedback
+# Runs the same engine as the Streamlit app (FileProcessor, GeminiClient, scheduler, metrics).
+"""Async HTTP API for the interview engine.
+
+    GEMINI_BACKEND=offline python api_server.py --port 8600
+
+Endpoints (JSON in, JSON out):
+
+    GET  /health                          scheduler, breaker and router state
+    GET  /metrics                         Prometheus text format
+    POST /v1/resume                       multipart field "file", or the raw file body with ?filename=
+    POST /v1/questions                    {"resume_text", "job_details", "num_questions"}
+    POST /v1/feedback/individual          {"question", "answer", "job_details", "question_number"}
+    POST /v1/feedback/individual/batch    {"responses": [{"question", "answer"}], "job_details", "concurrency"}
+    POST /v1/feedback/overall             {"responses": [...], "job_details"}
+
+LLM calls go through the process-wide resilient caller and scheduler, so the
+rate limit and circuit breaker cover every request this process serves. A full
+queue answers 429 and an open circuit 503, both with Retry-After, rather than
+the fallback questions or unsuccessful feedback the app shows. Usage quotas
+apply per X-API-Key listed in API_KEYS / API_KEYS_FILE, or per client address
+for any other request; a used-up quota is a 429 too.
+"""
+
+import argparse
+import copy
+import hashlib
+import logging
+import os
+import tempfile
+import time
+from typing import AsyncIterator, Dict, Set
+
+from dotenv import load_dotenv
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.formparsers import MultiPartException, MultiPartParser
+from starlette.requests import Request
+from starlette.responses import JSONResponse, PlainTextResponse
+from starlette.routing import Route
+
+import metrics
+from file_processor import (MAX_UPLOAD_BYTES, SNIFF_BYTES, FileProcessor, SpooledUpload, UploadRejected,
+                            check_content)
+from gemini_client import GeminiClient
+from jd_analysis import get_default_jd_cache
+from llm_resilience import CircuitOpenError, get_default_caller
+from llm_scheduler import SchedulerBusyError, get_default_scheduler
+from metrics import track
+from model_router import get_default_router
+from usage_ledger import UsageQuotaError
+
+logger = logging.getLogger('api_server')
+
+SPOOL_BYTES = 1024 * 1024  # raw upload bodies past this spill to a temp file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024  # part headers and boundaries around the file in a multipart body
+MAX_QUESTIONS = 12
+
+
+class ApiError(Exception):
+    """Client error returned as {"error": message} with the given HTTP status."""
+
+    def __init__(self, message: str, status: int = 400):
+        super().__init__(message)
+        self.status = status
+
+
+_client = None
+_api_keys = None
+
+
+def get_client() -> GeminiClient:
+    global _client
+    if _client is None:
+        _client = GeminiClient(raise_errors=True)
+    return _client
+
+
+def key_hash(api_key: str) -> str:
+    return hashlib.sha256(api_key.encode()).hexdigest()[:16]
+
+
+def get_api_keys() -> Set[str]:
+    """Hashes of the accepted API keys: API_KEYS (comma-separated) plus API_KEYS_FILE (one per line)."""
+    global _api_keys
+    if _api_keys is None:
+        keys = os.getenv('API_KEYS', '').split(',')
+        if os.getenv('API_KEYS_FILE'):
+            with open(os.getenv('API_KEYS_FILE'), encoding='utf-8') as f:
+                keys += f.read().splitlines()
+        _api_keys = {key_hash(key.strip()) for key in keys if key.strip()}
+    return _api_keys
+
+
+def client_for(request: Request) -> GeminiClient:
+    """The shared client, accounted to this request's caller for usage quotas.
+
+    A configured X-API-Key identifies the caller (the ledger stores a hash,
+    not the key). Without one - or with a key that is not configured, so a
+    made-up key cannot buy a fresh quota - each client address gets the
+    anonymous quota.
+    """
+    client = copy.copy(get_client())
+    api_key = request.headers.get('x-api-key', '').strip()
+    if api_key and key_hash(api_key) in get_api_keys():
+        client.user_id = 'key:' + key_hash(api_key)
+        client.session_id = ''
+    else:
+        client.user_id = ''
+        client.session_id = 'ip:' + (request.client.host if request.client else 'unknown')
+    return client
+
+
+def endpoint(name: str):
+    """Wrap a handler: per-endpoint metrics and uniform JSON errors."""
+    def decorate(handler):
+        async def wrapped(request: Request):
+            try:
+                with track('api_request', endpoint=name):
+                    return JSONResponse(await handler(request))
+            except ApiError as e:
+                return JSONResponse({'error': str(e)}, status_code=e.status)
+            except SchedulerBusyError as e:
+                return JSONResponse({'error': str(e)}, status_code=429, headers={'Retry-After': '5'})
+            except CircuitOpenError as e:
+                retry_after = str(round(get_default_caller().breaker.open_seconds))
+                return JSONResponse({'error': str(e)}, status_code=503, headers={'Retry-After': retry_after})
+            except UsageQuotaError as e:  # daily quota: retrying today will not help, so no Retry-After
+                return JSONResponse({'error': str(e)}, status_code=429)
+            except Exception as e:
+                logger.exception("%s failed", name)
+                return JSONResponse({'error': f"internal error: {e}"}, status_code=500)
+        return wrapped
+    return decorate
+
+
+async def read_json(request: Request) -> Dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise ApiError("request body must be JSON")
+    if not isinstance(body, dict):
+        raise ApiError("request body must be a JSON object")
+    return body
+
+
+JSON_TYPES = {str: 'a string', int: 'an integer', dict: 'an object', list: 'an array'}
+
+
+def require(body: Dict, field: str, kind=str, default=None):
+    """Return body[field] if it is a `kind`; a field with a `default` may be omitted or null."""
+    value = body.get(field)
+    if value is None and default is not None:
+        return default
+    if value is None or (kind is str and default is None and isinstance(value, str) and not value.strip()):
+        raise ApiError(f"'{field}' is required")
+    if not isinstance(value, kind) or (kind is int and isinstance(value, bool)):
+        raise ApiError(f"'{field}' must be {JSON_TYPES[kind]}")
+    return value
+
+
+def read_responses(body: Dict):
+    responses = require(body, 'responses', list)
+    normalized = []
+    for i, r in enumerate(responses):
+        if not isinstance(r, dict):
+            raise ApiError(f"responses[{i}] needs a 'question' and an 'answer'")
+        try:
+            normalized.append({
+                'question': require(r, 'question'),
+                'answer': require(r, 'answer', default='') or '[Question Skipped]',
+                'question_number': require(r, 'question_number', int, default=i + 1),
+            })
+        except ApiError as e:
+            raise ApiError(f"responses[{i}]: {e}")
+    return normalized
+
+
+@endpoint('health')
+async def health(request: Request):
+    return {
+        'status': 'ok',
+        'backend': get_client().backend,
+        'scheduler': get_default_scheduler().snapshot(),
+        'llm': get_default_caller().snapshot(),
+        'routes': get_default_router().snapshot(),
+    }
+
+
+async def metrics_endpoint(request: Request):
+    return PlainTextResponse(metrics.REGISTRY.render_prometheus(), media_type='text/plain; version=0.0.4')
+
+
+def check_content_length(request: Request, limit: int):
+    """Refuse a declared body over `limit` before reading any of it."""
+    value = request.headers.get('content-length')
+    if not value:
+        return
+    try:
+        declared = int(value)
+    except ValueError:
+        raise ApiError("invalid Content-Length header")
+    if declared > limit:
+        raise ApiError("file exceeds the 10MB limit", status=413)
+
+
+async def limited_stream(request: Request, limit: int) -> AsyncIterator[bytes]:
+    """The request body, stopping with 413 as soon as more than `limit` bytes arrive."""
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise ApiError("file exceeds the 10MB limit", status=413)
+        yield chunk
+
+
+async def spool_body(request: Request, name: str) -> SpooledUpload:
+    """Stream a raw upload body to a spooled temp file, refusing bad content after the first bytes."""
+    check_content_length(request, MAX_UPLOAD_BYTES)
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES)
+    size, head = 0, b''
+    try:
+        async for chunk in limited_stream(request, MAX_UPLOAD_BYTES):
+            size += len(chunk)
+            if len(head) < SNIFF_BYTES:
+                head += chunk[:SNIFF_BYTES - len(head)]
+                if len(head) == SNIFF_BYTES:
+                    check_content(name, head)  # reject mislabeled files before reading the rest
+            spool.write(chunk)
+        spool.seek(0)
+    except BaseException:
+        spool.close()
+        raise
+    return SpooledUpload(spool, name, size)
+
+
+@endpoint('resume')
+async def resume(request: Request):
+    if request.headers.get('content-type', '').startswith('multipart/form-data'):
+        # The parser spools file parts to a SpooledTemporaryFile; the body is cut off past the limit
+        limit = MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        check_content_length(request, limit)
+        try:
+            form = await MultiPartParser(request.headers, limited_stream(request, limit),
+                                         max_files=1, max_fields=10).parse()
+        except MultiPartException as e:
+            raise ApiError(f"invalid multipart body: {e.message}")
+        upload = form.get('file')
+        if upload is None or not hasattr(upload, 'read'):
+            raise ApiError("multipart field 'file' is required")
+        name = upload.filename or ''
+        if not name:
+            raise ApiError("the uploaded file needs a name to detect the format")
+        if upload.size > MAX_UPLOAD_BYTES:
+            raise ApiError("file exceeds the 10MB limit", status=413)
+        spooled = SpooledUpload(upload.file, name, upload.size)
+    else:
+        name = request.query_params.get('filename', '')
+        if not name:
+            raise ApiError("a file name is needed to detect the format (?filename=resume.pdf)")
+        try:
+            spooled = await spool_body(request, name)
+        except UploadRejected as e:
+            raise ApiError(str(e), status=422)
+
+    # Parsing is CPU-bound; keep it off the event loop
+    try:
+        success, result = await run_in_threadpool(FileProcessor.process_resume_file, spooled)
+    finally:
+        spooled.close()
+    if not success:
+        raise ApiError(result, status=422)
+    return {'filename': name, 'chars': len(result), 'resume_text': result}
+
+
+@endpoint('questions')
+async def questions(request: Request):
+    body = await read_json(request)
+    resume_text = require(body, 'resume_text')
+    job_details = require(body, 'job_details', dict, default={})
+    num_questions = require(body, 'num_questions', int, default=3)
+    if not 1 <= num_questions <= MAX_QUESTIONS:
+        raise ApiError(f"'num_questions' must be an integer from 1 to {MAX_QUESTIONS}")
+    started = time.monotonic()
+    generated = await client_for(request).agenerate_questions(resume_text, job_details, num_questions)
+    return {'questions': generated, 'elapsed_seconds': round(time.monotonic() - started, 3)}
+
+
+@endpoint('individual_feedback')
+async def individual_feedback(request: Request):
+    body = await read_json(request)
+    return await client_for(request).agenerate_individual_feedback(
+        require(body, 'question'),
+        require(body, 'answer', default='') or '[Question Skipped]',
+        require(body, 'job_details', dict, default={}),
+        require(body, 'question_number', int, default=1),
+    )
+
+
+@endpoint('individual_feedback_batch')
+async def individual_feedback_batch(request: Request):
+    body = await read_json(request)
+    concurrency = require(body, 'concurrency', int, default=4)
+    if concurrency < 1:
+        raise ApiError("'concurrency' must be a positive integer")
+    results = await client_for(request).agenerate_all_individual_feedback(
+        read_responses(body), require(body, 'job_details', dict, default={}), concurrency)
+    return {'results': results}
+
+
+@endpoint('overall_feedback')
+async def overall_feedback(request: Request):
+    body = await read_json(request)
+    return await client_for(request).agenerate_overall_feedback(
+        read_responses(body), require(body, 'job_details', dict, default={}))
+
+
+def create_app() -> Starlette:
+    metrics.REGISTRY.register_collector('llm', get_default_caller().metric_samples)
+    metrics.REGISTRY.register_collector('jd_analysis', get_default_jd_cache().metric_samples)
+    return Starlette(routes=[
+        Route('/health', health, methods=['GET']),
+        Route('/metrics', metrics_endpoint, methods=['GET']),
+        Route('/v1/resume', resume, methods=['POST']),
+        Route('/v1/questions', questions, methods=['POST']),
+        Route('/v1/feedback/individual', individual_feedback, methods=['POST']),
+        Route('/v1/feedback/individual/batch', individual_feedback_batch, methods=['POST']),
+        Route('/v1/feedback/overall', overall_feedback, methods=['POST']),
+    ])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the interview engine over HTTP.")
+    parser.add_argument('--host', default=os.getenv('API_HOST', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=int(os.getenv('API_PORT', 8600)))
+    parser.add_argument('--log-level', default='warning')
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    load_dotenv()
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s %(levelname)s %(name)s %(message)s')
+    get_client()  # fail fast on a missing API key
+    uvicorn.run(create_app(), host=args.host, port=args.port, log_level=args.log_level)
+
+
+if __name__ == '__main__':
+    main()
@@ -2,21 +2,40 @@
 # Simple structure: Just app.py + main.css in root directory
 
 import streamlit as st
-import google.generativeai as genai
 import os
+import re
+import secrets
 import json
 import time
 import pandas as pd
 from typing import Dict, List, Optional
 from io import BytesIO
 import base64
+import tempfile
 from dotenv import load_dotenv
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from contextlib import contextmanager
+
+from gemini_client import GeminiClient, GeminiConfigError
+import cohort_analytics
+from history_store import HEARS_DIMENSIONS, get_default_history_store, normalize_user_id
+from jd_analysis import get_default_jd_cache
+from llm_resilience import get_default_caller
+from llm_scheduler import queue_status
+import metrics
+from metrics import track
+from session_model import FeedbackRecord, InterviewSession, InterviewTimer, QuestionResponse
+from session_memory import (get_registry, offload, offload_feedback, resolve, resolve_responses,
+                            touch_session)
+from usage_ledger import get_default_usage_ledger
 
 # File processing imports
-import PyPDF2
-from docx import Document
-import mammoth
+from bulk_prepare import BulkJob
+from file_processor import FileProcessor
+from report_builder import EXPORT_FORMATS, ReportBuilder
+from rerun_profiler import get_default_profiler, profile_rerun
+from streamlit.runtime.scriptrunner import RerunException, StopException, get_script_run_ctx
 
 # Load environment variables
 load_dotenv()
@@ -51,497 +70,50 @@ def load_css():
         </style>
         """, unsafe_allow_html=True)
 
-# Gemini API Configuration
-class GeminiClient:
-    def __init__(self):
-        api_key = os.getenv("GEMINI_API_KEY")
-        if not api_key:
-            st.error("❌ Gemini API key not found! Please set GEMINI_API_KEY in your environment.")
-            st.stop()
-        
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-pro')
-    
-    def generate_questions(self, resume_text: str, job_details: Dict, num_questions: int) -> List[str]:
-        """Generate behavioral interview questions based on resume and job details."""
-        prompt = f"""
-        You are an expert behavioral interviewer. Generate exactly {num_questions} behavioral interview questions based on the resume and job description provided.
-
-        RESUME CONTENT:
-        {resume_text}
-
-        JOB DETAILS:
-        - Title: {job_details.get('job_title', 'N/A')}
-        - Company: {job_details.get('company_name', 'N/A')}
-        - Description: {job_details.get('job_description', 'N/A')}
-        - Experience Level: {job_details.get('experience_years', 0)} years
-        - Interview Duration: {job_details.get('duration', 15)} minutes
-
-        REQUIREMENTS:
-        1. Generate exactly {num_questions} questions - no more, no less
-        2. Focus on HEARS method (Headline, Events, Actions, Results, Significance)
-        3. Tailor questions to candidate's background and job requirements
-        4. Include variety: leadership, problem-solving, conflict resolution, teamwork, adaptability, communication
-        5. Match difficulty to experience level and interview duration
-        6. Make questions specific and actionable
-        7. Ensure questions encourage detailed responses covering all HEARS elements
-
-        IMPORTANT: Return your response in this EXACT format as a valid JSON array:
-        ["Question 1 text here", "Question 2 text here", "Question 3 text here"]
-
-        Do not include any other text, explanations, or formatting. Just the JSON array with exactly {num_questions} questions.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            questions_text = response.text.strip()
-            
-            # Clean up the response text
-            questions_text = questions_text.strip()
-            
-            # Remove any markdown formatting if present
-            if questions_text.startswith('```'):
-                lines = questions_text.split('\n')
-                questions_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else questions_text
-            
-            # Try to extract JSON array
-            start_idx = questions_text.find('[')
-            end_idx = questions_text.rfind(']') + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                json_text = questions_text[start_idx:end_idx]
-                try:
-                    questions = json.loads(json_text)
-                    if isinstance(questions, list) and len(questions) >= num_questions:
-                        return questions[:num_questions]
-                    elif isinstance(questions, list):
-                        fallback = self._get_fallback_questions(num_questions - len(questions))
-                        return questions + fallback
-                except json.JSONDecodeError:
-                    pass
-            
-            # Enhanced fallback parsing
-            questions = []
-            lines = questions_text.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith('"') and line.endswith('",'):
-                    questions.append(line[1:-2])
-                elif line.startswith('"') and line.endswith('"'):
-                    questions.append(line[1:-1])
-                elif line.startswith('- '):
-                    questions.append(line[2:])
-                elif line.startswith(f'{len(questions)+1}.'):
-                    questions.append(line[len(f'{len(questions)+1}.'):].strip())
-            
-            if len(questions) < num_questions:
-                fallback_questions = self._get_fallback_questions(num_questions - len(questions))
-                questions.extend(fallback_questions)
-            
-            return questions[:num_questions]
-                
-        except Exception as e:
-            st.error(f"Error generating questions: {str(e)}")
-            return self._get_fallback_questions(num_questions)
-    
-    def generate_individual_feedback(self, question: str, answer: str, job_details: Dict, question_number: int) -> Dict:
-        """Generate HEARS feedback for individual question - FIXED VERSION."""
-        if not answer or answer.strip() == "" or answer == "[Question Skipped]":
-            return {
-                'question_number': question_number,
-                'success': False,
-                'feedback': "**Question was skipped** - No feedback available for skipped questions.",
-                'error': None
-            }
-        
-        prompt = f"""
-        Analyze this single interview question and answer using the HEARS methodology:
-
-        QUESTION: {question}
-        CANDIDATE'S ANSWER: {answer}
-        JOB CONTEXT: {job_details.get('job_title', 'N/A')} at {job_details.get('company_name', 'N/A')}
-
-        Provide comprehensive feedback in this EXACT format:
-
-        ## 🎯 HEARS Analysis for Question {question_number}
-
-        ### **H (Headline) - Situation Summary**
-        **Score: X/10**
-        **Analysis:** [Detailed analysis of how well they provided a clear situation summary]
-
-        ### **E (Events) - Challenges & Context**
-        **Score: X/10**
-        **Analysis:** [Detailed analysis of specific events/challenges described]
-
-        ### **A (Actions) - Detailed Actions Taken**
-        **Score: X/10**
-        **Analysis:** [Detailed analysis of the specific actions they took]
-
-        ### **R (Results) - Measurable Outcomes**
-        **Score: X/10**
-        **Analysis:** [Detailed analysis of measurable results and outcomes]
-
-        ### **S (Significance) - Skills & Learning**
-        **Score: X/10**
-        **Analysis:** [Detailed analysis of skills demonstrated and lessons learned]
-
-        ### **📊 Overall Assessment**
-        **Total HEARS Score: XX/50**
-        **Overall Rating: [Excellent/Good/Average/Needs Improvement]**
-
-        ### **✅ Key Strengths**
-        - [Specific strength 1 with example from their answer]
-        - [Specific strength 2 with example from their answer]
-        - [Specific strength 3 with example from their answer]
-
-        ### **🎯 Areas for Improvement**
-        - [Specific improvement area 1 with actionable suggestion]
-        - [Specific improvement area 2 with actionable suggestion]
-
-        ### **💡 Coaching Tips**
-        [2-3 specific, actionable tips for improving this type of response in future interviews]
-
-        IMPORTANT: Provide specific, detailed analysis with concrete examples from their answer. Be constructive and helpful.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            feedback_text = response.text.strip()
-            
-            if not feedback_text or len(feedback_text) < 50:
-                return {
-                    'question_number': question_number,
-                    'success': False,
-                    'feedback': "**Unable to generate detailed feedback** - Response too short or empty.",
-                    'error': "Empty or insufficient feedback generated"
-                }
-            
-            return {
-                'question_number': question_number,
-                'success': True,
-                'feedback': feedback_text,
-                'error': None
-            }
-            
-        except Exception as e:
-            error_msg = str(e)
-            return {
-                'question_number': question_number,
-                'success': False,
-                'feedback': f"**Unable to generate feedback due to technical error:**\n\n*Error: {error_msg}*\n\nPlease try again or contact support if this issue persists.",
-                'error': error_msg
-            }
-    
-    def generate_overall_feedback(self, all_responses: List, job_details: Dict) -> Dict:
-        """Generate comprehensive HEARS methodology feedback - FIXED VERSION."""
-        if not all_responses or len(all_responses) == 0:
-            return {
-                'success': False,
-                'feedback': "No interview responses available for analysis.",
-                'error': "Empty responses list"
-            }
-        
-        responses_text = "\n\n".join([
-            f"Q{i+1}: {response['question']}\nA{i+1}: {response['answer']}"
-            for i, response in enumerate(all_responses)
-        ])
-        
-        completed_questions = len([r for r in all_responses if r['answer'] != "[Question Skipped]"])
-        skipped_questions = len(all_responses) - completed_questions
-        
-        prompt = f"""
-        Analyze this complete behavioral interview using the HEARS methodology:
-
-        INTERVIEW RESPONSES: {responses_text}
-        JOB CONTEXT: {job_details}
-        INTERVIEW DURATION: {job_details.get('duration', 15)} minutes
-        TOTAL QUESTIONS: {len(all_responses)}
-        COMPLETED QUESTIONS: {completed_questions}
-        SKIPPED QUESTIONS: {skipped_questions}
-
-        Provide comprehensive feedback in this EXACT format:
-
-        # 🎯 COMPREHENSIVE INTERVIEW FEEDBACK REPORT
-
-        ## **📊 Interview Overview**
-        - **Position:** {job_details.get('job_title', 'N/A')}
-        - **Company:** {job_details.get('company_name', 'N/A')}
-        - **Questions Completed:** {completed_questions}/{len(all_responses)}
-        - **Interview Performance:** [Overall assessment]
-
-        ## **📰 HEADLINE ANALYSIS (H)**
-        **Score: X/10**
-        [Comprehensive analysis of situation summaries across all responses]
-        
-        **Key Observations:**
-        - [Specific observation 1]
-        - [Specific observation 2]
-        - [Specific observation 3]
-
-        ## **📅 EVENTS ANALYSIS (E)**  
-        **Score: X/10**
-        [Comprehensive analysis of challenges/contexts described]
-        
-        **Notable Examples:**
-        - **Strong Event Description:** [Quote from responses]
-        - **Area for Improvement:** [Specific suggestion]
-
-        ## **⚡ ACTIONS ANALYSIS (A)**
-        **Score: X/10**
-        [Comprehensive analysis of action descriptions]
-        
-        **Action Quality Assessment:**
-        - **Specific Actions:** [Analysis with examples]
-        - **Leadership Examples:** [Analysis]
-        - **Problem-Solving Approach:** [Analysis]
-
-        ## **🎊 RESULTS ANALYSIS (R)**
-        **Score: X/10**
-        [Analysis of measurable outcomes and impact]
-        
-        **Results Effectiveness:**
-        - **Quantified Results:** [Examples with numbers/metrics]
-        - **Impact Demonstration:** [Analysis]
-        - **Missing Metrics:** [Areas needing improvement]
-
-        ## **💡 SIGNIFICANCE ANALYSIS (S)**
-        **Score: X/10**
-        [Analysis of skills demonstrated and learning]
-        
-        **Skills Assessment:**
-        - **Leadership:** X/10 - [Analysis with examples]
-        - **Problem-Solving:** X/10 - [Analysis with examples]  
-        - **Communication:** X/10 - [Analysis with examples]
-        - **Teamwork:** X/10 - [Analysis with examples]
-        - **Adaptability:** X/10 - [Analysis with examples]
-
-        ## **📈 OVERALL ASSESSMENT**
-        **Total HEARS Score: XX/50**
-        **Interview Rating: [EXCELLENT/STRONG HIRE/HIRE/MAYBE/NEEDS IMPROVEMENT]**
-        **Time Management: [Analysis of how well they used interview time]**
-
-        ## **🌟 TOP STRENGTHS**
-        1. **[Strength Category]:** [Detailed analysis with specific examples from responses]
-        2. **[Strength Category]:** [Detailed analysis with specific examples from responses]
-        3. **[Strength Category]:** [Detailed analysis with specific examples from responses]
-
-        ## **🎯 PRIORITY DEVELOPMENT AREAS**
-        1. **[Development Area]:** [Specific, actionable improvement recommendations]
-        2. **[Development Area]:** [Specific, actionable improvement recommendations]
-        3. **[Development Area]:** [Specific, actionable improvement recommendations]
-
-        ## **🚀 ACTION PLAN FOR IMPROVEMENT**
-        ### **For Your Next Interview:**
-        - [Specific preparation tip 1]
-        - [Specific preparation tip 2]
-        - [Specific preparation tip 3]
-
-        ### **For Long-term Professional Development:**
-        - [Career development recommendation 1]
-        - [Career development recommendation 2]
-
-        ## **📋 HEARS METHOD MASTERY TIPS**
-        [Specific tips for better implementation of HEARS methodology based on this interview performance]
-
-        IMPORTANT: Provide specific, actionable feedback with concrete examples from their responses.
-        """
-        
-        try:
-            response = self.model.generate_content(prompt)
-            feedback_text = response.text.strip()
-            
-            if not feedback_text or len(feedback_text) < 100:
-                return {
-                    'success': False,
-                    'feedback': "Unable to generate comprehensive feedback - response too short.",
-                    'error': "Insufficient feedback generated"
-                }
-            
-            return {
-                'success': True,
-                'feedback': feedback_text,
-                'error': None
-            }
-            
-        except Exception as e:
-            error_msg = str(e)
-            return {
-                'success': False,
-                'feedback': f"**Technical Error Generating Overall Feedback:**\n\n*Error: {error_msg}*\n\nPlease try refreshing the page or contact support.",
-                'error': error_msg
-            }
-    
-    def _get_fallback_questions(self, num_questions: int) -> List[str]:
-        """Fallback questions if API fails."""
-        fallback_questions = [
-            "Tell me about a time when you had to lead a team through a difficult project. What was your approach and what were the results?",
-            "Describe a situation where you had to solve a complex problem with limited resources. How did you handle it and what did you learn?",
-            "Can you share an example of when you had to work with a difficult team member or stakeholder? What actions did you take?",
-            "Tell me about a time when you had to adapt quickly to a significant change in your work environment. What was the outcome?",
-            "Describe a situation where you made a mistake. How did you handle it and what did you learn from the experience?",
-            "Give me an example of when you had to influence others without having direct authority over them. What was the result?",
-            "Tell me about a time when you had to work under tight deadlines. How did you prioritize and manage your time?",
-            "Describe a situation where you had to learn a new skill quickly to complete a project. What was the impact?",
-            "Can you share an example of when you had to give difficult feedback to a colleague? How did you approach it?",
-            "Tell me about a time when you had to make a decision with incomplete information. What was the outcome?",
-            "Describe a situation where you had to manage competing priorities from different stakeholders. How did you handle it?",
-            "Give me an example of when you went above and beyond what was expected in your role. What were the results?"
-        ]
-        
-        return fallback_questions[:num_questions]
-
-# File Processing Functions
-class FileProcessor:
-    @staticmethod
-    def validate_file(uploaded_file) -> tuple[bool, str]:
-        """Validate uploaded file size and format."""
-        if uploaded_file is None:
-            return False, "No file uploaded"
-        
-        max_size = 10 * 1024 * 1024  # 10MB in bytes
-        if uploaded_file.size > max_size:
-            return False, f"File size ({uploaded_file.size / 1024 / 1024:.1f}MB) exceeds maximum allowed size (10MB)"
-        
-        allowed_extensions = ['.pdf', '.doc', '.docx', '.txt']
-        file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-        if file_extension not in allowed_extensions:
-            return False, f"Unsupported file format. Please upload: {', '.join(allowed_extensions)}"
-        
-        return True, "File validated successfully"
-    
-    @staticmethod
-    def extract_text_from_pdf(pdf_file) -> str:
-        try:
-            pdf_reader = PyPDF2.PdfReader(pdf_file)
-            text = ""
-            for page in pdf_reader.pages:
-                text += page.extract_text() + "\n"
-            return text.strip()
-        except Exception as e:
-            raise Exception(f"Error reading PDF: {str(e)}")
-    
-    @staticmethod
-    def extract_text_from_docx(docx_file) -> str:
-        try:
-            doc = Document(docx_file)
-            text = ""
-            for paragraph in doc.paragraphs:
-                text += paragraph.text + "\n"
-            return text.strip()
-        except Exception as e:
-            raise Exception(f"Error reading DOCX: {str(e)}")
-    
-    @staticmethod
-    def extract_text_from_doc(doc_file) -> str:
-        try:
-            result = mammoth.extract_raw_text(doc_file)
-            return result.value.strip()
-        except Exception as e:
-            raise Exception(f"Error reading DOC: {str(e)}")
-    
-    @staticmethod
-    def extract_text_from_txt(txt_file) -> str:
-        try:
-            return txt_file.read().decode('utf-8').strip()
-        except Exception as e:
-            raise Exception(f"Error reading TXT: {str(e)}")
-    
-    @classmethod
-    def process_resume_file(cls, uploaded_file) -> tuple[bool, str]:
-        is_valid, message = cls.validate_file(uploaded_file)
-        if not is_valid:
-            return False, message
-        
-        try:
-            file_extension = os.path.splitext(uploaded_file.name)[1].lower()
-            
-            if file_extension == '.pdf':
-                text = cls.extract_text_from_pdf(uploaded_file)
-            elif file_extension == '.docx':
-                text = cls.extract_text_from_docx(uploaded_file)
-            elif file_extension == '.doc':
-                text = cls.extract_text_from_doc(uploaded_file)
-            elif file_extension == '.txt':
-                text = cls.extract_text_from_txt(uploaded_file)
-            else:
-                return False, "Unsupported file format"
-            
-            if len(text.strip()) < 50:
-                return False, "Resume appears to be empty or too short. Please upload a valid resume."
-            
-            return True, text
-        
-        except Exception as e:
-            return False, f"Error processing file: {str(e)}"
-
-# Timer functionality
-class InterviewTimer:
-    def __init__(self, duration_minutes: int):
-        self.duration_seconds = duration_minutes * 60
-        self.start_time = None
-        self.question_start_time = None
-    
-    def start_interview(self):
-        self.start_time = datetime.now()
-    
-    def start_question(self):
-        self.question_start_time = datetime.now()
-    
-    def get_remaining_time(self) -> int:
-        if not self.start_time:
-            return self.duration_seconds
-        
-        elapsed = (datetime.now() - self.start_time).total_seconds()
-        remaining = max(0, self.duration_seconds - elapsed)
-        return int(remaining)
-    
-    def get_question_time(self) -> int:
-        if not self.question_start_time:
-            return 0
-        
-        elapsed = (datetime.now() - self.question_start_time).total_seconds()
-        return int(elapsed)
-    
-    def format_time(self, seconds: int) -> str:
-        minutes = seconds // 60
-        seconds = seconds % 60
-        return f"{minutes:02d}:{seconds:02d}"
-
 # Session State Management - FIXED VERSION
 def initialize_session_state():
-    """Initialize all session state variables - FIXED VERSION."""
-    defaults = {
-        'stage': 'upload',
-        'resume_text': "",
-        'job_details': {},
-        'interview_duration': 15,
-        'num_questions': 3,
-        'questions': [],
-        'current_question_idx': 0,
-        'conversation': [],
-        'question_responses': [],
-        'individual_feedback': {},  # FIXED: Changed to dict for better indexing
-        'overall_feedback': "",
-        'interview_completed': False,
-        'timer': None,
-        'question_timer_start': None,
-        'gemini_client': None,
-        'duration_selected': False,
-        'feedback_generated': False  # FIXED: Added to track feedback generation
-    }
-    
-    for key, value in defaults.items():
-        if key not in st.session_state:
-            st.session_state[key] = value
+    """Create this browser session's interview state and AI client on first run."""
+    if 'interview' not in st.session_state:
+        st.session_state.interview = InterviewSession()
+    if 'gemini_client' not in st.session_state:
+        st.session_state.gemini_client = None
     
     if st.session_state.gemini_client is None:
         try:
-            st.session_state.gemini_client = GeminiClient()
+            st.session_state.gemini_client = GeminiClient(notify=show_notice)
+        except GeminiConfigError as e:
+            st.error(f"❌ {str(e)}")
+            st.stop()
         except Exception as e:
             st.error(f"Failed to initialize AI client: {str(e)}")
+    
+    # Attribute this rerun's LLM calls (tokens, cost, quotas) to the user and browser session. Only a
+    # signed-in user gets a per-user quota; anonymous visitors are limited per session, which a new tab resets.
+    client = st.session_state.gemini_client
+    if client is not None:
+        ctx = get_script_run_ctx()
+        client.user_id = normalize_user_id(signed_in_user())
+        client.session_id = ctx.session_id if ctx else ''
 
 # UI Components
+def show_notice(level: str, message: str):
+    """Render a GeminiClient notice as st.warning / st.error."""
+    getattr(st, level, st.warning)(message)
+
+@contextmanager
+def llm_wait_notice():
+    """Show queue position and estimated wait while an LLM call waits for a slot."""
+    placeholder = st.empty()
+    
+    def show(position: int, eta_seconds: float):
+        placeholder.info(f"⏳ High demand right now - you're #{position} in line (about {eta_seconds:.0f}s).")
+    
+    try:
+        with queue_status(show):
+            yield
+    finally:
+        placeholder.empty()
+
 def render_header():
     """Render application header."""
     st.markdown("""
@@ -556,7 +128,7 @@ def render_progress_stepper():
     stages = ['upload', 'details', 'interview', 'feedback']
     stage_names = ['Upload Resume', 'Job Details', 'Interview', 'Feedback']
     stage_icons = ['📄', '📝', '🎤', '📊']
-    current_stage_idx = stages.index(st.session_state.stage)
+    current_stage_idx = stages.index(st.session_state.interview.stage)
     
     # Calculate progress percentage
     progress_value = current_stage_idx / (len(stages) - 1) if len(stages) > 1 else 0
@@ -786,7 +358,7 @@ def render_upload_stage():
             success, result = FileProcessor.process_resume_file(uploaded_file)
             
             if success:
-                st.session_state.resume_text = result
+                st.session_state.interview.resume_text = offload(result)
                 
                 st.markdown("""
                 <div style="background: linear-gradient(135deg, #D1FAE5 0%, #A7F3D0 100%); color: #065F46; padding: 1.5rem 2rem; border-radius: 16px; margin: 2rem 0; font-weight: 600; box-shadow: 0 8px 16px rgba(16, 185, 129, 0.2); border: 1px solid #6EE7B7; display: flex; align-items: center; gap: 1rem;">
@@ -809,7 +381,7 @@ def render_upload_stage():
                 col1, col2, col3 = st.columns([1, 2, 1])
                 with col2:
                     if st.button("Continue to Job Details →", key="continue_to_details", use_container_width=True):
-                        st.session_state.stage = 'details'
+                        st.session_state.interview.stage = 'details'
                         st.rerun()
             else:
                 st.markdown(f"""
@@ -876,16 +448,16 @@ def render_details_stage():
     for i, option in enumerate(duration_options):
         with cols[i]:
             if st.button(f"Select {option['duration']}min", key=f"dur_{i}", use_container_width=True):
-                st.session_state.interview_duration = option["duration"]
-                st.session_state.num_questions = option["questions"]
-                st.session_state.duration_selected = True
+                st.session_state.interview.interview_duration = option["duration"]
+                st.session_state.interview.num_questions = option["questions"]
+                st.session_state.interview.duration_selected = True
                 st.rerun()
     
-    if st.session_state.duration_selected:
+    if st.session_state.interview.duration_selected:
         st.markdown(f"""
         <div class="status-message status-success">
             <span>✅</span>
-            <span>Selected: {st.session_state.interview_duration} minutes ({st.session_state.num_questions} questions)</span>
+            <span>Selected: {st.session_state.interview.interview_duration} minutes ({st.session_state.interview.num_questions} questions)</span>
         </div>
         """, unsafe_allow_html=True)
     
@@ -926,7 +498,7 @@ def render_details_stage():
                     <span>Please fill in all required fields (marked with *)</span>
                 </div>
                 """, unsafe_allow_html=True)
-            elif not st.session_state.duration_selected:
+            elif not st.session_state.interview.duration_selected:
                 st.markdown("""
                 <div class="status-message status-error">
                     <span>❌</span>
@@ -940,22 +512,24 @@ def render_details_stage():
                     'job_description': job_description,
                     'experience_years': experience_years,
                     'industry': industry,
-                    'duration': st.session_state.interview_duration
+                    'duration': st.session_state.interview.interview_duration
                 }
                 
-                st.session_state.job_details = job_details
+                st.session_state.interview.job_details = job_details
+                st.session_state.interview.touch()
                 
-                with st.spinner(f"🤖 Generating {st.session_state.num_questions} personalized interview questions..."):
+                with st.spinner(f"🤖 Generating {st.session_state.interview.num_questions} personalized interview questions..."):
                     try:
-                        questions = st.session_state.gemini_client.generate_questions(
-                            st.session_state.resume_text,
-                            job_details,
-                            st.session_state.num_questions
-                        )
+                        with llm_wait_notice():
+                            questions = st.session_state.gemini_client.generate_questions(
+                                resolve(st.session_state.interview.resume_text),
+                                job_details,
+                                st.session_state.interview.num_questions
+                            )
                         
-                        st.session_state.questions = questions
-                        st.session_state.timer = InterviewTimer(st.session_state.interview_duration)
-                        st.session_state.stage = 'interview'
+                        st.session_state.interview.questions = questions
+                        st.session_state.interview.timer = InterviewTimer(st.session_state.interview.interview_duration)
+                        st.session_state.interview.stage = 'interview'
                         
                         st.markdown("""
                         <div class="status-message status-success">
@@ -978,19 +552,22 @@ def render_details_stage():
 
 def render_interview_stage():
     """Render interactive interview stage with timer - FIXED VERSION."""
-    if not st.session_state.questions:
+    if not st.session_state.interview.questions:
         st.error("No questions available. Please go back and regenerate questions.")
         return
     
+    # Fold answers and feedback into the report as they arrive (a no-op when nothing changed)
+    generate_report_content()
+    
     # Start interview timer if not started
-    if st.session_state.timer and not st.session_state.timer.start_time:
-        st.session_state.timer.start_interview()
+    if st.session_state.interview.timer and not st.session_state.interview.timer.start_time:
+        st.session_state.interview.timer.start_interview()
     
     # Timer display
-    if st.session_state.timer:
-        remaining = st.session_state.timer.get_remaining_time()
-        total_duration = st.session_state.interview_duration * 60
-        time_str = st.session_state.timer.format_time(remaining)
+    if st.session_state.interview.timer:
+        remaining = st.session_state.interview.timer.get_remaining_time()
+        total_duration = st.session_state.interview.interview_duration * 60
+        time_str = st.session_state.interview.timer.format_time(remaining)
         
         timer_class = "timer-display"
         if remaining < total_duration * 0.25:
@@ -1005,31 +582,31 @@ def render_interview_stage():
         """, unsafe_allow_html=True)
         
         if remaining <= 0:
-            st.session_state.interview_completed = True
-            st.session_state.stage = 'feedback'
+            st.session_state.interview.interview_completed = True
+            st.session_state.interview.stage = 'feedback'
             st.rerun()
     
     st.title("💬 Behavioral Interview")
     
     # Current question or completion
-    if st.session_state.current_question_idx < len(st.session_state.questions):
-        current_question = st.session_state.questions[st.session_state.current_question_idx]
-        question_num = st.session_state.current_question_idx + 1
+    if st.session_state.interview.current_question_idx < len(st.session_state.interview.questions):
+        current_question = st.session_state.interview.questions[st.session_state.interview.current_question_idx]
+        question_num = st.session_state.interview.current_question_idx + 1
         
         # Start question timer if not started
-        if not st.session_state.question_timer_start:
-            st.session_state.question_timer_start = datetime.now()
-            if st.session_state.timer:
-                st.session_state.timer.start_question()
+        if not st.session_state.interview.question_timer_start:
+            st.session_state.interview.question_timer_start = datetime.now()
+            if st.session_state.interview.timer:
+                st.session_state.interview.timer.start_question()
         
         # Progress indicator
-        progress = min(st.session_state.current_question_idx / len(st.session_state.questions), 1.0)
+        progress = min(st.session_state.interview.current_question_idx / len(st.session_state.interview.questions), 1.0)
         st.progress(progress)
         
         # Current question display
         st.markdown(f"""
         <div class="current-question animate-fade-in">
-            <div class="question-number">Question {question_num}/{len(st.session_state.questions)}</div>
+            <div class="question-number">Question {question_num}/{len(st.session_state.interview.questions)}</div>
             <div class="question-text">{current_question}</div>
             <div class="hears-reminder">
                 <div class="hears-title">💡 HEARS Method Guide</div>
@@ -1060,12 +637,12 @@ def render_interview_stage():
         """, unsafe_allow_html=True)
         
         # User response input
-        with st.form(f"response_form_{st.session_state.current_question_idx}"):
+        with st.form(f"response_form_{st.session_state.interview.current_question_idx}"):
             user_response = st.text_area(
                 "Your Answer (use HEARS method):",
                 placeholder="Provide a comprehensive answer covering Headline, Events, Actions, Results, and Significance...",
                 height=200,
-                key=f"response_{st.session_state.current_question_idx}"
+                key=f"response_{st.session_state.interview.current_question_idx}"
             )
             
             col1, col2 = st.columns([3, 1])
@@ -1076,49 +653,50 @@ def render_interview_stage():
             with col2:
                 if st.form_submit_button("Skip Question", type="secondary", use_container_width=True):
                     # FIXED: Handle skipped questions properly
-                    response_data = {
-                        'question': current_question,
-                        'answer': '[Question Skipped]',
-                        'question_number': st.session_state.current_question_idx + 1
-                    }
-                    st.session_state.question_responses.append(response_data)
+                    st.session_state.interview.add_response(QuestionResponse(
+                        current_question,
+                        '[Question Skipped]',
+                        st.session_state.interview.current_question_idx + 1,
+                        answer_seconds()
+                    ))
                     
                     # FIXED: Generate feedback for skipped question
                     feedback_result = st.session_state.gemini_client.generate_individual_feedback(
                         current_question,
                         '[Question Skipped]',
-                        st.session_state.job_details,
-                        st.session_state.current_question_idx + 1
+                        st.session_state.interview.job_details,
+                        st.session_state.interview.current_question_idx + 1
                     )
                     
                     # FIXED: Store feedback with proper key
-                    st.session_state.individual_feedback[st.session_state.current_question_idx + 1] = feedback_result
+                    st.session_state.interview.set_feedback(offload_feedback(feedback_result))
                     
-                    st.session_state.current_question_idx += 1
-                    st.session_state.question_timer_start = None
+                    st.session_state.interview.current_question_idx += 1
+                    st.session_state.interview.question_timer_start = None
                     st.rerun()
             
             if submitted and user_response.strip():
                 # FIXED: Record the Q&A pair with better structure
-                response_data = {
-                    'question': current_question,
-                    'answer': user_response.strip(),
-                    'question_number': st.session_state.current_question_idx + 1
-                }
-                st.session_state.question_responses.append(response_data)
+                st.session_state.interview.add_response(QuestionResponse(
+                    current_question,
+                    offload(user_response.strip()),
+                    st.session_state.interview.current_question_idx + 1,
+                    answer_seconds()
+                ))
                 
                 # FIXED: Generate individual feedback with better error handling
                 with st.spinner("🤖 Analyzing your response using HEARS methodology..."):
                     try:
-                        feedback_result = st.session_state.gemini_client.generate_individual_feedback(
-                            current_question,
-                            user_response.strip(),
-                            st.session_state.job_details,
-                            st.session_state.current_question_idx + 1
-                        )
+                        with llm_wait_notice():
+                            feedback_result = st.session_state.gemini_client.generate_individual_feedback(
+                                current_question,
+                                user_response.strip(),
+                                st.session_state.interview.job_details,
+                                st.session_state.interview.current_question_idx + 1
+                            )
                         
                         # FIXED: Store feedback with question number as key
-                        st.session_state.individual_feedback[st.session_state.current_question_idx + 1] = feedback_result
+                        st.session_state.interview.set_feedback(offload_feedback(feedback_result))
                         
                         if feedback_result['success']:
                             st.success("✅ Response analyzed successfully!")
@@ -1126,27 +704,27 @@ def render_interview_stage():
                             st.warning(f"⚠️ Feedback generation had issues: {feedback_result.get('error', 'Unknown error')}")
                             
                     except Exception as e:
-                        error_feedback = {
-                            'question_number': st.session_state.current_question_idx + 1,
-                            'success': False,
-                            'feedback': f"**Technical Error:** Unable to analyze this response due to: {str(e)}",
-                            'error': str(e)
-                        }
-                        st.session_state.individual_feedback[st.session_state.current_question_idx + 1] = error_feedback
+                        error_feedback = FeedbackRecord(
+                            st.session_state.interview.current_question_idx + 1,
+                            False,
+                            f"**Technical Error:** Unable to analyze this response due to: {str(e)}",
+                            str(e)
+                        )
+                        st.session_state.interview.set_feedback(error_feedback)
                         st.error(f"❌ Error analyzing response: {str(e)}")
                 
                 # Move to next question
-                st.session_state.current_question_idx += 1
-                st.session_state.question_timer_start = None
+                st.session_state.interview.current_question_idx += 1
+                st.session_state.interview.question_timer_start = None
                 
-                if st.session_state.current_question_idx >= len(st.session_state.questions):
-                    st.session_state.interview_completed = True
+                if st.session_state.interview.current_question_idx >= len(st.session_state.interview.questions):
+                    st.session_state.interview.interview_completed = True
                 
                 st.rerun()
     
     else:
         # Interview completed
-        st.session_state.interview_completed = True
+        st.session_state.interview.interview_completed = True
         
         st.markdown("""
         <div class="content-card animate-fade-in">
@@ -1163,29 +741,197 @@ def render_interview_stage():
         col1, col2, col3 = st.columns([1, 2, 1])
         with col2:
             if st.button("📊 Get My HEARS Feedback Report", type="primary", use_container_width=True):
-                st.session_state.stage = 'feedback'
+                st.session_state.interview.stage = 'feedback'
                 st.rerun()
 
+def answer_seconds() -> Optional[float]:
+    """Seconds since the current question was shown, for the practice history."""
+    started = st.session_state.interview.question_timer_start
+    return round((datetime.now() - started).total_seconds(), 1) if started else None
+
+def failed_feedback_responses() -> List[QuestionResponse]:
+    """Answered questions whose analysis errored or never arrived (skips are not failures)."""
+    failed = []
+    for response in st.session_state.interview.question_responses:
+        if response.skipped:
+            continue
+        feedback_data = st.session_state.interview.individual_feedback.get(response.question_number)
+        if feedback_data is None or (not feedback_data.success and feedback_data.error):
+            failed.append(response)
+    return failed
+
+def collect_feedback_retries() -> int:
+    """Store finished re-analyses in individual_feedback; return how many are still running."""
+    retries = st.session_state.interview.feedback_retries
+    for question_num, future in list(retries.items()):
+        if not future.done():
+            continue
+        del retries[question_num]
+        try:
+            st.session_state.interview.set_feedback(offload_feedback(future.result()))
+        except Exception as e:
+            st.session_state.interview.set_feedback(FeedbackRecord(
+                question_num,
+                False,
+                f"**Unable to generate feedback due to technical error:**\n\n*Error: {str(e)}*\n\nPlease try again or contact support if this issue persists.",
+                str(e)
+            ))
+    return len(retries)
+
+def retry_failed_feedback(failed: List[QuestionResponse]):
+    """Re-submit only the failed analyses; each one runs concurrently in the background."""
+    for response in failed:
+        st.session_state.interview.feedback_retries[response.question_number] = (
+            st.session_state.gemini_client.submit_individual_feedback(
+                response.question,
+                resolve(response.answer),
+                st.session_state.interview.job_details,
+                response.question_number
+            )
+        )
+
+def feedback_status_icon(response: QuestionResponse) -> str:
+    """Icon summarising a question's analysis state for the question selector."""
+    if response.skipped:
+        return "⏭️"
+    if response.question_number in st.session_state.interview.feedback_retries:
+        return "🔄"
+    feedback_data = st.session_state.interview.individual_feedback.get(response.question_number)
+    if feedback_data is None:
+        return "⏳"
+    return "✅" if feedback_data.success else "❌"
+
+# Section markup per feedback entry, cached in the session that owns it so the text goes
+# away with the session (Start Over, idle eviction). Offloaded values are BlobRefs, hashed by
+# identity, so a re-analysis (new record, new ref) misses the cache while revisiting a question
+# does not decompress and rebuild the same text again.
+RENDER_CACHE_SIZE = 32
+
+def session_cached(key, build) -> str:
+    cache = st.session_state.setdefault('render_cache', OrderedDict())
+    if key in cache:
+        cache.move_to_end(key)
+        return cache[key]
+    cache[key] = text = build()
+    if len(cache) > RENDER_CACHE_SIZE:
+        cache.popitem(last=False)
+    return text
+
+def answer_section_html(answer) -> str:
+    return session_cached(('answer', answer), lambda: f"""
+                <div style="background: #f8fafc; padding: 1rem; border-radius: 5px; border-left: 4px solid #64748b;">
+                    {resolve(answer)}
+                </div>
+                """)
+
+def feedback_section_markdown(feedback, success: bool) -> str:
+    if success:
+        return session_cached(('feedback', feedback), lambda: resolve(feedback))
+    return session_cached(('error', feedback), lambda: f"""
+                    <div style="background: #fee2e2; padding: 1rem; border-radius: 5px; border-left: 4px solid #ef4444; color: #991b1b;">
+                        <strong>❌ Feedback Generation Error</strong><br>
+                        {resolve(feedback)}
+                    </div>
+                    """)
+
+def render_question_feedback(response: QuestionResponse):
+    """Question, answer and HEARS analysis for one question of the report."""
+    question_num = response.question_number
+    st.markdown(f"""
+            <div class="feedback-individual">
+                <h4>❓ Question {question_num}:</h4>
+                <p style="background: #f0f9ff; padding: 1rem; border-radius: 5px; border-left: 4px solid #0ea5e9;">{response.question}</p>
+
+                <h4>💬 Your Answer:</h4>
+            </div>
+            """, unsafe_allow_html=True)
+
+    if response.skipped:
+        st.markdown("""
+                <div style="background: #fef3c7; padding: 1rem; border-radius: 5px; border-left: 4px solid #f59e0b; color: #92400e;">
+                    <strong>⏭️ Question was skipped</strong> - No response provided for analysis.
+                </div>
+                """, unsafe_allow_html=True)
+    else:
+        st.markdown(answer_section_html(response.answer), unsafe_allow_html=True)
+
+    st.markdown("#### 🎯 HEARS Analysis:")
+
+    if question_num in st.session_state.interview.feedback_retries:
+        st.info("🔄 Re-analyzing this answer - the result will appear here as soon as it is ready.")
+    elif question_num in st.session_state.interview.individual_feedback:
+        feedback_data = st.session_state.interview.individual_feedback[question_num]
+        st.markdown(feedback_section_markdown(feedback_data.feedback, feedback_data.success),
+                    unsafe_allow_html=not feedback_data.success)
+    else:
+        st.markdown("""
+                <div style="background: #e5e7eb; padding: 1rem; border-radius: 5px; border-left: 4px solid #6b7280; color: #374151;">
+                    <strong>⏳ Individual feedback not available</strong> - This may occur due to technical issues during analysis.
+                </div>
+                """, unsafe_allow_html=True)
+
+# While re-analyses or exports run, only their fragment re-runs on this interval (not the whole page)
+REFRESH_SECONDS = 1.0
+
+def render_retry_controls(polling: bool):
+    """Retry button for failed analyses, or the progress of the ones re-running."""
+    retries = st.session_state.interview.feedback_retries
+    if polling and any(future.done() for future in retries.values()):
+        st.rerun()  # a re-analysis landed: redraw the report with it
+    failed = failed_feedback_responses()
+    if retries:
+        st.info(f"🔄 Re-analyzing {len(retries)} answer(s) - results fill in as they complete.")
+    elif failed:
+        if st.button(f"🔁 Retry Failed Analyses ({len(failed)})", type="secondary"):
+            retry_failed_feedback(failed)
+            st.rerun()
+
+def render_export_buttons(exports: Dict, report_name: str, polling: bool):
+    """Download buttons for the background exports, with a disabled placeholder while one is running."""
+    if polling and all(future.done() for future in exports.values()):
+        st.rerun()  # everything is ready: one page run re-renders this fragment without polling
+    export_cols = st.columns(len(exports))
+    for col, (fmt, future) in zip(export_cols, exports.items()):
+        label, mime, extension = EXPORT_FORMATS[fmt]
+        with col:
+            if not future.done():
+                st.button(f"⏳ Preparing {label}...", key=f"export_{fmt}", disabled=True, use_container_width=True)
+            elif future.exception() is not None:
+                st.caption(f"⚠️ {label} export failed: {future.exception()}")
+            else:
+                st.download_button(
+                    label=f"📥 {label}",
+                    data=future.result(),
+                    file_name=f"{report_name}.{extension}",
+                    mime=mime,
+                    key=f"export_{fmt}",
+                    use_container_width=True
+                )
+
 def render_feedback_stage():
     """Render comprehensive HEARS feedback report - FIXED VERSION."""
     st.title("📊 HEARS Methodology Feedback Report")
     
-    if not st.session_state.question_responses:
+    if not st.session_state.interview.question_responses:
         st.error("No interview responses available. Please complete the interview first.")
         return
     
+    pending_retries = collect_feedback_retries()
+    # Start the file exports now so they render while the rest of the page is drawn
+    exports = report_builder().exports(st.session_state.interview)
+    
     # FIXED: Interview Summary with better validation
-    completed_responses = [r for r in st.session_state.question_responses if r['answer'] != '[Question Skipped]']
-    skipped_responses = [r for r in st.session_state.question_responses if r['answer'] == '[Question Skipped]']
+    completed_responses = [r for r in st.session_state.interview.question_responses if not r.skipped]
+    skipped_responses = [r for r in st.session_state.interview.question_responses if r.skipped]
     
     st.markdown(f"""
     <div class="feedback-card">
         <h3 style="margin-bottom: 1rem; color: var(--accent-primary);">📋 Interview Summary</h3>
         <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;">
-            <div><strong>Position:</strong> {st.session_state.job_details.get('job_title', 'N/A')}</div>
-            <div><strong>Company:</strong> {st.session_state.job_details.get('company_name', 'N/A')}</div>
-            <div><strong>Duration:</strong> {st.session_state.interview_duration} minutes</div>
-            <div><strong>Total Questions:</strong> {len(st.session_state.question_responses)}</div>
+            <div><strong>Position:</strong> {st.session_state.interview.job_details.get('job_title', 'N/A')}</div>
+            <div><strong>Company:</strong> {st.session_state.interview.job_details.get('company_name', 'N/A')}</div>
+            <div><strong>Duration:</strong> {st.session_state.interview.interview_duration} minutes</div>
+            <div><strong>Total Questions:</strong> {len(st.session_state.interview.question_responses)}</div>
             <div><strong>Completed:</strong> {len(completed_responses)}</div>
             <div><strong>Skipped:</strong> {len(skipped_responses)}</div>
             <div><strong>Date:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M')}</div>
@@ -1196,54 +942,22 @@ def render_feedback_stage():
     # FIXED: Individual Question Feedback with proper error handling
     st.subheader("📝 Individual Question Analysis")
     
-    for i, response in enumerate(st.session_state.question_responses):
-        question_num = response['question_number']
-        
-        with st.expander(f"Question {question_num}: Analysis", expanded=False):
-            # Display question and answer
-            st.markdown(f"""
-            <div class="feedback-individual">
-                <h4>❓ Question:</h4>
-                <p style="background: #f0f9ff; padding: 1rem; border-radius: 5px; border-left: 4px solid #0ea5e9;">{response['question']}</p>
-                
-                <h4>💬 Your Answer:</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            if response['answer'] == '[Question Skipped]':
-                st.markdown("""
-                <div style="background: #fef3c7; padding: 1rem; border-radius: 5px; border-left: 4px solid #f59e0b; color: #92400e;">
-                    <strong>⏭️ Question was skipped</strong> - No response provided for analysis.
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown(f"""
-                <div style="background: #f8fafc; padding: 1rem; border-radius: 5px; border-left: 4px solid #64748b;">
-                    {response['answer']}
-                </div>
-                """, unsafe_allow_html=True)
-            
-            # FIXED: Display individual feedback with proper validation
-            st.markdown("#### 🎯 HEARS Analysis:")
-            
-            if question_num in st.session_state.individual_feedback:
-                feedback_data = st.session_state.individual_feedback[question_num]
-                
-                if feedback_data['success']:
-                    st.markdown(feedback_data['feedback'])
-                else:
-                    st.markdown(f"""
-                    <div style="background: #fee2e2; padding: 1rem; border-radius: 5px; border-left: 4px solid #ef4444; color: #991b1b;">
-                        <strong>❌ Feedback Generation Error</strong><br>
-                        {feedback_data['feedback']}
-                    </div>
-                    """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div style="background: #e5e7eb; padding: 1rem; border-radius: 5px; border-left: 4px solid #6b7280; color: #374151;">
-                    <strong>⏳ Individual feedback not available</strong> - This may occur due to technical issues during analysis.
-                </div>
-                """, unsafe_allow_html=True)
+    # Only the selected question is drawn; the rest stay out of the rerun payload
+    responses = {r.question_number: r for r in st.session_state.interview.question_responses}
+    if st.session_state.get('feedback_question') not in responses:
+        st.session_state.pop('feedback_question', None)  # stale pick from a previous interview
+    labels = {n: f"Q{n} {feedback_status_icon(r)}" for n, r in responses.items()}
+    selected = st.radio(
+        "Question",
+        options=list(responses),
+        format_func=labels.get,
+        horizontal=True,
+        key='feedback_question',
+        label_visibility="collapsed"
+    )
+    render_question_feedback(responses[selected])
+    
+    st.fragment(render_retry_controls, run_every=REFRESH_SECONDS if pending_retries else None)(bool(pending_retries))
     
     st.divider()
     
@@ -1251,15 +965,16 @@ def render_feedback_stage():
     st.subheader("🎯 Overall HEARS Analysis")
     
     # Check if overall feedback exists and is valid
+    overall_feedback = resolve(st.session_state.interview.overall_feedback)
     overall_feedback_exists = (
-        st.session_state.overall_feedback and 
-        isinstance(st.session_state.overall_feedback, str) and 
-        len(st.session_state.overall_feedback.strip()) > 0
+        overall_feedback and 
+        isinstance(overall_feedback, str) and 
+        len(overall_feedback.strip()) > 0
     )
     
     if overall_feedback_exists:
         st.markdown('<div class="feedback-card">', unsafe_allow_html=True)
-        st.markdown(st.session_state.overall_feedback)
+        st.markdown(overall_feedback)
         st.markdown('</div>', unsafe_allow_html=True)
     else:
         st.info("📊 Overall feedback not yet generated. Click the button below to generate comprehensive analysis.")
@@ -1269,13 +984,14 @@ def render_feedback_stage():
             if st.button("🤖 Generate Overall HEARS Analysis", type="primary", use_container_width=True):
                 with st.spinner("🔄 Creating comprehensive HEARS methodology analysis..."):
                     try:
-                        overall_result = st.session_state.gemini_client.generate_overall_feedback(
-                            st.session_state.question_responses,
-                            st.session_state.job_details
-                        )
+                        with llm_wait_notice():
+                            overall_result = st.session_state.gemini_client.generate_overall_feedback(
+                                resolve_responses(st.session_state.interview.question_responses),
+                                st.session_state.interview.job_details
+                            )
                         
                         if overall_result['success']:
-                            st.session_state.overall_feedback = overall_result['feedback']
+                            st.session_state.interview.set_overall_feedback(offload(overall_result['feedback']))
                             st.success("✅ Overall feedback generated successfully!")
                             st.rerun()
                         else:
@@ -1297,143 +1013,308 @@ def render_feedback_stage():
                         </div>
                         """, unsafe_allow_html=True)
     
+    render_progress_section()
+    
     # Action buttons
     st.divider()
     st.markdown("### 🚀 Next Steps")
     
     col1, col2, col3, col4 = st.columns(4)
     
+    report_name = f"interview_hears_report_{datetime.now().strftime('%Y%m%d_%H%M')}"
     with col1:
-        if st.button("📄 Download Report", type="secondary", use_container_width=True):
-            report_content = generate_report_content()
-            st.download_button(
-                label="📥 Download Complete Report",
-                data=report_content,
-                file_name=f"interview_hears_report_{datetime.now().strftime('%Y%m%d_%H%M')}.md",
-                mime="text/markdown",
-                use_container_width=True
-            )
+        st.download_button(
+            label="📄 Download Report",
+            data=generate_report_content(),
+            file_name=f"{report_name}.md",
+            mime="text/markdown",
+            use_container_width=True
+        )
     
     with col2:
         if st.button("🔄 Practice Again", type="primary", use_container_width=True):
-            reset_interview_session()
-            st.session_state.stage = 'details'
+            save_history_on_leave()
+            st.session_state.interview.reset_interview()
+            st.session_state.interview.stage = 'details'
             st.rerun()
     
     with col3:
         if st.button("📝 New Position", type="secondary", use_container_width=True):
-            reset_for_new_position()
-            st.session_state.stage = 'details'
+            save_history_on_leave()
+            st.session_state.interview.reset_position()
+            st.session_state.interview.stage = 'details'
             st.rerun()
     
     with col4:
         if st.button("🏠 Start Over", type="secondary", use_container_width=True):
+            save_history_on_leave()
             reset_complete_session()
             st.rerun()
-
-# FIXED: Helper functions for better session management
-def generate_report_content() -> str:
-    """Generate comprehensive report content - FIXED VERSION."""
-    report_content = f"""# 🎯 AI Interview Simulator - HEARS Methodology Report
-
-**Interview Details:**
-- **Position:** {st.session_state.job_details.get('job_title', 'N/A')}
-- **Company:** {st.session_state.job_details.get('company_name', 'N/A')}
-- **Duration:** {st.session_state.interview_duration} minutes
-- **Questions Completed:** {len([r for r in st.session_state.question_responses if r['answer'] != '[Question Skipped]'])}/{len(st.session_state.question_responses)}
-- **Date:** {datetime.now().strftime('%Y-%m-%d %H:%M')}
-
----
-
-## 📝 Individual Question Analysis
-
-"""
     
-    for response in st.session_state.question_responses:
-        question_num = response['question_number']
-        report_content += f"""
-### Question {question_num}
-
-**Question:** {response['question']}
-
-**Your Answer:** {response['answer']}
+    # Other formats: offered as soon as the background export finishes
+    exporting = not all(future.done() for future in exports.values())
+    st.fragment(render_export_buttons, run_every=REFRESH_SECONDS if exporting else None)(exports, report_name, exporting)
+
+HISTORY_LINK_PARAM = 'history'
+HISTORY_TOKEN = re.compile(r'[0-9a-f]{32}')
+
+def signed_in_user() -> str:
+    """The signed-in user's email when the app has authentication configured, else ''."""
+    user = getattr(st, 'user', None)
+    if user is not None and user.get('is_logged_in') and user.get('email'):
+        return user.get('email')
+    return ''
+
+def practice_history_user() -> str:
+    """Who to file finished interviews under: the signed-in user, else this browser's history link.
+
+    Without sign-in the app issues a random token kept in the ?history= link,
+    so nobody can open another person's history by typing their name.
+    """
+    if signed_in_user():
+        return signed_in_user()
+    token = st.query_params.get(HISTORY_LINK_PARAM, '')
+    if not HISTORY_TOKEN.fullmatch(token):
+        token = secrets.token_hex(16)
+        st.query_params[HISTORY_LINK_PARAM] = token
+    return 'link:' + token
+
+def save_practice_history(user_id: str):
+    """Record the current interview for `user_id` once; the store also ignores an interview it already has."""
+    store = get_default_history_store()
+    interview = st.session_state.interview
+    if store is None or not user_id or st.session_state.get('history_saved') == (user_id, interview.interview_id):
+        return
+    store.record(user_id, interview, resolve)
+    st.session_state.history_saved = (user_id, interview.interview_id)
 
-**HEARS Analysis:**
-"""
-        if question_num in st.session_state.individual_feedback:
-            feedback_data = st.session_state.individual_feedback[question_num]
-            if feedback_data['success']:
-                report_content += f"{feedback_data['feedback']}\n\n"
-            else:
-                report_content += f"**Feedback Error:** {feedback_data['feedback']}\n\n"
-        else:
-            report_content += "Individual feedback not available for this question.\n\n"
+def save_history_on_leave():
+    """Leaving the report keeps the interview with whatever analyses it has."""
+    try:
+        save_practice_history(practice_history_user())
+    except Exception as e:
+        st.toast(f"⚠️ Could not save this interview to your history: {str(e)}")
+
+def render_progress_section():
+    """Record the finished interview in the user's practice history and show their progress."""
+    store = get_default_history_store()
+    if store is None:
+        return
     
-    report_content += f"""
----
-
-## 🎯 Overall HEARS Analysis
-
-{st.session_state.overall_feedback if st.session_state.overall_feedback else 'Overall feedback not generated.'}
-
----
-
-*Generated by AI Interview Simulator using HEARS Methodology*
-*Report generated on {datetime.now().strftime('%Y-%m-%d at %H:%M')}*
-"""
+    st.divider()
+    st.subheader("📈 Your Progress")
+    user_id = practice_history_user()
+    if not signed_in_user():
+        st.caption("🔗 Your practice history is tied to this page's link - bookmark it to come back to your "
+                   "progress. Anyone you share the link with can see it.")
+    
+    # History rows are final, so wait until no analysis is still worth retrying; leaving the page saves it as is
+    interview = st.session_state.interview
+    if interview.feedback_retries or failed_feedback_responses():
+        st.caption("This interview is saved to your history once its analyses are complete, "
+                   "or when you move on to the next one.")
+    else:
+        try:
+            save_practice_history(user_id)
+        except Exception as e:
+            st.warning(f"⚠️ Could not save this interview to your history: {str(e)}")
     
-    return report_content
-
-def reset_interview_session():
-    """Reset session for practicing with same job details."""
-    keys_to_reset = [
-        'questions', 'current_question_idx', 'conversation', 'question_responses', 
-        'individual_feedback', 'overall_feedback', 'interview_completed', 
-        'timer', 'question_timer_start', 'feedback_generated'
-    ]
-    for key in keys_to_reset:
-        if key in st.session_state:
-            if key == 'individual_feedback':
-                st.session_state[key] = {}
-            else:
-                del st.session_state[key]
+    progress = store.progress(user_id)
+    if not progress or not progress['scored']:
+        st.info("📊 Your progress appears here once an interview has scored answers.")
+        return
     
-    # Reset defaults
-    st.session_state.current_question_idx = 0
-    st.session_state.question_responses = []
-    st.session_state.individual_feedback = {}
-    st.session_state.interview_completed = False
-
-def reset_for_new_position():
-    """Reset session for new job position."""
-    keys_to_reset = [
-        'job_details', 'interview_duration', 'num_questions', 'questions', 
-        'current_question_idx', 'conversation', 'question_responses', 
-        'individual_feedback', 'overall_feedback', 'interview_completed', 
-        'timer', 'question_timer_start', 'duration_selected', 'feedback_generated'
-    ]
-    for key in keys_to_reset:
-        if key in st.session_state:
-            del st.session_state[key]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Interviews", progress['interviews'])
+    col2.metric(
+        "Latest Score",
+        f"{progress['last_score']:.1f}/50" if progress['last_score'] is not None else "N/A",
+        delta=(f"{progress['last_score'] - progress['averages']['total']:+.1f} vs your average"
+               if progress['last_score'] is not None else None)
+    )
+    col3.metric("Best Score", f"{progress['best_score']:.1f}/50" if progress['best_score'] is not None else "N/A")
+    col4.metric("Avg. Answer Time",
+                f"{progress['average_seconds'] / 60:.1f} min" if progress['average_seconds'] else "N/A")
     
-    # Reset defaults
-    st.session_state.interview_duration = 15
-    st.session_state.num_questions = 3
-    st.session_state.current_question_idx = 0
-    st.session_state.question_responses = []
-    st.session_state.individual_feedback = {}
-    st.session_state.interview_completed = False
-    st.session_state.duration_selected = False
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("**Average score per HEARS dimension (/10)**")
+        st.bar_chart(pd.DataFrame(
+            {'Average': [progress['averages'][name] for name in HEARS_DIMENSIONS]},
+            index=[name.title() for name in HEARS_DIMENSIONS]
+        ))
+    with col2:
+        if len(progress['recent']) > 1:
+            st.markdown(f"**Your last {len(progress['recent'])} interviews (/50)**")
+            st.line_chart(pd.DataFrame(
+                {'Score': [score for _, score in progress['recent']]},
+                index=[completed_at.replace('T', ' ')[:16] for completed_at, _ in progress['recent']]
+            ))
+
+# FIXED: Helper functions for better session management
+def report_builder() -> ReportBuilder:
+    """This session's report builder (dropped with the rest of the widget state on Start Over)."""
+    if 'report_builder' not in st.session_state:
+        st.session_state.report_builder = ReportBuilder(resolve=resolve)
+    return st.session_state.report_builder
+
+def generate_report_content() -> str:
+    """Markdown report for the current interview; only changed sections are re-rendered."""
+    return report_builder().markdown(st.session_state.interview)
 
 def reset_complete_session():
-    """Reset entire session."""
-    keys_to_keep = ['gemini_client']
+    """Reset entire session, including widget state such as typed answers."""
     for key in list(st.session_state.keys()):
-        if key not in keys_to_keep:
+        if key not in ('interview', 'gemini_client'):
             del st.session_state[key]
+    st.session_state.interview.reset_all()
+
+def render_memory_view():
+    """Sidebar table of the largest sessions in this process (SESSION_MEMORY_VIEW=1)."""
+    with st.sidebar.expander("🧠 Session Memory", expanded=False):
+        rows = get_registry().report(top=10)
+        usage = get_registry().store.usage()
+        st.caption(
+            f"{len(rows)} largest sessions · {usage['blobs']} offloaded blobs, "
+            f"{usage['stored_bytes'] / 1024:.0f} KB on disk, {usage['cached_bytes'] / 1024:.0f} KB cached"
+        )
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+
+def render_profiler_view(profiler):
+    """Sidebar report of the slowest script runs in this process (RERUN_PROFILER_VIEW=1)."""
+    with st.sidebar.expander("⏱️ Slowest Reruns", expanded=False):
+        runs = profiler.slowest()
+        st.caption(f"{profiler.runs} runs timed, {profiler.profiled} profiled · keeping the {profiler.keep} slowest")
+        st.dataframe(pd.DataFrame(profiler.stage_summary()), hide_index=True, use_container_width=True)
+        if not runs:
+            return
+        labels = {i: f"{run['seconds']:.2f}s · {run['stage']} · {run['started_at'][11:]}" for i, run in enumerate(runs)}
+        selected = st.selectbox("Run", options=list(labels), format_func=labels.get, key='profiler_run')
+        run = runs[selected if selected in labels else 0]
+        if run['profiled']:
+            order = st.radio("Sort by", ['self', 'cumulative'], horizontal=True, key='profiler_sort')
+            st.dataframe(pd.DataFrame(run[order]), hide_index=True, use_container_width=True)
+        else:
+            st.caption("This run was timed but not profiled (sampled out or another run held the profiler).")
+        col1, col2 = st.columns(2)
+        col1.download_button("Download JSON", json.dumps(profiler.report(), indent=1),
+                             file_name="rerun_profile.json", mime="application/json", key='profiler_download')
+        if col2.button("Clear", key='profiler_clear'):
+            profiler.clear()
+
+def render_coach_view():
+    """Cohort HEARS analytics across everyone's practice history (COACH_VIEW=1)."""
+    st.title("🎓 Coach View - Cohort Analytics")
+    store = get_default_history_store()
+    if store is None:
+        st.info("Practice history is turned off (PRACTICE_HISTORY=0), so there is no cohort to analyze.")
+        return
     
-    # Reset to initial state
-    initialize_session_state()
+    cohort = cohort_analytics.get_cohort(store.path)
+    if cohort.empty:
+        st.info("📊 No scored interviews recorded yet.")
+        return
+    
+    job_types = st.multiselect("Job types", options=sorted(cohort['job_type'].cat.categories), key='coach_job_types')
+    cohort = cohort_analytics.filter_cohort(cohort, job_types)
+    if cohort.empty:
+        st.info("No scored interviews for the selected job types.")
+        return
+    interviews = cohort_analytics.interview_scores(cohort)
+    overview = cohort_analytics.cohort_overview(cohort, interviews)
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Candidates", f"{overview['candidates']:,}")
+    col2.metric("Interviews", f"{overview['interviews']:,}")
+    col3.metric("Scored Answers", f"{overview['questions']:,}")
+    col4.metric("Median Answer Score", f"{overview['median_total']:.1f}/50")
+    
+    st.subheader("🔎 Weakest Dimension per Candidate")
+    weakest = cohort_analytics.weakest_dimensions(cohort)
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        st.bar_chart(cohort_analytics.weakest_dimension_counts(weakest).rename(index=str.title))
+    with col2:
+        st.dataframe(weakest.head(200), use_container_width=True)
+    
+    st.subheader("📊 Score Distribution by Job Type")
+    dimension = st.selectbox("Score", options=cohort_analytics.SCORE_COLUMNS, format_func=str.title,
+                             index=len(cohort_analytics.SCORE_COLUMNS) - 1, key='coach_dimension')
+    st.dataframe(cohort_analytics.score_distribution(cohort, column=dimension).round(2), use_container_width=True)
+    
+    st.subheader("📈 Improvement Curves")
+    col1, col2 = st.columns([3, 2])
+    with col1:
+        st.caption(f"{dimension.title()} score by attempt number (1st interview, 2nd, ...) - cohort quartiles")
+        st.line_chart(cohort_analytics.improvement_curve(interviews, column=dimension)[['p25', 'median', 'p75']])
+    with col2:
+        st.caption("Points gained per interview (least-squares trend), candidates with 3+ interviews")
+        fits = cohort_analytics.trend_fits(interviews, [dimension])
+        fits = fits[fits['interviews'] >= 3].sort_values(f"{dimension}_slope", ascending=False)
+        st.dataframe(fits.round(3), use_container_width=True)
+
+def render_bulk_view():
+    """Recruiter bulk mode: one role, a zip of resumes, a question set per resume (BULK_MODE=1)."""
+    st.title("📦 Bulk Mode - Prepare Questions for Many Candidates")
+    job = st.session_state.get('bulk_job')
+    if job is None:
+        with st.form('bulk_form'):
+            archive = st.file_uploader("Resumes (.zip of PDF, DOCX or TXT files)", type=['zip'], key='bulk_zip')
+            col1, col2 = st.columns(2)
+            job_title = col1.text_input("Job Title", key='bulk_job_title')
+            company_name = col2.text_input("Company Name", key='bulk_company')
+            job_description = st.text_area("Job Description", height=150, key='bulk_job_description')
+            num_questions = st.number_input("Questions per resume", min_value=1, max_value=15, value=5,
+                                            key='bulk_num_questions')
+            submitted = st.form_submit_button("Prepare Questions", use_container_width=True)
+        if submitted:
+            if archive is None or not job_title.strip():
+                st.error("Please upload a zip of resumes and enter a job title.")
+                return
+            directory = tempfile.mkdtemp(prefix='bulk-')
+            source = os.path.join(directory, 'resumes.zip')
+            with open(source, 'wb') as f:
+                f.write(archive.getbuffer())
+            job_details = {'job_title': job_title, 'company_name': company_name,
+                           'job_description': job_description}
+            client = st.session_state.gemini_client
+            st.session_state.bulk_job = BulkJob(source, directory, job_details, int(num_questions),
+                                                user_id=client.user_id, session_id=client.session_id)
+            st.rerun()
+        return
+    
+    running = not job.future.done()
+    st.fragment(render_bulk_progress, run_every=REFRESH_SECONDS if running else None)(job, running)
+    if job.future.done():
+        if job.future.exception() is not None:
+            st.error(f"Bulk preparation stopped: {job.future.exception()}")
+        else:
+            col1, col2, col3 = st.columns(3)
+            with open(job.output_path, 'rb') as f:
+                col1.download_button("Download JSONL", f.read(), file_name="questions.jsonl",
+                                     mime="application/jsonl", use_container_width=True)
+            with open(job.csv_path, 'rb') as f:
+                col2.download_button("Download CSV", f.read(), file_name="questions.csv",
+                                     mime="text/csv", use_container_width=True)
+        if st.button("New batch", key='bulk_new'):
+            del st.session_state.bulk_job
+            st.rerun()
+
+def render_bulk_progress(job: BulkJob, polling: bool):
+    """Progress of a bulk run; only this fragment redraws while the run goes on."""
+    if polling and job.future.done():
+        st.rerun()  # finished: redraw the view with the downloads
+    progress = job.snapshot()
+    counts = progress['counts']
+    st.progress(progress['done'] / max(progress['total'], 1),
+                text=f"{progress['done']}/{progress['total']} resumes · {progress['elapsed_seconds']:.0f}s")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Ready", counts['ok'])
+    col2.metric("Partial", counts['partial'])
+    col3.metric("Failed", counts['error'])
+    if progress['recent']:
+        st.dataframe(pd.DataFrame(progress['recent'][::-1]), use_container_width=True, hide_index=True)
 
 # Main Application
 def main():
@@ -1441,24 +1322,53 @@ def main():
     # CRITICAL: Load CSS first
     load_css()
     
+    # Track this session for idle eviction; an evicted session starts over with a notice
+    evicted = touch_session(getattr(st.session_state.get('interview'), 'stage', 'upload'))
+    
     # Initialize session state
     initialize_session_state()
+    if evicted:
+        st.info("⏰ Your previous session was closed after a long period of inactivity. Please start again.")
+    
+    # Metrics export (no-op unless METRICS_PORT / METRICS_FILE is set)
+    metrics.REGISTRY.register_collector('llm', get_default_caller().metric_samples)
+    metrics.REGISTRY.register_collector('sessions', get_registry().metric_samples)
+    metrics.REGISTRY.register_collector('jd_analysis', get_default_jd_cache().metric_samples)
+    if get_default_usage_ledger() is not None:
+        metrics.REGISTRY.register_collector('usage', get_default_usage_ledger().metric_samples)
+    metrics.start_exporter()
+    if os.getenv("SESSION_MEMORY_VIEW") == "1":
+        render_memory_view()
+    profiler = get_default_profiler()
+    if profiler is not None and os.getenv("RERUN_PROFILER_VIEW") == "1":
+        render_profiler_view(profiler)
+    if os.getenv("COACH_VIEW") == "1" and st.sidebar.toggle("🎓 Coach view", key='coach_view'):
+        render_coach_view()
+        return
+    if os.getenv("BULK_MODE") == "1" and st.sidebar.toggle("📦 Bulk mode", key='bulk_mode'):
+        render_bulk_view()
+        return
     
-    # Render components
-    render_header()
-    render_progress_stepper()
-    
-    # Route to appropriate stage
-    if st.session_state.stage == 'upload':
-        render_upload_stage()
-    elif st.session_state.stage == 'details':
-        render_details_stage()
-    elif st.session_state.stage == 'interview':
-        render_interview_stage()
-    elif st.session_state.stage == 'feedback':
-        render_feedback_stage()
-    else:
-        st.error("Unknown stage. Please restart the application.")
+    # Time the whole rerun per stage; st.rerun()/st.stop() are control flow, not errors
+    with track('script_run', ignore=(RerunException, StopException), stage=st.session_state.interview.stage):
+        # Render components
+        render_header()
+        render_progress_stepper()
+        
+        # Route to appropriate stage
+        if st.session_state.interview.stage == 'upload':
+            render_upload_stage()
+        elif st.session_state.interview.stage == 'details':
+            render_details_stage()
+        elif st.session_state.interview.stage == 'interview':
+            render_interview_stage()
+        elif st.session_state.interview.stage == 'feedback':
+            render_feedback_stage()
+        else:
+            st.error("Unknown stage. Please restart the application.")
 
 if __name__ == "__main__":
-    main()
+    # RERUN_PROFILER=1 profiles each script run, tagged with the stage it rendered
+    ctx = get_script_run_ctx()
+    with profile_rerun(getattr(st.session_state.get('interview'), 'stage', 'upload'), ctx.session_id if ctx else ''):
+        main()
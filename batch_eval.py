@@ -0,0 +1,224 @@
+# Batch evaluation CLI - score interview transcripts from a JSONL file without the UI
+# Streams input records, runs them with bounded concurrency and appends results as they finish.
+"""Headless batch evaluation of interview transcripts.
+
+Each input line is one JSON record:
+
+    {"id": "cand-42",
+     "resume_text": "...",
+     "job_details": {"job_title": "...", "company_name": "...", "job_description": "...", "duration": 15},
+     "num_questions": 3,
+     "questions": ["...", "..."],
+     "answers": ["...", "..."]}
+
+`questions` are generated from the resume when missing; `answers` (or a
+`responses` list of {"question", "answer"} objects) are scored per question and
+overall. Records without an `id` are keyed by line number.
+
+    python batch_eval.py transcripts.jsonl results.jsonl --concurrency 8
+
+The output file doubles as the checkpoint: re-running the same command skips
+records that already have an "ok" result and retries failed or "partial" ones
+(some analyses came back unsuccessful, or the standard question set was used
+because generation failed).
+"""
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from gemini_client import GeminiClient, fan_out
+from llm_scheduler import background_priority
+
+logger = logging.getLogger('batch_eval')
+
+TASKS = ('questions', 'individual', 'overall')
+SKIPPED_ANSWER = '[Question Skipped]'
+
+
+def read_records(path: str) -> Iterator[Tuple[str, Optional[Dict], Optional[str]]]:
+    """Yield (record_id, record, parse_error) one line at a time."""
+    with open(path, encoding='utf-8') if path != '-' else sys.stdin as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield f"line-{line_number}", None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield f"line-{line_number}", None, "record is not a JSON object"
+                continue
+            yield str(record.get('id', f"line-{line_number}")), record, None
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """Ids already completed in `path`; drops a torn final line left by an interrupted run."""
+    done = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b'\n'):
+            f.truncate(data.rfind(b'\n') + 1)
+            data = data[:data.rfind(b'\n') + 1]
+    for line in data.splitlines():
+        try:
+            result = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if result.get('status') == 'ok':
+            done.add(str(result.get('id')))
+    return done
+
+
+def record_responses(record: Dict, questions: List[str]) -> List[Dict]:
+    """Normalise answers into the app's question_responses shape."""
+    if record.get('responses'):
+        return [
+            {'question': r.get('question', ''), 'answer': r.get('answer') or SKIPPED_ANSWER, 'question_number': i + 1}
+            for i, r in enumerate(record['responses'])
+        ]
+    answers = record.get('answers') or []
+    return [
+        {'question': question, 'answer': answer or SKIPPED_ANSWER, 'question_number': i + 1}
+        for i, (question, answer) in enumerate(zip(questions, answers))
+    ]
+
+
+async def evaluate_record(client: GeminiClient, record_id: str, record: Dict, tasks: Set[str],
+                          call_concurrency: int = 4) -> Dict:
+    """Run the requested GeminiClient operations for one transcript."""
+    started = time.monotonic()
+    job_details = record.get('job_details') or {}
+    questions = record.get('questions') or [r.get('question', '') for r in record.get('responses') or []]
+    result = {'id': record_id, 'status': 'ok'}
+    warnings = []
+
+    if not questions:
+        if 'questions' not in tasks:
+            raise ValueError("record has no questions (add them or include the 'questions' task)")
+        if not record.get('resume_text'):
+            raise ValueError("record has no questions and no resume_text to generate them from")
+        num_questions = int(record.get('num_questions') or job_details.get('num_questions') or 3)
+        # The shared client with this record's notices captured: a notice means fallback questions
+        questions_client = copy.copy(client)
+        questions_client.notify = lambda level, message: warnings.append(message)
+        questions = await questions_client.agenerate_questions(record['resume_text'], job_details, num_questions)
+        result['questions'] = questions
+
+    # Per-question and overall analyses are independent, so they run side by side
+    responses = record_responses(record, questions)
+    calls = {}
+    if 'individual' in tasks and responses:
+        calls['individual_feedback'] = lambda: client.agenerate_all_individual_feedback(
+            responses, job_details, call_concurrency)
+    if 'overall' in tasks and responses:
+        calls['overall_feedback'] = lambda: client.agenerate_overall_feedback(responses, job_details)
+    outputs = await fan_out(calls.values(), limit=len(calls) or 1)
+    result.update(zip(calls, outputs))
+
+    failed = [f for f in result.get('individual_feedback', []) if not f['success'] and f['error']]
+    overall = result.get('overall_feedback')
+    if warnings:
+        result['warnings'] = warnings
+    if warnings or failed or (overall and not overall['success']):
+        result['status'] = 'partial'
+    result['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return result
+
+
+async def run_batch(input_path: str, output_path: str, tasks: Set[str], concurrency: int,
+                    call_concurrency: int = 4, client: Optional[GeminiClient] = None,
+                    restart: bool = False) -> Dict[str, int]:
+    """Evaluate every pending record, appending one result line per record as it finishes."""
+    client = client or GeminiClient()
+    if restart and os.path.exists(output_path):
+        os.remove(output_path)
+    done = load_checkpoint(output_path)
+    counts = {'ok': 0, 'partial': 0, 'error': 0, 'skipped': 0}
+    started = time.monotonic()
+
+    with open(output_path, 'a', encoding='utf-8') as out:
+        def write(result: Dict):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            out.flush()
+            counts[result['status']] += 1
+            finished = counts['ok'] + counts['partial'] + counts['error']
+            if finished % 10 == 0:
+                elapsed = time.monotonic() - started
+                logger.info("%d records done (%.1f/min), %d errors", finished, finished / elapsed * 60, counts['error'])
+
+        async def collect(pending: Dict, block_until: int):
+            while len(pending) > block_until:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    record_id = pending.pop(task)
+                    try:
+                        write(task.result())
+                    except Exception as e:
+                        logger.warning("record %s failed: %s", record_id, e)
+                        write({'id': record_id, 'status': 'error', 'error': str(e)})
+
+        # Only `concurrency` records are in memory at once; the input is never read ahead further
+        pending = {}
+        for record_id, record, parse_error in read_records(input_path):
+            if record_id in done:
+                counts['skipped'] += 1
+                continue
+            if parse_error:
+                write({'id': record_id, 'status': 'error', 'error': parse_error})
+                continue
+            task = asyncio.ensure_future(evaluate_record(client, record_id, record, tasks, call_concurrency))
+            pending[task] = record_id
+            await collect(pending, concurrency - 1)
+        await collect(pending, 0)
+
+    counts['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score interview transcripts from a JSONL file.")
+    parser.add_argument('input', help="input JSONL file ('-' for stdin)")
+    parser.add_argument('output', help="output JSONL file; also the resume checkpoint")
+    parser.add_argument('--tasks', default=','.join(TASKS), help=f"comma-separated subset of {', '.join(TASKS)}")
+    parser.add_argument('--concurrency', type=int, default=4, help="records evaluated at the same time")
+    parser.add_argument('--call-concurrency', type=int, default=4,
+                        help="per-question analyses run at the same time within one record")
+    parser.add_argument('--user', default='batch:cli', help="who the LLM usage is billed to (usage quotas)")
+    parser.add_argument('--restart', action='store_true', help="ignore existing results and start over")
+    parser.add_argument('--verbose', action='store_true', help="also log per-call prompt/LLM details")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s %(message)s', stream=sys.stderr)
+    logger.setLevel(logging.INFO)
+    load_dotenv()
+    tasks = {t.strip() for t in args.tasks.split(',') if t.strip()}
+    unknown = tasks - set(TASKS)
+    if unknown:
+        parser.error(f"unknown tasks: {', '.join(sorted(unknown))}")
+
+    client = GeminiClient()
+    client.user_id = args.user  # batch runs get their own quota rather than the shared anonymous one
+    with background_priority():  # live interviews share the rate limit and go first
+        counts = asyncio.run(run_batch(args.input, args.output, tasks, max(1, args.concurrency),
+                                       call_concurrency=args.call_concurrency, client=client, restart=args.restart))
+    logger.info("finished: %(ok)d ok, %(partial)d partial, %(error)d errors, %(skipped)d already done "
+                "in %(elapsed_seconds).1fs", counts)
+    return 1 if counts['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""Throughput benchmark for the HTTP API, optionally against the Streamlit path.
+
+Starts api_server.py on the offline LLM stand-in and drives N concurrent users
+through the same interview the load test uses: upload the sample resume,
+generate questions, score each answer, then the overall analysis. Reports
+interviews/min and per-endpoint p50/p95. With --compare-streamlit the same
+levels also run through the AppTest harness in benchmarks/load_test.py.
+
+    python benchmarks/api_benchmark.py --users 1,4,16 --llm-latency 0.5 --compare-streamlit
+"""
+
+import argparse
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from load_test import ANSWER, JOB_DESCRIPTION, SAMPLE_RESUME, percentile  # noqa: E402
+
+JOB_DETAILS = {'job_title': 'Senior Software Engineer', 'company_name': 'Acme Corp',
+               'job_description': JOB_DESCRIPTION, 'duration': 5}
+
+
+def request(conn, method, path, body=None, headers=None):
+    conn.request(method, path, body=body, headers=headers or {})
+    response = conn.getresponse()
+    payload = response.read()
+    if response.status != 200:
+        raise RuntimeError(f"{method} {path} -> {response.status}: {payload[:200]!r}")
+    return json.loads(payload)
+
+
+def simulate_user(port, resume_bytes, num_questions, endpoint_times, lock):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=300)
+
+    def timed(name, *args):
+        started = time.perf_counter()
+        result = request(conn, *args)
+        with lock:
+            endpoint_times[name].append(time.perf_counter() - started)
+        return result
+
+    try:
+        resume = timed('resume', 'POST', '/v1/resume?filename=resume.txt', resume_bytes)
+        body = {'resume_text': resume['resume_text'], 'job_details': JOB_DETAILS, 'num_questions': num_questions}
+        questions = timed('questions', 'POST', '/v1/questions', json.dumps(body))['questions']
+        responses = []
+        for number, question in enumerate(questions, start=1):
+            responses.append({'question': question, 'answer': ANSWER, 'question_number': number})
+            timed('individual', 'POST', '/v1/feedback/individual', json.dumps(
+                {'question': question, 'answer': ANSWER, 'job_details': JOB_DETAILS, 'question_number': number}))
+        timed('overall', 'POST', '/v1/feedback/overall', json.dumps({'responses': responses, 'job_details': JOB_DETAILS}))
+    finally:
+        conn.close()
+
+
+def run_level(port, users, resume_bytes, num_questions):
+    endpoint_times = defaultdict(list)
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            simulate_user(port, resume_bytes, num_questions, endpoint_times, lock)
+        except Exception as exc:
+            with lock:
+                errors.append(repr(exc))
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    completed = users - len(errors)
+    return {
+        'users': users,
+        'completed': completed,
+        'errors': errors,
+        'wall_seconds': wall,
+        'throughput_per_min': completed / wall * 60 if wall else 0.0,
+        'endpoints': {
+            name: {'p50': percentile(samples, 0.50), 'p95': percentile(samples, 0.95), 'samples': len(samples)}
+            for name, samples in endpoint_times.items()
+        },
+    }
+
+
+def start_server(port, env):
+    with socket.socket() as probe:
+        if probe.connect_ex(('127.0.0.1', port)) == 0:
+            raise RuntimeError(f"port {port} is already in use; pass --port")
+    server = subprocess.Popen([sys.executable, '-W', 'ignore', os.path.join(ROOT, 'api_server.py'), '--port', str(port)],
+                              cwd=ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            request(conn, 'GET', '/health')
+            conn.close()
+            return server
+        except (OSError, RuntimeError):
+            if server.poll() is not None:
+                raise RuntimeError("api_server.py exited during startup")
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("api_server.py did not become healthy within 30s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', default='1,4,16', help='comma-separated concurrency levels')
+    parser.add_argument('--port', type=int, default=8611)
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='mean offline LLM latency (s)')
+    parser.add_argument('--llm-jitter', type=float, default=0.25)
+    parser.add_argument('--rate-per-minute', type=float, default=6000.0, help='scheduler token rate for the run')
+    parser.add_argument('--max-in-flight', type=int, default=32, help='scheduler concurrency cap')
+    parser.add_argument('--compare-streamlit', action='store_true', help='also run the AppTest load test per level')
+    parser.add_argument('--json', help='write raw results to this file')
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ, GEMINI_BACKEND='offline', OFFLINE_LLM_LATENCY=str(args.llm_latency),
+               OFFLINE_LLM_JITTER=str(args.llm_jitter), OFFLINE_LLM_ERROR_RATE='0',
+               GEMINI_RATE_PER_MINUTE=str(args.rate_per_minute), GEMINI_MAX_IN_FLIGHT=str(args.max_in_flight))
+    levels = [int(level) for level in args.users.split(',') if level.strip()]
+    with open(SAMPLE_RESUME, 'rb') as f:
+        resume_bytes = f.read()
+
+    results = {'api': [], 'streamlit': []}
+    server = start_server(args.port, env)
+    try:
+        run_level(args.port, 1, resume_bytes, 3)  # warm-up
+        for users in levels:
+            result = run_level(args.port, users, resume_bytes, 3)
+            results['api'].append(result)
+            print(f"\n== API, {users} concurrent users: {result['completed']} completed, "
+                  f"{len(result['errors'])} errors, {result['throughput_per_min']:.1f} interviews/min")
+            for name, stats in result['endpoints'].items():
+                print(f"   {name:<11} p50 {stats['p50']:7.3f}s  p95 {stats['p95']:7.3f}s  (n={stats['samples']})")
+            for error in result['errors'][:3]:
+                print(f"   error: {error}")
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.compare_streamlit:
+        import load_test
+
+        os.environ.update(env)
+        sys.path.insert(0, ROOT)
+        os.chdir(ROOT)
+        load_test.share_apptest_runtime()
+        resume_text = resume_bytes.decode('utf-8').strip()
+        load_test.run_level(1, resume_text, 300.0)  # warm-up
+        for users in levels:
+            result = load_test.run_level(users, resume_text, 300.0)
+            results['streamlit'].append(result)
+
+        print(f"\n{'users':>6}{'API/min':>12}{'Streamlit/min':>16}{'speed-up':>10}")
+        for api, streamlit in zip(results['api'], results['streamlit']):
+            ratio = api['throughput_per_min'] / streamlit['throughput_per_min'] if streamlit['throughput_per_min'] else 0.0
+            print(f"{api['users']:>6}{api['throughput_per_min']:>12.1f}{streamlit['throughput_per_min']:>16.1f}{ratio:>9.1f}x")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,125 @@
+"""Cohort analytics over a large practice history: load time and per-view latency.
+
+Writes a synthetic history (candidates improving at different rates across
+job types) straight into a practice-history SQLite file, then times loading
+it into columns and each coach-view computation. The per-candidate trend fit
+is also timed the obvious way (np.polyfit per group) for comparison.
+
+    python benchmarks/cohort_benchmark.py --records 100000
+"""
+
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import cohort_analytics  # noqa: E402
+from history_store import HistoryStore  # noqa: E402
+from session_footprint import model_session  # noqa: E402
+
+JOB_TITLES = ['Software Engineer', 'software engineer ', 'Product Manager', 'Data Scientist',
+              'Engineering Manager', 'Site Reliability Engineer', 'UX Designer', None]
+
+
+def write_history(path: str, records: int, questions: int = 5, interviews_per_user: int = 10, seed: int = 7):
+    """Fill a fresh practice-history file with `records` scored question rows."""
+    HistoryStore(path)  # creates the schema
+    rng = np.random.default_rng(seed)
+    interviews = records // questions
+    users = max(1, interviews // interviews_per_user)
+    user = rng.integers(0, users, interviews)
+    skill = rng.normal(5.5, 1.0, (users, 5))
+    rate = rng.normal(0.15, 0.1, users)
+    started = datetime(2025, 1, 1)
+    attempt = np.zeros(users, dtype=int)
+    interview_rows, question_rows = [], []
+    for i in range(interviews):
+        u = user[i]
+        attempt[u] += 1
+        interview_id = f"i{i:07d}"
+        completed_at = (started + timedelta(hours=int(i))).isoformat(timespec='seconds')
+        scores = np.clip(skill[u] + rate[u] * attempt[u] + rng.normal(0, 1.0, (questions, 5)), 0, 10).round()
+        interview_rows.append((interview_id, f"user-{u}", completed_at, JOB_TITLES[u % len(JOB_TITLES)],
+                               None, 15, questions, questions, questions, float(scores.sum(axis=1).mean())))
+        for q in range(questions):
+            row = scores[q].tolist()
+            question_rows.append((interview_id, q + 1, 'question', 0, float(rng.uniform(40, 240)), 900,
+                                  *row, sum(row)))
+    with closing(sqlite3.connect(path)) as conn:
+        conn.executemany('INSERT INTO interviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', interview_rows)
+        conn.executemany('INSERT INTO question_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', question_rows)
+        conn.commit()
+    return users, interviews
+
+
+def best_of(func, repeat: int):
+    samples, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples), result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--records', type=int, default=100000, help="scored question records")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'history.sqlite3')
+        users, interviews = write_history(path, args.records)
+        store = HistoryStore(path)
+        print(f"{args.records:,} question records, {interviews:,} interviews, {users:,} candidates\n")
+
+        load_seconds, (frame, _) = best_of(lambda: cohort_analytics.load_cohort(path), args.repeat)
+        cohort_analytics.get_cohort(path)
+        cached_seconds, _ = best_of(lambda: cohort_analytics.get_cohort(path), args.repeat)
+        append_samples = []
+        for _ in range(args.repeat):
+            store.record('new-candidate', model_session(5))
+            started = time.perf_counter()
+            cohort_analytics.get_cohort(path)
+            append_samples.append(time.perf_counter() - started)
+        _, per_interview = best_of(lambda: cohort_analytics.interview_scores(frame), 1)
+        views = [
+            ('load into columns', lambda: None, load_seconds),
+            ('cached, no new interviews', lambda: None, cached_seconds),
+            ('cached, one new interview appended', lambda: None, statistics.median(append_samples)),
+            ('interview scores + attempts', lambda: cohort_analytics.interview_scores(frame), None),
+            ('weakest dimension per candidate', lambda: cohort_analytics.weakest_dimensions(frame), None),
+            ('distribution per job type', lambda: cohort_analytics.score_distribution(frame), None),
+            ('improvement curve', lambda: cohort_analytics.improvement_curve(per_interview), None),
+            ('trend fits (all dimensions)',
+             lambda: cohort_analytics.trend_fits(per_interview, cohort_analytics.SCORE_COLUMNS), None),
+            ('trend fits, polyfit per candidate',
+             lambda: per_interview.groupby('user_id', observed=True).apply(
+                 lambda g: np.polyfit(g['attempt'], g['total'], 1)[0] if len(g) > 1 else np.nan), None),
+        ]
+        print(f"{'step':<36}{'ms':>9}")
+        for name, func, seconds in views:
+            if seconds is None:
+                seconds, _ = best_of(func, args.repeat)
+            print(f"{name:<36}{seconds * 1000:>9.1f}")
+
+        fits = cohort_analytics.trend_fits(per_interview)
+        check = per_interview.groupby('user_id', observed=True).apply(
+            lambda g: np.polyfit(g['attempt'], g['total'], 1)[0] if len(g) > 1 else np.nan)
+        print(f"\nmax |slope difference| vs polyfit: {np.nanmax(np.abs(fits['total_slope'] - check)):.2e}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
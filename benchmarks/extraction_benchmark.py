@@ -0,0 +1,329 @@
+"""Document-extraction benchmark for FileProcessor.
+
+Generates a corpus of synthetic resumes (1-50 pages by default) in PDF, DOCX,
+DOC and TXT, then measures wall time, throughput and peak RSS of each
+extract_text_from_* method. Every case runs in a fresh process so peak RSS is
+not polluted by earlier cases.
+
+    python benchmarks/extraction_benchmark.py --pages 1,5,10,25,50 --save-baseline bench.json
+    python benchmarks/extraction_benchmark.py --baseline bench.json --threshold 0.2
+
+With --baseline the script exits non-zero when any case's median time regresses
+by more than the threshold. The docx-python-docx case runs the previous
+python-docx extractor on the DOCX corpus for comparison with the streaming one
+(which also returns table text, hence more chars). mammoth only reads the OOXML format, so the DOC
+corpus is DOCX content saved with a .doc extension (what the app can parse).
+
+"traced" is the tracemalloc peak of one extra extraction (Python allocations
+only, separate from the timed runs). --hostile adds uploads that should be
+refused early: mislabeled 10MB files, a zip bomb and a PDF over the page
+limit, each run through process_resume_file.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FORMATS = ('pdf', 'docx', 'doc', 'txt')
+# case -> (corpus file format, FileProcessor method)
+CASES = {
+    'pdf': ('pdf', 'extract_text_from_pdf'),
+    'docx': ('docx', 'extract_text_from_docx'),
+    'docx-python-docx': ('docx', 'extract_text_from_docx_object_model'),
+    'doc': ('doc', 'extract_text_from_doc'),
+    'txt': ('txt', 'extract_text_from_txt'),
+}
+LINES_PER_PAGE = 45
+
+RESUME_LINES = [
+    "Senior Software Engineer - Acme Corp (2019 - Present)",
+    "Led a team of 6 engineers migrating the billing platform to event-driven services.",
+    "Reduced p99 checkout latency from 1.8s to 420ms by introducing read-through caching.",
+    "Mentored 4 junior engineers; two were promoted within 18 months.",
+    "Designed the on-call rotation and incident review process adopted by 5 teams.",
+    "Skills: Python, Go, PostgreSQL, Kafka, Kubernetes, Terraform, AWS, GCP.",
+    "Partnered with product managers to prioritise a 12-month reliability roadmap.",
+    "Automated release pipelines, cutting deployment time from 2 hours to 15 minutes.",
+    "Education: B.Sc. Computer Science, State University, 2014.",
+]
+
+
+def resume_lines(pages: int):
+    for page in range(pages):
+        for line in range(LINES_PER_PAGE):
+            yield page, f"{RESUME_LINES[(page + line) % len(RESUME_LINES)]} [{page + 1}.{line + 1}]"
+
+
+def write_txt(path: str, pages: int):
+    with open(path, 'w', encoding='utf-8') as f:
+        for _, line in resume_lines(pages):
+            f.write(line + '\n')
+
+
+def write_docx(path: str, pages: int):
+    from docx import Document
+
+    doc = Document()
+    current_page = 0
+    for page, line in resume_lines(pages):
+        if page != current_page:
+            table = doc.add_table(rows=2, cols=3)
+            for row in table.rows:
+                for cell in row.cells:
+                    cell.text = "Python / SQL / Leadership"
+            doc.add_page_break()
+            current_page = page
+        doc.add_paragraph(line)
+    doc.save(path)
+
+
+def write_pdf(path: str, pages: int):
+    """Minimal multi-page PDF with Helvetica text; no third-party writer needed."""
+    objects = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = add(b"")  # filled in once the kids are known
+    page_ids = []
+    lines_by_page = {}
+    for page, line in resume_lines(pages):
+        lines_by_page.setdefault(page, []).append(line)
+    for page in range(pages):
+        commands = ["BT", "/F1 10 Tf", "12 TL", "50 780 Td"]
+        for line in lines_by_page[page]:
+            escaped = line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+            commands.append(f"({escaped}) Tj T*")
+        commands.append("ET")
+        stream = zlib.compress('\n'.join(commands).encode('latin-1'))
+        content_id = add(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 612 792] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>" % (pages_id, content_id, font_id)
+        ))
+    kids = b" ".join(b"%d 0 R" % pid for pid in page_ids)
+    objects[pages_id - 1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref_at = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_at)
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+WRITERS = {'pdf': write_pdf, 'docx': write_docx, 'doc': write_docx, 'txt': write_txt}
+
+
+def build_corpus(directory: str, page_counts, formats=FORMATS):
+    corpus = []
+    for fmt in [f for f in FORMATS if f in formats]:
+        for pages in page_counts:
+            path = os.path.join(directory, f"resume_{pages:03d}p.{fmt}")
+            if not os.path.exists(path):
+                WRITERS[fmt](path, pages)
+            corpus.append((fmt, pages, path))
+    return corpus
+
+
+def peak_rss_bytes() -> int:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measure(method_name: str, path: str, repeat: int, queue):
+    """Child process: time `repeat` extractions and report peak RSS growth."""
+    sys.path.insert(0, ROOT)
+    from file_processor import FileProcessor, InMemoryUpload
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    method = getattr(FileProcessor, method_name)
+    baseline = peak_rss_bytes()
+    times = []
+    chars = 0
+    for _ in range(repeat):
+        upload = InMemoryUpload(data, os.path.basename(path))
+        started = time.perf_counter()
+        chars = len(method(upload))
+        times.append(time.perf_counter() - started)
+    peak_rss = peak_rss_bytes()
+    queue.put({'times': times, 'chars': chars, 'peak_rss': peak_rss, 'peak_rss_delta': peak_rss - baseline,
+               'bytes': len(data), 'peak_traced': traced_peak(method, InMemoryUpload(data, os.path.basename(path)))})
+
+
+def traced_peak(method, upload) -> int:
+    """Peak Python allocation of one call, beyond the upload itself."""
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        method(upload)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(method_name: str, path: str, repeat: int) -> dict:
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(method_name, path, repeat, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def run_and_report(results: dict, case_name: str, method_name: str, pages: int, path: str, repeat: int):
+    measured = run_case(method_name, path, repeat)
+    median = statistics.median(measured['times'])
+    p95 = sorted(measured['times'])[min(len(measured['times']) - 1, int(0.95 * len(measured['times'])))]
+    case = f"{case_name}/{pages}p"
+    results[case] = r = {
+        'format': case_name,
+        'pages': pages,
+        'bytes': measured['bytes'],
+        'chars': measured['chars'],
+        'median_seconds': median,
+        'p95_seconds': p95,
+        'pages_per_second': pages / median if median else 0.0,
+        'mb_per_second': measured['bytes'] / 1e6 / median if median else 0.0,
+        'peak_rss_bytes': measured['peak_rss'],
+        'peak_rss_delta_bytes': measured['peak_rss_delta'],
+        'peak_traced_bytes': measured['peak_traced'],
+    }
+    print(f"{case:<24}{r['bytes'] / 1024:>8.0f}KB{median * 1000:>8.1f}ms{p95 * 1000:>8.1f}ms"
+          f"{r['pages_per_second']:>10.1f}{r['mb_per_second']:>8.2f}{r['chars']:>9}"
+          f"{r['peak_rss_bytes'] / 2**20:>9.1f}MB{r['peak_rss_delta_bytes'] / 2**20:>7.1f}MB"
+          f"{r['peak_traced_bytes'] / 2**20:>8.1f}MB")
+
+
+def write_hostile(directory: str):
+    """Uploads that must be refused: (case, path)."""
+    cases = []
+
+    def add(case, name, data):
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        cases.append((case, path))
+
+    size = 10 * 1024 * 1024 - 1024
+    add('random-as-pdf', 'random.pdf', os.urandom(size))
+    add('text-as-docx', 'text.docx', (b"Senior engineer, Python, Kafka. " * (size // 32)))
+    bomb = os.path.join(directory, 'bomb.docx')
+    with zipfile.ZipFile(bomb, 'w', zipfile.ZIP_DEFLATED) as archive:
+        with archive.open('word/document.xml', 'w') as xml:
+            xml.write(b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+                      b'<w:body><w:p><w:r><w:t>')
+            for _ in range(256):
+                xml.write(b'x' * (1024 * 1024))
+            xml.write(b'</w:t></w:r></w:p></w:body></w:document>')
+    cases.append(('zip-bomb-docx', bomb))
+    long_pdf = os.path.join(directory, 'long.pdf')
+    write_pdf(long_pdf, 400)
+    cases.append(('pdf-400p', long_pdf))
+    return cases
+
+
+def _measure_hostile(path: str, queue):
+    sys.path.insert(0, ROOT)
+    from file_processor import FileProcessor, InMemoryUpload
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    started = time.perf_counter()
+    ok, message = FileProcessor.process_resume_file(InMemoryUpload(data, os.path.basename(path)))
+    elapsed = time.perf_counter() - started
+    queue.put({'ok': ok, 'message': message[:60], 'seconds': elapsed, 'bytes': len(data),
+               'peak_traced': traced_peak(FileProcessor.process_resume_file,
+                                          InMemoryUpload(data, os.path.basename(path)))})
+
+
+def run_hostile(directory: str):
+    context = multiprocessing.get_context('spawn')
+    print(f"\n{'hostile upload':<16}{'size':>10}{'refused in':>12}{'traced':>9}  result")
+    results = {}
+    for case, path in write_hostile(directory):
+        queue = context.Queue()
+        process = context.Process(target=_measure_hostile, args=(path, queue))
+        process.start()
+        r = results[case] = queue.get()
+        process.join()
+        print(f"{case:<16}{r['bytes'] / 1024:>8.0f}KB{r['seconds'] * 1000:>10.1f}ms"
+              f"{r['peak_traced'] / 2**20:>7.1f}MB  {'ACCEPTED' if r['ok'] else r['message']}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--pages', default='1,5,10,25,50', help='comma-separated page counts')
+    parser.add_argument('--formats', default=','.join(CASES), help=f"cases to run: {', '.join(CASES)}")
+    parser.add_argument('--repeat', type=int, default=5, help='extractions per case')
+    parser.add_argument('--corpus-dir', help='reuse/keep generated files here (default: temp dir)')
+    parser.add_argument('--baseline', help='compare against a saved results file')
+    parser.add_argument('--threshold', type=float, default=0.20, help='allowed median slowdown vs baseline')
+    parser.add_argument('--save-baseline', help='write results to this file')
+    parser.add_argument('--hostile', action='store_true', help='also time refusal of oversized/mislabeled uploads')
+    args = parser.parse_args(argv)
+
+    page_counts = [int(p) for p in args.pages.split(',') if p.strip()]
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    corpus_dir = args.corpus_dir or tempfile.mkdtemp(prefix='resume-corpus-')
+    os.makedirs(corpus_dir, exist_ok=True)
+
+    results = {}
+    corpus = build_corpus(corpus_dir, page_counts, {CASES[case][0] for case in formats})
+    print(f"{'case':<24}{'size':>10}{'median':>10}{'p95':>10}{'pages/s':>10}{'MB/s':>8}{'chars':>9}{'peak RSS':>11}{'+RSS':>9}{'traced':>10}")
+    for case_name in formats:
+        file_format, method_name = CASES[case_name]
+        for fmt, pages, path in corpus:
+            if fmt == file_format:
+                run_and_report(results, case_name, method_name, pages, path, args.repeat)
+    if args.hostile:
+        run_hostile(corpus_dir)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = []
+        for case, result in results.items():
+            before = baseline.get(case)
+            if before and result['median_seconds'] > before['median_seconds'] * (1 + args.threshold):
+                regressions.append(f"{case}: {before['median_seconds'] * 1000:.1f}ms -> "
+                                   f"{result['median_seconds'] * 1000:.1f}ms")
+        if regressions:
+            print(f"\nRegressions over {args.threshold:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions over {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Rerun payload and script time of the feedback page.
+
+Loads a finished interview with N questions straight into session state (offline
+LLM, blobs offloaded as in the app), renders the feedback stage with AppTest and
+reports the bytes of ForwardMsgs a browser would receive per rerun and the
+script's wall time. --app compares another copy of the script (e.g. the
+previous revision saved next to app.py).
+
+    python benchmarks/feedback_payload.py --questions 3,6,12 --reruns 20
+    git show HEAD~1:app.py > app_before.py && python benchmarks/feedback_payload.py --app app_before.py
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from session_footprint import model_session  # noqa: E402
+
+
+def measure(app_path: str, questions: int, reruns: int):
+    import streamlit.testing.v1.local_script_runner as local_script_runner
+    from streamlit.testing.v1 import AppTest
+
+    from session_memory import offload
+
+    payloads = []
+    parse_tree = local_script_runner.parse_tree_from_messages
+
+    def recording(messages):
+        payloads.append(sum(message.ByteSize() for message in messages))
+        return parse_tree(messages)
+
+    local_script_runner.parse_tree_from_messages = recording
+    try:
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.run()
+        at.session_state['interview'] = model_session(questions, offload=offload)
+        times = []
+        for _ in range(reruns + 1):  # the first rerun warms caches and is not counted
+            started = time.perf_counter()
+            at.run()
+            times.append(time.perf_counter() - started)
+        if at.exception:
+            raise RuntimeError(f"script raised: {at.exception}")
+    finally:
+        local_script_runner.parse_tree_from_messages = parse_tree
+    return statistics.median(payloads[2:]), statistics.median(times[1:])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--questions', default='3,6,12')
+    parser.add_argument('--reruns', type=int, default=20)
+    parser.add_argument('--app', default=os.path.join(ROOT, 'app.py'))
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault('GEMINI_BACKEND', 'offline')
+    os.chdir(ROOT)
+    print(f"{os.path.basename(args.app)}")
+    print(f"{'questions':>9}{'payload KiB':>13}{'script ms':>11}")
+    for n in [int(q) for q in args.questions.split(',') if q.strip()]:
+        payload, seconds = measure(os.path.abspath(args.app), n, args.reruns)
+        print(f"{n:>9}{payload / 1024:>13.1f}{seconds * 1000:>11.1f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""Practice history: write cost and "your progress" load time as a user's history grows.
+
+Records N interviews for one user into a fresh SQLite file (alongside other
+users' noise) and times `progress()` at each checkpoint, next to the same
+aggregates computed from raw question rows with SQL for comparison.
+
+    python benchmarks/history_benchmark.py --interviews 100,1000,10000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import closing
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from history_store import HistoryStore  # noqa: E402
+from session_footprint import model_session  # noqa: E402
+from session_model import SKIPPED_ANSWER  # noqa: E402
+
+RAW_AGGREGATE = """SELECT COUNT(DISTINCT i.interview_id), AVG(q.headline), AVG(q.events), AVG(q.actions),
+    AVG(q.results), AVG(q.significance), AVG(q.total), MAX(i.score), AVG(q.seconds)
+FROM interviews i JOIN question_scores q ON q.interview_id = i.interview_id WHERE i.user_id = ?"""
+
+
+def timed_median(func, repeat: int = 50) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples)
+
+
+def finished_interview(questions: int):
+    """A scored interview with a new interview_id, one skipped answer and timings."""
+    session = model_session(questions)
+    session.question_responses[-1].answer = SKIPPED_ANSWER
+    for response in session.question_responses:
+        response.seconds = 90.0
+    return session
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--interviews', default='100,1000,10000')
+    parser.add_argument('--questions', type=int, default=5)
+    args = parser.parse_args(argv)
+    checkpoints = sorted(int(n) for n in args.interviews.split(','))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, 'history.sqlite3'))
+        print(f"{'interviews':>10}{'record ms':>11}{'progress ms':>13}{'raw SQL ms':>12}")
+        recorded, write_times = 0, []
+        for target in checkpoints:
+            while recorded < target:
+                session = finished_interview(args.questions)
+                started = time.perf_counter()
+                store.record('bench-user', session)
+                write_times.append(time.perf_counter() - started)
+                if recorded % 4 == 0:  # other users' history in the same tables
+                    store.record(f"other-{recorded % 50}", finished_interview(args.questions))
+                recorded += 1
+            progress_seconds = timed_median(lambda: store.progress('bench-user'))
+            with closing(store._connect()) as conn:
+                raw_seconds = timed_median(lambda: conn.execute(RAW_AGGREGATE, ('bench-user',)).fetchone(), 5)
+            print(f"{target:>10}{statistics.median(write_times) * 1000:>11.2f}"
+                  f"{progress_seconds * 1000:>13.3f}{raw_seconds * 1000:>12.2f}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
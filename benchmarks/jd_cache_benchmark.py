@@ -0,0 +1,119 @@
+"""Prompt-token savings from the shared job-description analysis cache.
+
+Runs N candidates through questions, per-answer feedback and the overall
+report against the same long posting on the offline LLM stand-in, once with
+JD_ANALYSIS=0 (raw description in every prompt) and once with the cache, and
+compares the estimated input tokens per operation. The cached run includes
+the analysis call itself and the first candidate's raw prompts while the
+analysis warms up in the background.
+
+    python benchmarks/jd_cache_benchmark.py --candidates 20 --questions 3
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POSTING = """Senior Site Reliability Engineer - Payments Platform
+
+About the role: you will own the reliability of customer-facing payment services that process
+millions of transactions a day. You will lead incident response, run the on-call rotation and
+drive post-incident reviews that actually change how we build software.
+
+What you'll do:
+- Design and operate distributed systems on Kubernetes across three regions
+- Define SLOs with product teams and hold the line on error budgets
+- Automate toil away: deployment pipelines, capacity planning, chaos testing
+- Mentor engineers across four teams and raise the bar for operational excellence
+- Partner with security and compliance on PCI-DSS controls
+
+What we're looking for:
+- 6+ years running production systems, 2+ in a senior or lead role
+- Deep experience with Python or Go, Terraform, Prometheus and Kafka
+- Calm, clear communication with executives during incidents
+- Evidence of influencing without authority and growing other engineers
+
+About us: Acme Pay is a fast-growing fintech on a mission to make payments simple for small
+businesses everywhere. We are backed by leading investors, remote-first across 14 countries, and
+proud of a culture built on ownership, candour and kindness.
+
+Benefits: competitive salary and equity, 30 days of paid leave, a home-office budget, annual
+learning stipend, comprehensive health, dental and vision cover, parental leave and a yearly
+company offsite. Acme Pay is an equal opportunity employer; we celebrate diversity and are
+committed to an inclusive environment for all employees. Reasonable accommodations are available
+throughout the hiring process on request.
+"""
+
+
+def run_candidates(candidates: int, questions: int):
+    """Child process: drive the candidates and print input chars per operation."""
+    sys.path.insert(0, ROOT)
+    import metrics
+    from gemini_client import GeminiClient
+    from load_test import ANSWER
+
+    resume = open(os.path.join(ROOT, 'sample_files', 'sample_resume.txt'), encoding='utf-8').read()
+    job = {'job_title': 'Senior SRE', 'company_name': 'Acme Pay', 'job_description': POSTING, 'duration': 30}
+    client = GeminiClient()
+    for _ in range(candidates):
+        asked = client.generate_questions(resume, job, questions)
+        responses = [{'question': q, 'answer': ANSWER, 'question_number': i + 1} for i, q in enumerate(asked)]
+        client.generate_all_individual_feedback(responses, job)
+        client.generate_overall_feedback(responses, job)
+    time.sleep(0.2)  # let a still-running background analysis land in the metrics
+    pattern = re.compile(r'interview_llm_attempt_input_size_(sum|count)\{operation="(\w+)"\} (\S+)')
+    for kind, operation, value in pattern.findall(metrics.REGISTRY.render_prometheus()):
+        print(kind, operation, value)
+
+
+def measure(candidates: int, questions: int, enabled: bool):
+    env = dict(os.environ, GEMINI_BACKEND='offline', OFFLINE_LLM_LATENCY='0.01', OFFLINE_LLM_JITTER='0',
+               OFFLINE_LLM_ERROR_RATE='0', GEMINI_RATE_PER_MINUTE='60000', GEMINI_MAX_IN_FLIGHT='32',
+               JD_ANALYSIS='1' if enabled else '0', PYTHONWARNINGS='ignore')
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--child', '--candidates', str(candidates),
+         '--questions', str(questions)],
+        env=env, cwd=ROOT, check=True, capture_output=True, text=True).stdout
+    totals = {}
+    for line in output.splitlines():
+        kind, operation, value = line.split()
+        totals.setdefault(operation, {})[kind] = float(value)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--candidates', type=int, default=20)
+    parser.add_argument('--questions', type=int, default=3)
+    parser.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+        run_candidates(args.candidates, args.questions)
+        return 0
+
+    raw = measure(args.candidates, args.questions, enabled=False)
+    cached = measure(args.candidates, args.questions, enabled=True)
+    print(f"{args.candidates} candidates x {args.questions} questions, posting of {len(POSTING)} chars\n")
+    print(f"{'operation':<22}{'calls':>7}{'raw tokens':>13}{'cached tokens':>15}{'saved':>8}")
+    grand = [0.0, 0.0]
+    for operation in sorted(set(raw) | set(cached)):
+        before = raw.get(operation, {}).get('sum', 0.0) / 4
+        after = cached.get(operation, {}).get('sum', 0.0) / 4
+        calls = int(max(raw.get(operation, {}).get('count', 0), cached.get(operation, {}).get('count', 0)))
+        grand[0] += before
+        grand[1] += after
+        saved = f"{1 - after / before:.0%}" if before else '-'
+        print(f"{operation:<22}{calls:>7}{before:>13,.0f}{after:>15,.0f}{saved:>8}")
+    print(f"{'total':<22}{'':>7}{grand[0]:>13,.0f}{grand[1]:>15,.0f}{1 - grand[1] / grand[0]:>8.0%}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,263 @@
+"""Multi-session load test for the Streamlit app.
+
+Drives N simulated users concurrently through upload -> details -> interview ->
+feedback using Streamlit's AppTest against the offline LLM stand-in, then reports
+throughput, per-stage p50/p95/p99 latency, memory per session and the
+concurrency level at which throughput stops scaling.
+
+    python benchmarks/load_test.py --users 1,2,4,8,16 --llm-latency 0.8 --json results.json
+
+--cassette replays recorded Gemini traffic (see llm_cassette.py) instead of the
+offline stand-in, at --cassette-speed times the recorded latency.
+
+AppTest cannot drive st.file_uploader, so the upload step renders the upload
+stage and then injects the extracted sample resume into session state.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(ROOT, 'app.py')
+SAMPLE_RESUME = os.path.join(ROOT, 'sample_files', 'sample_resume.txt')
+
+ANSWER = (
+    "Headline: I led the migration of our billing service under a hard deadline. "
+    "Events: the legacy system was failing weekly and two engineers had left. "
+    "Actions: I split the work into three milestones, paired with support on test cases "
+    "and ran daily check-ins with finance. Results: we shipped two weeks early and cut "
+    "billing incidents by 80%. Significance: I learned to trade scope for certainty early."
+)
+JOB_DESCRIPTION = (
+    "We are hiring a senior engineer to own reliability of customer-facing services, "
+    "mentor engineers, partner with product on roadmap trade-offs and lead incident response."
+)
+
+
+def percentile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux /proc), falling back to peak RSS elsewhere."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def share_apptest_runtime():
+    """Let AppTest sessions run concurrently in one process.
+
+    AppTest installs a mock Runtime singleton at the start of every run and clears it
+    at the end, so a second session running at the same time loses its runtime
+    mid-script, and it toggles the global `global.appTest` option per run. Install
+    one shared mock, keep the option on for the whole load test and share one
+    bytecode cache, as a real server does (concurrent compiles of the same script
+    are not safe on every CPython release).
+    """
+    from unittest.mock import MagicMock
+    from streamlit import config
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    try:
+        from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+        shared.cache_storage_manager = MemoryCacheStorageManager()
+    except ImportError:
+        pass
+    Runtime._instance = shared
+    config.set_option('global.appTest', True)
+
+    class _RuntimeProxy(type):
+        def __setattr__(cls, name, value):
+            if name != '_instance':
+                type.__setattr__(cls, name, value)
+
+    app_test.Runtime = _RuntimeProxy('Runtime', (Runtime,), {})
+    script_cache = ScriptCache()
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def _button(at, label_prefix):
+    return next(b for b in at.button if b.label.startswith(label_prefix))
+
+
+def simulate_user(resume_text, timeout, stage_times, lock, sessions):
+    """Run one full interview; append (stage, seconds) samples and keep the session alive."""
+    from streamlit.testing.v1 import AppTest
+
+    def timed(stage, action):
+        started = time.perf_counter()
+        action()
+        elapsed = time.perf_counter() - started
+        with lock:
+            stage_times[stage].append(elapsed)
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+
+    # Upload: render the upload stage, then hand over the extracted resume
+    timed('upload', at.run)
+    at.session_state['interview'].resume_text = resume_text
+    at.session_state['interview'].stage = 'details'
+
+    # Details: pick the quick duration, fill the form and generate questions
+    timed('details', at.run)
+    timed('details', lambda: at.button(key='dur_0').click().run())
+    at.text_input[0].input('Senior Software Engineer')
+    at.text_input[1].input('Acme Corp')
+    at.text_area[0].input(JOB_DESCRIPTION)
+    timed('details', lambda: _button(at, '🚀').click().run())
+
+    # Interview: answer every question
+    for index in range(len(at.session_state['interview'].questions)):
+        at.text_area(key=f"response_{index}").input(ANSWER)
+        timed('interview', lambda: _button(at, 'Submit Answer').click().run())
+    timed('interview', lambda: _button(at, '📊').click().run())
+
+    # Feedback: render the report and generate the overall analysis
+    timed('feedback', lambda: _button(at, '🤖').click().run())
+
+    if at.exception:
+        raise RuntimeError(f"script raised: {at.exception}")
+    with lock:
+        sessions.append(at)
+
+
+def run_level(users, resume_text, timeout):
+    stage_times = defaultdict(list)
+    sessions = []
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        try:
+            simulate_user(resume_text, timeout, stage_times, lock, sessions)
+        except Exception as exc:
+            with lock:
+                errors.append(repr(exc))
+
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(users)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    rss_after = rss_bytes()
+
+    completed = len(sessions)
+    result = {
+        'users': users,
+        'completed': completed,
+        'errors': errors,
+        'wall_seconds': wall,
+        'throughput_per_min': completed / wall * 60 if wall else 0.0,
+        'memory_per_session_bytes': max(0, rss_after - rss_before) // max(1, completed),
+        'stages': {
+            stage: {
+                'p50': percentile(samples, 0.50),
+                'p95': percentile(samples, 0.95),
+                'p99': percentile(samples, 0.99),
+                'mean': statistics.mean(samples),
+                'samples': len(samples),
+            }
+            for stage, samples in stage_times.items()
+        },
+    }
+    del sessions
+    return result
+
+
+def find_saturation(results, min_gain, slo):
+    """First level where throughput gains less than `min_gain` or any stage p95 breaks the SLO."""
+    previous = None
+    for result in results:
+        worst_p95 = max((s['p95'] for s in result['stages'].values()), default=0.0)
+        if slo and worst_p95 > slo:
+            return result['users'], f"stage p95 {worst_p95:.2f}s exceeds SLO {slo:.2f}s"
+        if previous and result['throughput_per_min'] < previous['throughput_per_min'] * (1 + min_gain):
+            return result['users'], (f"throughput {result['throughput_per_min']:.1f}/min vs "
+                                     f"{previous['throughput_per_min']:.1f}/min at {previous['users']} users")
+        previous = result
+    return None, "no saturation within the tested levels"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--users', default='1,2,4,8', help='comma-separated concurrency levels')
+    parser.add_argument('--llm-latency', type=float, default=0.5, help='mean offline LLM latency (s)')
+    parser.add_argument('--llm-jitter', type=float, default=0.25, help='relative latency std-dev')
+    parser.add_argument('--llm-error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-per-minute', type=float, default=600.0,
+                        help='scheduler token rate (GEMINI_RATE_PER_MINUTE) for the run')
+    parser.add_argument('--max-in-flight', type=int, default=8, help='scheduler concurrency cap')
+    parser.add_argument('--timeout', type=float, default=300.0, help='per-run AppTest timeout (s)')
+    parser.add_argument('--slo', type=float, default=0.0, help='stage p95 SLO in seconds (0 = off)')
+    parser.add_argument('--min-gain', type=float, default=0.10, help='throughput gain below which we call saturation')
+    parser.add_argument('--cassette', help='replay this recorded cassette instead of the offline LLM')
+    parser.add_argument('--cassette-speed', type=float, default=1.0, help='replay speed-up (0 = no delay)')
+    parser.add_argument('--json', help='write raw results to this file')
+    args = parser.parse_args(argv)
+
+    os.environ['GEMINI_BACKEND'] = 'replay' if args.cassette else 'offline'
+    if args.cassette:
+        os.environ['GEMINI_CASSETTE'] = os.path.abspath(args.cassette)
+        os.environ['GEMINI_CASSETTE_SPEED'] = str(args.cassette_speed)
+    os.environ['OFFLINE_LLM_LATENCY'] = str(args.llm_latency)
+    os.environ['OFFLINE_LLM_JITTER'] = str(args.llm_jitter)
+    os.environ['OFFLINE_LLM_ERROR_RATE'] = str(args.llm_error_rate)
+    os.environ['GEMINI_RATE_PER_MINUTE'] = str(args.rate_per_minute)
+    os.environ['GEMINI_MAX_IN_FLIGHT'] = str(args.max_in_flight)
+    sys.path.insert(0, ROOT)
+    os.chdir(ROOT)  # app.py loads main.css relative to the working directory
+    share_apptest_runtime()
+
+    with open(SAMPLE_RESUME, encoding='utf-8') as f:
+        resume_text = f.read().strip()
+
+    # Warm-up session so imports and the script compile don't count against level 1
+    run_level(1, resume_text, args.timeout)
+
+    results = []
+    for users in [int(level) for level in args.users.split(',') if level.strip()]:
+        result = run_level(users, resume_text, args.timeout)
+        results.append(result)
+        print(f"\n== {users} concurrent users: {result['completed']} completed, "
+              f"{len(result['errors'])} errors, {result['throughput_per_min']:.1f} interviews/min, "
+              f"~{result['memory_per_session_bytes'] / 1024:.0f} KiB/session")
+        for stage, stats in result['stages'].items():
+            print(f"   {stage:<10} p50 {stats['p50']:7.3f}s  p95 {stats['p95']:7.3f}s  "
+                  f"p99 {stats['p99']:7.3f}s  (n={stats['samples']})")
+        for error in result['errors'][:3]:
+            print(f"   error: {error}")
+
+    level, reason = find_saturation(results, args.min_gain, args.slo)
+    print(f"\nSaturation point: {level if level else 'not reached'} ({reason})")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results, 'saturation_users': level, 'saturation_reason': reason}, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
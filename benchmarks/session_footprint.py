@@ -0,0 +1,131 @@
+"""Per-session footprint of the typed session model vs the old flat session_state dict.
+
+Builds the same finished interview both ways for several question counts and
+reports in-memory size, reset time and checkpoint (serialize + write) time.
+The "model+blobs" column also offloads large text to the blob store, as the
+app does.
+
+    python benchmarks/session_footprint.py --questions 3,6,12 --repeat 200
+"""
+
+import argparse
+import copy
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from blob_store import BlobStore  # noqa: E402
+from offline_llm import INDIVIDUAL_FEEDBACK, OVERALL_FEEDBACK, QUESTION_BANK  # noqa: E402
+from session_memory import deep_sizeof  # noqa: E402
+from session_model import FeedbackRecord, InterviewSession, QuestionResponse  # noqa: E402
+
+RESUME = open(os.path.join(ROOT, 'sample_files', 'sample_resume.txt'), encoding='utf-8').read() * 3
+ANSWER = ("I led the migration of our billing service under a hard deadline, split the work into "
+          "milestones, paired with support on test cases and shipped two weeks early. ") * 4
+JOB = {'job_title': 'Senior Software Engineer', 'company_name': 'Acme Corp',
+       'job_description': 'Own reliability of customer-facing services. ' * 20, 'duration': 30}
+LEGACY_RESET_KEYS = ['questions', 'current_question_idx', 'conversation', 'question_responses',
+                     'individual_feedback', 'overall_feedback', 'interview_completed',
+                     'timer', 'question_timer_start', 'feedback_generated']
+
+
+def legacy_session(n: int) -> dict:
+    questions = [QUESTION_BANK[i % len(QUESTION_BANK)] for i in range(n)]
+    return {
+        'stage': 'feedback', 'resume_text': RESUME, 'job_details': dict(JOB), 'interview_duration': 30,
+        'num_questions': n, 'questions': questions, 'current_question_idx': n, 'conversation': [],
+        'question_responses': [{'question': q, 'answer': ANSWER, 'question_number': i + 1}
+                               for i, q in enumerate(questions)],
+        'individual_feedback': {i + 1: {'question_number': i + 1, 'success': True,
+                                        'feedback': INDIVIDUAL_FEEDBACK.format(number=i + 1), 'error': None}
+                                for i in range(n)},
+        'overall_feedback': OVERALL_FEEDBACK, 'interview_completed': True, 'timer': None,
+        'question_timer_start': None, 'duration_selected': True, 'feedback_generated': False,
+    }
+
+
+def model_session(n: int, offload=lambda text: text) -> InterviewSession:
+    legacy = legacy_session(n)
+    session = InterviewSession()
+    session.stage = 'feedback'
+    session.resume_text = offload(legacy['resume_text'])
+    session.job_details = legacy['job_details']
+    session.interview_duration = 30
+    session.num_questions = n
+    session.duration_selected = True
+    session.questions = legacy['questions']
+    session.current_question_idx = n
+    session.question_responses = [QuestionResponse(r['question'], offload(r['answer']), r['question_number'])
+                                  for r in legacy['question_responses']]
+    session.individual_feedback = {k: FeedbackRecord(k, True, offload(f['feedback']))
+                                   for k, f in legacy['individual_feedback'].items()}
+    session.overall_feedback = offload(legacy['overall_feedback'])
+    session.interview_completed = True
+    return session
+
+
+def legacy_reset(state: dict):
+    for key in LEGACY_RESET_KEYS:
+        if key in state:
+            if key == 'individual_feedback':
+                state[key] = {}
+            else:
+                del state[key]
+    state.update(current_question_idx=0, question_responses=[], individual_feedback={}, interview_completed=False)
+
+
+def median_us(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--questions', default='3,6,12')
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    tmp = tempfile.mkdtemp(prefix='session-footprint-')
+    store = BlobStore(root=os.path.join(tmp, 'blobs'))
+    checkpoint_path = os.path.join(tmp, 'session.json')
+
+    def write_legacy(state):
+        with open(checkpoint_path, 'w') as f:
+            json.dump(state, f)
+
+    print(f"{'questions':>9} | {'memory KiB: dict':>16} {'model':>7} {'+blobs':>7} | "
+          f"{'reset us: dict':>14} {'model':>7} | {'checkpoint us: dict':>19} {'model':>7} {'+blobs':>7} | "
+          f"{'bytes: dict':>11} {'+blobs':>7}")
+    for n in [int(q) for q in args.questions.split(',') if q.strip()]:
+        legacy = legacy_session(n)
+        model = model_session(n)
+        offloaded = model_session(n, offload=lambda text: store.offload('bench', text))
+
+        memory = [deep_sizeof(legacy) / 1024, deep_sizeof(model) / 1024, deep_sizeof(offloaded) / 1024]
+        reset_legacy = median_us(lambda: legacy_reset(copy.copy(legacy)), args.repeat) - median_us(
+            lambda: copy.copy(legacy), args.repeat)
+        reset_target = model_session(n)  # resets cost the same whether or not the session is already empty
+        reset_model = median_us(reset_target.reset_interview, args.repeat)
+        checkpoint = [median_us(lambda: write_legacy(legacy), args.repeat),
+                      median_us(lambda: model.checkpoint(checkpoint_path), args.repeat),
+                      median_us(lambda: offloaded.checkpoint(checkpoint_path), args.repeat)]
+        sizes = [len(json.dumps(legacy)), len(offloaded.dumps())]
+        print(f"{n:>9} | {memory[0]:>16.1f} {memory[1]:>7.1f} {memory[2]:>7.1f} | "
+              f"{max(0.0, reset_legacy):>14.1f} {reset_model:>7.1f} | "
+              f"{checkpoint[0]:>19.1f} {checkpoint[1]:>7.1f} {checkpoint[2]:>7.1f} | "
+              f"{sizes[0]:>11} {sizes[1]:>7}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
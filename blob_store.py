@@ -0,0 +1,141 @@
+# Blob store - compressed, disk-backed storage for large session text (resumes, answers, feedback)
+# Values live as zlib files grouped by namespace (one per session); a small LRU keeps hot blobs decoded.
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Dict, Optional, Union
+
+
+class BlobRef:
+    """Handle to a stored blob; this is what sits in session state instead of the text."""
+    __slots__ = ('namespace', 'key', 'length', 'stored_bytes')
+
+    def __init__(self, namespace: str, key: str, length: int, stored_bytes: int):
+        self.namespace = namespace
+        self.key = key
+        self.length = length
+        self.stored_bytes = stored_bytes
+
+    def __len__(self):
+        return self.length
+
+    def __repr__(self):
+        return f"BlobRef({self.namespace}/{self.key}, {self.length} chars, {self.stored_bytes} bytes stored)"
+
+
+class BlobStore:
+    """Content-addressed text blobs on disk, compressed, with a bounded in-memory cache."""
+
+    def __init__(self, root: Optional[str] = None, threshold: int = 1024, cache_bytes: int = 4 * 1024 * 1024,
+                 level: int = 6):
+        self.root = root or tempfile.mkdtemp(prefix='interview-blobs-')
+        self.threshold = threshold
+        self.cache_bytes = cache_bytes
+        self.level = level
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._usage = {}  # namespace -> {key: stored bytes}
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, namespace: str, key: str) -> str:
+        return os.path.join(self.root, namespace, key + '.z')
+
+    def put(self, namespace: str, text: str) -> BlobRef:
+        data = text.encode('utf-8')
+        key = hashlib.blake2b(data, digest_size=16).hexdigest()
+        with self._lock:
+            stored = self._usage.get(namespace, {}).get(key)
+        if stored is None:
+            compressed = zlib.compress(data, self.level)
+            path = self._path(namespace, key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+            stored = len(compressed)
+            with self._lock:
+                self._usage.setdefault(namespace, {})[key] = stored
+        ref = BlobRef(namespace, key, len(text), stored)
+        self._remember(ref, text)
+        return ref
+
+    def get(self, ref: BlobRef) -> str:
+        cache_key = (ref.namespace, ref.key)
+        with self._lock:
+            text = self._cache.get(cache_key)
+            if text is not None:
+                self._cache.move_to_end(cache_key)
+                return text
+        try:
+            with open(self._path(ref.namespace, ref.key), 'rb') as f:
+                text = zlib.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            raise KeyError(f"blob {ref.namespace}/{ref.key} no longer exists (session evicted?)")
+        self._remember(ref, text)
+        return text
+
+    def _remember(self, ref: BlobRef, text: str):
+        size = len(text)
+        if size > self.cache_bytes:
+            return
+        with self._lock:
+            cache_key = (ref.namespace, ref.key)
+            if cache_key in self._cache:
+                self._cache.move_to_end(cache_key)
+                return
+            self._cache[cache_key] = text
+            self._cached_bytes += size
+            while self._cached_bytes > self.cache_bytes:
+                _, dropped = self._cache.popitem(last=False)
+                self._cached_bytes -= len(dropped)
+
+    def offload(self, namespace: str, value: Union[str, BlobRef]) -> Union[str, BlobRef]:
+        """Store `value` if it is text over the threshold; small values stay inline."""
+        if isinstance(value, str) and len(value) >= self.threshold:
+            return self.put(namespace, value)
+        return value
+
+    def load(self, value: Union[str, BlobRef, None]) -> Optional[str]:
+        """Inverse of offload: the text behind a BlobRef, anything else unchanged."""
+        return self.get(value) if isinstance(value, BlobRef) else value
+
+    def drop_namespace(self, namespace: str):
+        with self._lock:
+            self._usage.pop(namespace, None)
+            for cache_key in [k for k in self._cache if k[0] == namespace]:
+                self._cached_bytes -= len(self._cache.pop(cache_key))
+        shutil.rmtree(os.path.join(self.root, namespace), ignore_errors=True)
+
+    def usage(self, namespace: Optional[str] = None) -> Dict[str, int]:
+        """Blob count and stored (compressed) bytes, for one namespace or the whole store."""
+        with self._lock:
+            groups = [self._usage.get(namespace, {})] if namespace else list(self._usage.values())
+            return {
+                'blobs': sum(len(group) for group in groups),
+                'stored_bytes': sum(sum(group.values()) for group in groups),
+                'cached_bytes': self._cached_bytes,
+            }
+
+
+_default_store = None
+_default_lock = threading.Lock()
+
+
+def get_default_store() -> BlobStore:
+    """Process-wide store configured from SESSION_BLOB_DIR / SESSION_BLOB_THRESHOLD / SESSION_BLOB_CACHE_MB."""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = BlobStore(
+                root=os.getenv('SESSION_BLOB_DIR') or None,
+                threshold=int(os.getenv('SESSION_BLOB_THRESHOLD', 1024)),
+                cache_bytes=int(float(os.getenv('SESSION_BLOB_CACHE_MB', 4)) * 1024 * 1024),
+            )
+        return _default_store
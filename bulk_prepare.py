@@ -0,0 +1,318 @@
+# Recruiter bulk mode - extract many resumes and prepare a tailored question set for each
+# Text extraction runs in a process pool; questions go through the shared rate-limited LLM path.
+"""Prepare interview questions for a folder or zip of resumes, all for one role.
+
+In the app (BULK_MODE=1) recruiters upload a zip from the sidebar's bulk
+view; from a shell the same run works on a folder or zip:
+
+    python bulk_prepare.py applicants.zip questions.jsonl --job job.json --csv questions.csv
+
+`--job` is a JSON file with the job_details the app collects
+({"job_title", "company_name", "job_description", "experience_years", "duration"});
+--job-title/--company/--job-description-file build it from flags instead.
+
+Each resume becomes one JSONL line with its id (path inside the folder or
+zip), status, the generated questions and the extracted resume_text, so the
+file can later be fed to batch_eval.py once answers are added. The optional
+CSV holds one row per resume with a column per question for spreadsheets.
+
+A resume that cannot be read gets an "error" line and the run moves on. One
+whose questions fell back to the standard set (LLM unavailable) is
+"partial". Re-running the same command skips resumes that are already "ok".
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from file_processor import EXPECTED_CONTENT, process_resume_path
+
+# Spawned extraction workers re-import this module, so the LLM client (and batch_eval,
+# which imports it) are imported where they are used rather than here.
+
+logger = logging.getLogger('bulk_prepare')
+
+
+def iter_resumes(source: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+    """Yield (resume_id, path, zip_member) for every supported file in a directory or zip."""
+    def supported(name: str) -> bool:
+        base = os.path.basename(name)
+        return not base.startswith('.') and os.path.splitext(base)[1].lower() in EXPECTED_CONTENT
+
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+            for name in sorted(files):
+                if supported(name):
+                    path = os.path.join(root, name)
+                    yield os.path.relpath(path, source), path, None
+    else:
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and not info.filename.startswith('__MACOSX/') and supported(info.filename):
+                    yield info.filename, source, info.filename
+
+
+def load_job_details(args) -> Dict:
+    if args.job:
+        with open(args.job, encoding='utf-8') as f:
+            job_details = json.load(f)
+    else:
+        job_details = {'job_title': args.job_title, 'company_name': args.company}
+        if args.job_description_file:
+            with open(args.job_description_file, encoding='utf-8') as f:
+                job_details['job_description'] = f.read()
+    job_details.setdefault('duration', 15)
+    return job_details
+
+
+class ResultWriter:
+    """Appends each finished resume to the JSONL file and, optionally, the CSV."""
+
+    def __init__(self, jsonl_path: str, csv_path: Optional[str], num_questions: int):
+        self.num_questions = num_questions
+        self._jsonl = open(jsonl_path, 'a', encoding='utf-8')
+        self._csv_file = None
+        if csv_path:
+            new_file = not os.path.exists(csv_path) or os.path.getsize(csv_path) == 0
+            self._csv_file = open(csv_path, 'a', encoding='utf-8', newline='')
+            self._csv = csv.writer(self._csv_file)
+            if new_file:
+                self._csv.writerow(['id', 'status', 'resume_chars', 'error']
+                                   + [f"question_{i + 1}" for i in range(num_questions)])
+
+    def write(self, result: Dict):
+        self._jsonl.write(json.dumps(result, ensure_ascii=False) + '\n')
+        self._jsonl.flush()
+        if self._csv_file:
+            questions = result.get('questions') or []
+            self._csv.writerow([result['id'], result['status'], len(result.get('resume_text') or ''),
+                                result.get('error') or '; '.join(result.get('warnings') or [])]
+                               + questions[:self.num_questions])
+            self._csv_file.flush()
+
+    def close(self):
+        self._jsonl.close()
+        if self._csv_file:
+            self._csv_file.close()
+
+
+class Extractor:
+    """Process pool running FileProcessor; a crashed worker fails only its own file."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn rather than fork: the parent has scheduler/executor threads running
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+
+    async def extract(self, path: str, member: Optional[str]) -> Tuple[bool, str]:
+        pool = self._pool
+        try:
+            return await asyncio.get_running_loop().run_in_executor(pool, process_resume_path, path, member)
+        except BrokenProcessPool:
+            if self._pool is pool:
+                self._pool = self._new_pool()
+            return False, "Error processing file: the extraction worker crashed"
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+async def prepare_resume(extractor: Extractor, resume_id: str, path: str, member: Optional[str],
+                         job_details: Dict, num_questions: int, user_id: str = '', session_id: str = '') -> Dict:
+    started = time.monotonic()
+    ok, text = await extractor.extract(path, member)
+    if not ok:
+        return {'id': resume_id, 'status': 'error', 'error': text,
+                'elapsed_seconds': round(time.monotonic() - started, 3)}
+
+    from gemini_client import GeminiClient
+
+    # A client per resume so degraded-mode notices are attributed to this resume
+    warnings = []
+    client = GeminiClient(notify=lambda level, message: warnings.append(message))
+    client.user_id, client.session_id = user_id, session_id  # billed and quota-checked as whoever started the run
+    questions = await client.agenerate_questions(text, job_details, num_questions)
+    result = {
+        'id': resume_id,
+        'status': 'partial' if warnings else 'ok',
+        'questions': questions,
+        'num_questions': num_questions,
+        'job_details': job_details,
+        'resume_text': text,
+        'elapsed_seconds': round(time.monotonic() - started, 3),
+    }
+    if warnings:
+        result['warnings'] = warnings
+    return result
+
+
+async def run_bulk(source: str, output_path: str, job_details: Dict, num_questions: int = 5,
+                   concurrency: int = 8, workers: int = 4, csv_path: Optional[str] = None,
+                   restart: bool = False, progress=None, user_id: str = '', session_id: str = '') -> Dict[str, int]:
+    """Prepare every pending resume in `source`, writing each result as soon as it finishes.
+
+    `progress(done, total, result)` is called after every resume. LLM usage
+    is accounted (and quota-checked) under `user_id` / `session_id`.
+    """
+    from batch_eval import load_checkpoint
+
+    if restart:
+        for path in (output_path, csv_path):
+            if path and os.path.exists(path):
+                os.remove(path)
+    done = load_checkpoint(output_path)
+    resumes = [entry for entry in iter_resumes(source) if entry[0] not in done]
+    counts = {'ok': 0, 'partial': 0, 'error': 0, 'skipped': len(done)}
+    started = time.monotonic()
+
+    extractor = Extractor(workers)
+    writer = ResultWriter(output_path, csv_path, num_questions)
+    try:
+        pending = {}
+
+        async def collect(block_until: int):
+            while len(pending) > block_until:
+                finished, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in finished:
+                    resume_id = pending.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.warning("resume %s failed: %s", resume_id, e)
+                        result = {'id': resume_id, 'status': 'error', 'error': str(e)}
+                    writer.write(result)
+                    counts[result['status']] += 1
+                    if progress:
+                        progress(counts['ok'] + counts['partial'] + counts['error'], len(resumes), result)
+
+        for resume_id, path, member in resumes:
+            task = asyncio.ensure_future(prepare_resume(extractor, resume_id, path, member, job_details, num_questions,
+                                                        user_id, session_id))
+            pending[task] = resume_id
+            await collect(concurrency - 1)
+        await collect(0)
+    finally:
+        writer.close()
+        extractor.close()
+
+    counts['elapsed_seconds'] = round(time.monotonic() - started, 3)
+    return counts
+
+
+class BulkJob:
+    """A run_bulk started from the app's recruiter view, on its own thread at background priority.
+
+    Progress is kept on the object so any later rerun can read it; results
+    land in `directory` as questions.jsonl and questions.csv.
+    """
+
+    def __init__(self, source: str, directory: str, job_details: Dict, num_questions: int,
+                 concurrency: int = 8, workers: int = 2, user_id: str = '', session_id: str = ''):
+        self.output_path = os.path.join(directory, 'questions.jsonl')
+        self.csv_path = os.path.join(directory, 'questions.csv')
+        self.total = sum(1 for _ in iter_resumes(source))
+        self.done = 0
+        self.counts = {'ok': 0, 'partial': 0, 'error': 0}
+        self.recent = deque(maxlen=20)  # latest finished resumes, newest last
+        self.started = time.monotonic()
+        self.future = Future()
+        self.user_id, self.session_id = user_id, session_id
+        self._lock = threading.Lock()
+        threading.Thread(target=self._run, name='bulk-prepare', daemon=True,
+                         args=(source, job_details, num_questions, concurrency, workers)).start()
+
+    def _progress(self, done: int, total: int, result: Dict):
+        with self._lock:
+            self.done = done
+            self.counts[result['status']] += 1
+            self.recent.append({'id': result['id'], 'status': result['status'],
+                                'detail': result.get('error') or '; '.join(result.get('warnings') or [])
+                                or f"{len(result.get('questions') or [])} questions"})
+
+    def _run(self, source: str, job_details: Dict, num_questions: int, concurrency: int, workers: int):
+        from llm_scheduler import background_priority
+
+        try:
+            with background_priority():  # candidates practicing right now are served first
+                counts = asyncio.run(run_bulk(source, self.output_path, job_details, num_questions,
+                                              concurrency=concurrency, workers=workers, csv_path=self.csv_path,
+                                              progress=self._progress, user_id=self.user_id,
+                                              session_id=self.session_id))
+        except BaseException as e:
+            logger.exception("bulk preparation failed")
+            self.future.set_exception(e)
+        else:
+            self.future.set_result(counts)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {'done': self.done, 'total': self.total, 'counts': dict(self.counts),
+                    'recent': list(self.recent), 'elapsed_seconds': time.monotonic() - self.started}
+
+
+def print_progress(started: float):
+    def report(done: int, total: int, result: Dict):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed * 60 if elapsed else 0.0
+        eta = (total - done) / (done / elapsed) if done and elapsed else 0.0
+        detail = result.get('error') or f"{len(result.get('questions') or [])} questions"
+        print(f"[{done}/{total}] {result['id']}: {result['status']} ({detail}) - {rate:.1f}/min, "
+              f"ETA {eta:.0f}s", file=sys.stderr, flush=True)
+    return report
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Prepare interview questions for a folder or zip of resumes.")
+    parser.add_argument('source', help="directory or .zip of resumes (PDF, DOCX, DOC, TXT)")
+    parser.add_argument('output', help="output JSONL file; also the resume checkpoint")
+    parser.add_argument('--csv', help="also write one spreadsheet row per resume here")
+    parser.add_argument('--job', help="JSON file with the role's job_details")
+    parser.add_argument('--job-title', default='N/A')
+    parser.add_argument('--company', default='N/A')
+    parser.add_argument('--job-description-file', help="text file with the job description")
+    parser.add_argument('--num-questions', type=int, default=5)
+    parser.add_argument('--concurrency', type=int, default=8, help="resumes in flight at once")
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1),
+                        help="processes extracting resume text")
+    parser.add_argument('--user', default='bulk:cli', help="who the LLM usage is billed to (usage quotas)")
+    parser.add_argument('--restart', action='store_true', help="ignore existing results and start over")
+    parser.add_argument('--verbose', action='store_true', help="also log per-call prompt/LLM details")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING,
+                        format='%(asctime)s %(levelname)s %(name)s %(message)s', stream=sys.stderr)
+    logger.setLevel(logging.INFO)
+    load_dotenv()
+    if not os.path.isdir(args.source) and not zipfile.is_zipfile(args.source):
+        parser.error(f"{args.source} is neither a directory nor a zip file")
+
+    started = time.monotonic()
+    counts = asyncio.run(run_bulk(args.source, args.output, load_job_details(args), max(1, args.num_questions),
+                                  concurrency=max(1, args.concurrency), workers=max(1, args.workers),
+                                  csv_path=args.csv, restart=args.restart, progress=print_progress(started),
+                                  user_id=args.user))
+    logger.info("finished: %(ok)d ok, %(partial)d partial, %(error)d errors, %(skipped)d already done "
+                "in %(elapsed_seconds).1fs", counts)
+    return 1 if counts['error'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,174 @@
+# Cohort analytics - HEARS scores across many candidates for program coaches
+# Scored question rows from the practice history are loaded once into typed columns; every view is a vectorized group-by.
+
+import sqlite3
+import threading
+from contextlib import closing
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from history_store import HEARS_DIMENSIONS
+
+SCORE_COLUMNS = list(HEARS_DIMENSIONS) + ['total']
+PERCENTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+COHORT_QUERY = """
+SELECT i.user_id, i.interview_id, i.completed_at, i.job_title, q.question_number, q.seconds,
+       q.headline, q.events, q.actions, q.results, q.significance, q.total
+FROM interviews i JOIN question_scores q ON q.interview_id = i.interview_id
+WHERE q.total IS NOT NULL AND i.rowid > ? AND i.rowid <= ?
+"""
+CATEGORY_COLUMNS = ('user_id', 'interview_id', 'job_type')
+
+
+def cohort_frame(records: pd.DataFrame) -> pd.DataFrame:
+    """Typed columns for the analytics: categorical ids and job types, float32 scores, datetimes."""
+    frame = pd.DataFrame({
+        'user_id': records['user_id'].astype('category'),
+        'interview_id': records['interview_id'].astype('category'),
+        'completed_at': pd.to_datetime(records['completed_at']),
+        'job_type': (records['job_title'].fillna('Unspecified').astype(str).str.strip()
+                     .str.casefold().str.title().replace('', 'Unspecified').astype('category')),
+        'question_number': records['question_number'].astype('int16'),
+        'seconds': records['seconds'].astype('float32'),
+    })
+    for column in SCORE_COLUMNS:
+        frame[column] = records[column].astype('float32')
+    return frame
+
+
+def load_cohort(path: str, after: int = 0):
+    """Scored question records of interviews stored after rowid `after`, and the last rowid read.
+
+    The history is append-only, so (frame, last rowid) is enough to pick up
+    only newer interviews next time.
+    """
+    with closing(sqlite3.connect(path)) as conn:
+        conn.execute('BEGIN')  # one snapshot for the marker and the rows
+        last = conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM interviews').fetchone()[0]
+        records = pd.read_sql_query(COHORT_QUERY, conn, params=(after, last))
+        conn.execute('COMMIT')
+    return cohort_frame(records), last
+
+
+_cached = {}  # path -> (last interview rowid read, frame)
+_cached_lock = threading.Lock()
+
+
+def get_cohort(path: str) -> pd.DataFrame:
+    """The whole cohort, appending only interviews recorded since the previous call."""
+    with _cached_lock:
+        cached = _cached.get(path)
+    if cached is None:
+        frame, last = load_cohort(path)
+    else:
+        with closing(sqlite3.connect(path)) as conn:
+            if conn.execute('SELECT COALESCE(MAX(rowid), 0) FROM interviews').fetchone()[0] == cached[0]:
+                return cached[1]
+        new, last = load_cohort(path, after=cached[0])
+        if new.empty:  # only unscored interviews; just move the marker past them
+            frame = cached[1]
+        elif cached[1].empty:
+            frame = new
+        else:
+            # Concatenating categoricals with differing categories decodes them to objects, so
+            # those columns are merged with union_categoricals instead.
+            plain = [column for column in new.columns if column not in CATEGORY_COLUMNS]
+            frame = pd.concat([cached[1][plain], new[plain]], ignore_index=True)
+            for column in CATEGORY_COLUMNS:
+                frame[column] = union_categoricals([cached[1][column], new[column]])
+            frame = frame[list(new.columns)]
+    with _cached_lock:
+        _cached[path] = (last, frame)
+    return frame
+
+
+def filter_cohort(frame: pd.DataFrame, job_types: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    if not job_types:
+        return frame
+    return frame[frame['job_type'].isin(job_types)]
+
+
+def interview_scores(frame: pd.DataFrame) -> pd.DataFrame:
+    """One row per interview: mean scores, its candidate, job type, date and attempt number."""
+    grouped = frame.groupby('interview_id', observed=True, sort=False)
+    interviews = grouped[SCORE_COLUMNS].mean()
+    firsts = grouped[['user_id', 'job_type', 'completed_at']].first()
+    interviews = firsts.join(interviews).sort_values(['user_id', 'completed_at'])
+    interviews['attempt'] = interviews.groupby('user_id', observed=True).cumcount() + 1
+    return interviews.reset_index()
+
+
+def weakest_dimensions(frame: pd.DataFrame) -> pd.DataFrame:
+    """Per candidate: mean score per dimension, the weakest one and how far it trails their average."""
+    means = frame.groupby('user_id', observed=True)[list(HEARS_DIMENSIONS)].mean()
+    values = means.to_numpy()
+    weakest = np.argmin(values, axis=1)
+    result = means.round(2)
+    result['weakest'] = np.asarray(HEARS_DIMENSIONS)[weakest]
+    result['weakest_score'] = values[np.arange(len(values)), weakest]
+    result['gap'] = values.mean(axis=1) - result['weakest_score']
+    result['questions'] = frame.groupby('user_id', observed=True).size()
+    return result.sort_values('weakest_score')
+
+
+def weakest_dimension_counts(weakest: pd.DataFrame) -> pd.Series:
+    """How many candidates have each dimension as their weakest."""
+    return weakest['weakest'].value_counts().reindex(list(HEARS_DIMENSIONS), fill_value=0)
+
+
+def score_distribution(frame: pd.DataFrame, by: str = 'job_type', column: str = 'total',
+                       percentiles: Sequence[float] = PERCENTILES) -> pd.DataFrame:
+    """Percentiles of one score per group (rows) with the group's record count."""
+    grouped = frame.groupby(by, observed=True)[column]
+    table = grouped.quantile(list(percentiles)).unstack()
+    table.columns = [f"p{round(q * 100)}" for q in percentiles]
+    table.insert(0, 'mean', grouped.mean())
+    table.insert(0, 'records', grouped.size())
+    return table.sort_values('records', ascending=False)
+
+
+def improvement_curve(interviews: pd.DataFrame, column: str = 'total', max_attempt: int = 20) -> pd.DataFrame:
+    """Cohort percentiles of an interview score by attempt number (1st interview, 2nd, ...)."""
+    recent = interviews[interviews['attempt'] <= max_attempt]
+    table = recent.groupby('attempt')[column].quantile([0.25, 0.5, 0.75]).unstack()
+    table.columns = ['p25', 'median', 'p75']
+    table['candidates'] = recent.groupby('attempt').size()
+    return table
+
+
+def trend_fits(interviews: pd.DataFrame, columns: Sequence[str] = ('total',)) -> pd.DataFrame:
+    """Least-squares slope (points per interview) of each candidate's scores over their attempts.
+
+    Closed form over per-candidate sums, so every candidate and column is fitted
+    in one pass without a Python-level loop over groups.
+    """
+    columns = list(columns)
+    x = interviews['attempt'].to_numpy(dtype='float64')
+    ys = interviews[columns].to_numpy(dtype='float64')
+    sums = pd.DataFrame(np.column_stack([np.ones_like(x), x, x * x, ys, ys * x[:, None]]),
+                        index=interviews['user_id'].to_numpy())
+    grouped = sums.groupby(level=0, sort=False).sum()
+    totals = grouped.to_numpy()
+    n, sum_x, sum_xx = totals[:, 0], totals[:, 1], totals[:, 2]
+    sum_y, sum_xy = totals[:, 3:3 + len(columns)], totals[:, 3 + len(columns):]
+    denominator = (n * sum_xx - sum_x * sum_x)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        slopes = np.where(denominator > 0, (n[:, None] * sum_xy - sum_x[:, None] * sum_y) / denominator, np.nan)
+    result = pd.DataFrame(slopes, index=grouped.index, columns=[f"{column}_slope" for column in columns])
+    result.index.name = 'user_id'
+    result.insert(0, 'interviews', n.astype(int))
+    return result
+
+
+def cohort_overview(frame: pd.DataFrame, interviews: pd.DataFrame) -> Dict:
+    return {
+        'candidates': int(frame['user_id'].nunique()),
+        'interviews': len(interviews),
+        'questions': len(frame),
+        'median_total': float(frame['total'].median()) if len(frame) else None,
+        'dimension_means': frame[list(HEARS_DIMENSIONS)].mean().round(2).to_dict(),
+    }
@@ -0,0 +1,379 @@
+# Resume file processing - validation and text extraction for PDF, DOCX, DOC and TXT uploads
+# Kept free of Streamlit imports so batch tools and benchmarks can use it headlessly. Parsers
+# are imported lazily, after the upload's first bytes are sniffed, so rejected files never load them.
+
+import codecs
+import mmap
+import os
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from io import BytesIO, UnsupportedOperation
+from typing import Iterator, Optional
+from xml.etree import ElementTree
+
+from metrics import REGISTRY, timed
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+SNIFF_BYTES = 8192
+# Early structural limits, checked before any text is extracted
+MAX_PDF_PAGES = int(os.getenv('RESUME_MAX_PAGES', 100))
+MAX_ZIP_ENTRIES = int(os.getenv('RESUME_MAX_ZIP_ENTRIES', 1000))
+MAX_DOCX_XML_BYTES = int(os.getenv('RESUME_MAX_DOCX_XML_MB', 64)) * 1024 * 1024
+MAX_DOCX_BLOCKS = int(os.getenv('RESUME_MAX_BLOCKS', 20000))
+
+# Expected content signature per extension; mammoth only reads OOXML, so .doc must be a zip too
+EXPECTED_CONTENT = {'.pdf': 'pdf', '.docx': 'zip', '.doc': 'zip', '.txt': 'text'}
+CONTENT_NAMES = {'pdf': 'a PDF', 'zip': 'a Word (.docx) document', 'ole': 'a Word 97-2003 (.doc) document',
+                 'text': 'plain text', None: 'binary data'}
+
+
+class UploadRejected(ValueError):
+    """The upload breaks a content or size rule; the message is safe to show to the user."""
+
+    def __init__(self, message: str, reason: str):
+        super().__init__(message)
+        self.reason = reason
+
+
+class InMemoryUpload(BytesIO):
+    """Bytes with the `name`/`size` attributes of a Streamlit UploadedFile."""
+
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+class SpooledUpload:
+    """UploadedFile-like wrapper for a SpooledTemporaryFile (in memory until it grows, then on disk)."""
+
+    def __init__(self, file, name: str, size: int):
+        self.file = file
+        self.name = name
+        self.size = size
+
+    def __getattr__(self, attr):
+        return getattr(self.file, attr)
+
+
+def sniff_content(head) -> Optional[str]:
+    """Classify an upload from its first bytes: 'pdf', 'zip', 'ole', 'text' or None."""
+    head = bytes(head[:SNIFF_BYTES])
+    if b'%PDF-' in head[:1024]:  # the spec tolerates leading junk before the header
+        return 'pdf'
+    if head.startswith(b'PK\x03\x04'):
+        return 'zip'
+    if head.startswith(b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'):
+        return 'ole'
+    if b'\x00' not in head:
+        try:
+            codecs.getincrementaldecoder('utf-8')().decode(head, final=False)  # head may end mid-character
+            return 'text'
+        except UnicodeDecodeError:
+            pass
+    return None
+
+
+def read_head(upload, size: int = SNIFF_BYTES) -> bytes:
+    """First `size` bytes of an upload, leaving its position unchanged."""
+    position = upload.tell()
+    upload.seek(0)
+    head = upload.read(size)
+    upload.seek(position)
+    return head
+
+
+def _file_descriptor(raw) -> Optional[int]:
+    """The OS file behind `raw`, if it has one, without forcing an in-memory spool to disk."""
+    if isinstance(raw, tempfile.SpooledTemporaryFile) and raw.name is None:
+        return None  # still in memory, and fileno() would roll it over to disk
+    try:
+        return raw.fileno()
+    except (AttributeError, OSError, UnsupportedOperation):
+        return None
+
+
+@contextmanager
+def upload_view(upload):
+    """Memoryview of an upload's bytes, without copying them where the file allows.
+
+    An upload backed by a real file (e.g. a spooled upload that spilled to
+    disk) is viewed through an mmap. Anything else is read whole: a BytesIO
+    built from bytes (Streamlit's UploadedFile, InMemoryUpload) hands back
+    that same bytes object, and an in-memory spool is at most its spool size.
+    """
+    raw = getattr(upload, 'file', upload)
+    mapping = None
+    fd = _file_descriptor(raw)
+    if fd is not None:
+        raw.flush()
+        try:
+            mapping = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):  # empty or unmappable file
+            mapping = None
+    if mapping is not None:
+        view = memoryview(mapping)
+    else:
+        position = raw.tell()
+        raw.seek(0)
+        view = memoryview(raw.read())
+        raw.seek(position)
+    try:
+        yield view
+    finally:
+        view.release()
+        if mapping is not None:
+            mapping.close()
+
+
+def _count_rejection(error: UploadRejected):
+    REGISTRY.inc('resume_rejections', {'reason': error.reason}, help_text='Uploads refused by content or size limits')
+
+
+def check_content(file_name: str, head) -> None:
+    """Raise UploadRejected unless the extension is supported and `head` looks like that format."""
+    file_extension = os.path.splitext(file_name)[1].lower()
+    expected = EXPECTED_CONTENT.get(file_extension)
+    if expected is None:
+        raise UploadRejected(f"Unsupported file format. Please upload: {', '.join(EXPECTED_CONTENT)}", 'extension')
+    actual = sniff_content(head)
+    if actual == expected:
+        return
+    if actual == 'ole' and file_extension == '.doc':
+        raise UploadRejected("Legacy Word 97-2003 .doc files aren't supported. Please save as .docx or PDF.",
+                             'legacy_doc')
+    raise UploadRejected(f"File content doesn't match its {file_extension} extension "
+                         f"(it looks like {CONTENT_NAMES[actual]}).", 'content_mismatch')
+
+
+def check_docx_container(docx_file) -> None:
+    """Reject zips with too many entries or an oversized document.xml before anything is inflated."""
+    try:
+        with zipfile.ZipFile(docx_file) as archive:
+            entries = archive.infolist()
+            if len(entries) > MAX_ZIP_ENTRIES:
+                raise UploadRejected(f"Document has too many parts ({len(entries)} > {MAX_ZIP_ENTRIES}).",
+                                     'too_many_entries')
+            document = archive.getinfo('word/document.xml')
+            if document.file_size > MAX_DOCX_XML_BYTES:
+                raise UploadRejected("Document text is too large to process.", 'document_too_large')
+    except (zipfile.BadZipFile, KeyError) as e:
+        raise UploadRejected(f"Not a valid Word document: {e}", 'invalid_container')
+    finally:
+        docx_file.seek(0)
+
+
+W_NS = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+W_P, W_T, W_TAB, W_BR, W_CR = W_NS + 'p', W_NS + 't', W_NS + 'tab', W_NS + 'br', W_NS + 'cr'
+W_TBL, W_TR, W_TC, W_BODY = W_NS + 'tbl', W_NS + 'tr', W_NS + 'tc', W_NS + 'body'
+
+
+def iter_docx_blocks(docx_file) -> Iterator[str]:
+    """Yield body paragraphs and table rows ("cell | cell") of a DOCX in document order.
+
+    Parses word/document.xml incrementally straight out of the zip and clears
+    each finished top-level block, so memory stays flat however long the file is.
+    """
+    with zipfile.ZipFile(docx_file) as archive, archive.open('word/document.xml') as xml:
+        paragraphs = []  # text runs of open <w:p>, innermost last (text boxes nest)
+        cells = []       # paragraph texts of open <w:tc>
+        rows = []        # cell texts of open <w:tr>
+        body = None
+        
+        for event, elem in ElementTree.iterparse(xml, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == W_P:
+                    paragraphs.append([])
+                elif tag == W_TC:
+                    cells.append([])
+                elif tag == W_TR:
+                    rows.append([])
+                elif tag == W_BODY:
+                    body = elem
+                continue
+            
+            if tag == W_T:
+                if paragraphs and elem.text:
+                    paragraphs[-1].append(elem.text)
+            elif tag == W_TAB:
+                if paragraphs:
+                    paragraphs[-1].append('\t')
+            elif tag in (W_BR, W_CR):
+                # Page and column breaks are layout, not line breaks
+                if paragraphs and elem.get(W_NS + 'type', 'textWrapping') == 'textWrapping':
+                    paragraphs[-1].append('\n')
+            elif tag == W_P:
+                text = ''.join(paragraphs.pop())
+                if cells:
+                    cells[-1].append(text)
+                else:
+                    yield text
+            elif tag == W_TC:
+                cell = ' '.join(t for t in cells.pop() if t.strip())
+                if rows:
+                    rows[-1].append(cell)
+            elif tag == W_TR:
+                row = ' | '.join(c for c in rows.pop() if c)
+                if cells:
+                    cells[-1].append(row)  # nested table
+                elif row:
+                    yield row
+            
+            if body is not None and not paragraphs and not cells and not rows and tag in (W_P, W_TBL):
+                body.clear()  # drop finished top-level blocks
+
+
+# File Processing Functions
+class FileProcessor:
+    @staticmethod
+    def validate_file(uploaded_file) -> tuple[bool, str]:
+        """Validate uploaded file size, format and that its first bytes match the extension."""
+        if uploaded_file is None:
+            return False, "No file uploaded"
+        
+        if uploaded_file.size > MAX_UPLOAD_BYTES:
+            return False, f"File size ({uploaded_file.size / 1024 / 1024:.1f}MB) exceeds maximum allowed size (10MB)"
+        if uploaded_file.size == 0:
+            return False, "File is empty"
+        
+        try:
+            check_content(uploaded_file.name, read_head(uploaded_file))
+        except UploadRejected as e:
+            _count_rejection(e)
+            return False, str(e)
+        
+        return True, "File validated successfully"
+    
+    @staticmethod
+    def extract_text_from_pdf(pdf_file) -> str:
+        try:
+            import PyPDF2
+            
+            pdf_reader = PyPDF2.PdfReader(pdf_file)
+            if len(pdf_reader.pages) > MAX_PDF_PAGES:
+                raise UploadRejected(f"PDF has {len(pdf_reader.pages)} pages; resumes are limited to {MAX_PDF_PAGES}.",
+                                     'too_many_pages')
+            text = ""
+            for page in pdf_reader.pages:
+                text += page.extract_text() + "\n"
+            return text.strip()
+        except UploadRejected:
+            raise
+        except Exception as e:
+            raise Exception(f"Error reading PDF: {str(e)}")
+    
+    @staticmethod
+    def extract_text_from_docx(docx_file) -> str:
+        """Stream word/document.xml: paragraphs and table rows in document order."""
+        check_docx_container(docx_file)
+        try:
+            blocks = []
+            for block in iter_docx_blocks(docx_file):
+                if len(blocks) == MAX_DOCX_BLOCKS:
+                    raise UploadRejected(f"Document is too long (over {MAX_DOCX_BLOCKS} paragraphs).",
+                                         'too_many_blocks')
+                blocks.append(block)
+            return "\n".join(blocks).strip()
+        except (zipfile.BadZipFile, KeyError) as e:
+            raise Exception(f"Error reading DOCX: {str(e)}")
+        except ElementTree.ParseError:
+            # Unusual markup the streaming reader can't follow - let python-docx try
+            return FileProcessor.extract_text_from_docx_object_model(docx_file)
+    
+    @staticmethod
+    def extract_text_from_docx_object_model(docx_file) -> str:
+        """Previous python-docx path (body paragraphs only); kept as fallback and benchmark baseline."""
+        try:
+            from docx import Document
+            
+            docx_file.seek(0)
+            doc = Document(docx_file)
+            text = ""
+            for paragraph in doc.paragraphs:
+                text += paragraph.text + "\n"
+            return text.strip()
+        except Exception as e:
+            raise Exception(f"Error reading DOCX: {str(e)}")
+    
+    @staticmethod
+    def extract_text_from_doc(doc_file) -> str:
+        check_docx_container(doc_file)
+        try:
+            import mammoth
+            
+            result = mammoth.extract_raw_text(doc_file)
+            return result.value.strip()
+        except Exception as e:
+            raise Exception(f"Error reading DOC: {str(e)}")
+    
+    @staticmethod
+    def extract_text_from_txt(txt_file) -> str:
+        try:
+            with upload_view(txt_file) as view:
+                return str(view, 'utf-8').strip()  # decodes straight from the upload's buffer
+        except Exception as e:
+            raise Exception(f"Error reading TXT: {str(e)}")
+    
+    @classmethod
+    @timed('resume_processing',
+           input_size=lambda cls, uploaded_file: getattr(uploaded_file, 'size', 0) or 0,
+           output_size=lambda result: len(result[1]) if result[0] else 0)
+    def process_resume_file(cls, uploaded_file) -> tuple[bool, str]:
+        is_valid, message = cls.validate_file(uploaded_file)
+        if not is_valid:
+            return False, message
+        
+        try:
+            file_extension = os.path.splitext(uploaded_file.name)[1].lower()
+            
+            if file_extension == '.pdf':
+                text = cls.extract_text_from_pdf(uploaded_file)
+            elif file_extension == '.docx':
+                text = cls.extract_text_from_docx(uploaded_file)
+            elif file_extension == '.doc':
+                text = cls.extract_text_from_doc(uploaded_file)
+            elif file_extension == '.txt':
+                text = cls.extract_text_from_txt(uploaded_file)
+            else:
+                return False, "Unsupported file format"
+            
+            if len(text.strip()) < 50:
+                return False, "Resume appears to be empty or too short. Please upload a valid resume."
+            
+            return True, text
+        
+        except UploadRejected as e:
+            _count_rejection(e)
+            return False, str(e)
+        except Exception as e:
+            return False, f"Error processing file: {str(e)}"
+
+
+def process_resume_path(path: str, member: Optional[str] = None) -> tuple[bool, str]:
+    """process_resume_file for a file on disk or a member of a zip of resumes.
+
+    Module-level and picklable so bulk tools can run it in worker processes;
+    each worker opens the file itself, so only the text crosses back.
+    """
+    try:
+        if member is None:
+            size = os.path.getsize(path)
+            if size <= MAX_UPLOAD_BYTES:
+                with open(path, 'rb') as f:
+                    data = f.read(MAX_UPLOAD_BYTES + 1)
+        else:
+            with zipfile.ZipFile(path) as archive:
+                info = archive.getinfo(member)
+                size = info.file_size
+                if size <= MAX_UPLOAD_BYTES:  # declared size: rejects honest big members without inflating
+                    with archive.open(info) as f:
+                        data = f.read(MAX_UPLOAD_BYTES + 1)
+    except (OSError, zipfile.BadZipFile, KeyError) as e:
+        return False, f"Error reading file: {str(e)}"
+    if size > MAX_UPLOAD_BYTES:
+        return False, f"File size ({size / 1024 / 1024:.1f}MB) exceeds maximum allowed size (10MB)"
+    if len(data) > MAX_UPLOAD_BYTES:  # the zip header (or a file still being written) understated its size
+        return False, "File size exceeds maximum allowed size (10MB)"
+    return FileProcessor.process_resume_file(InMemoryUpload(data, os.path.basename(member or path)))
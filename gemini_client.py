@@ -0,0 +1,398 @@
+# Gemini client - question generation and HEARS feedback on top of the resilient call stack
+# Shared by the Streamlit app and headless tools; no Streamlit imports here.
+
+import asyncio
+import functools
+import json
+import itertools
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import google.generativeai as genai
+
+from jd_analysis import MIN_DESCRIPTION_CHARS, description_key, get_default_jd_cache, parse_analysis
+from llm_resilience import CircuitOpenError, get_default_caller, is_retryable
+from llm_scheduler import SchedulerBusyError, inherit_priority
+from model_router import get_default_router
+from prompts import (build_individual_feedback_prompt, build_jd_analysis_prompt, build_overall_feedback_prompt,
+                     build_questions_prompt)
+from offline_llm import OfflineModel
+from llm_cassette import RecordingModel, ReplayModel, get_recorder, get_replay_cassette
+from metrics import observe_size, timed, track
+from usage_ledger import UsageQuotaError, get_default_usage_ledger, response_tokens
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_async_executor() -> ThreadPoolExecutor:
+    """Process-wide pool that runs the blocking client calls behind the async API."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv("GEMINI_ASYNC_WORKERS", 32)),
+                                           thread_name_prefix='gemini-async')
+        return _executor
+
+
+async def fan_out(calls: Iterable[Callable[[], Awaitable]], limit: int = 4, return_exceptions: bool = False) -> List:
+    """Await independent calls concurrently, at most `limit` at a time, results in input order.
+
+    Each call is a zero-argument callable returning an awaitable, so nothing
+    starts until it is admitted, e.g. `lambda: client.agenerate_questions(...)`.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def run(call):
+        async with semaphore:
+            return await call()
+
+    return await asyncio.gather(*(run(call) for call in calls), return_exceptions=return_exceptions)
+
+
+class GeminiConfigError(RuntimeError):
+    """Raised when the client cannot be configured (e.g. no API key)."""
+
+
+class GeminiClient:
+    def __init__(self, notify: Optional[Callable[[str, str], None]] = None, raise_errors: bool = False):
+        # GEMINI_BACKEND=offline swaps in a canned stand-in for load tests and local runs;
+        # GEMINI_BACKEND=replay serves a recorded cassette (GEMINI_CASSETTE) instead
+        self.backend = os.getenv("GEMINI_BACKEND", "gemini")
+        if self.backend == "replay":
+            try:
+                self.cassette = get_replay_cassette()
+            except (ValueError, OSError) as e:
+                raise GeminiConfigError(f"Cannot replay LLM traffic: {e}") from e
+        elif self.backend != "offline":
+            api_key = os.getenv("GEMINI_API_KEY")
+            if not api_key:
+                raise GeminiConfigError("Gemini API key not found! Please set GEMINI_API_KEY in your environment.")
+            
+            genai.configure(api_key=api_key)
+        # notify(level, message) surfaces degraded-mode notices; the UI maps it to st.warning/st.error
+        self.notify = notify
+        # raise_errors=True (the HTTP API) lets "try again later" and quota errors through instead of degrading
+        self.raised_errors = (SchedulerBusyError, CircuitOpenError, UsageQuotaError) if raise_errors else ()
+        self.caller = get_default_caller()
+        self.router = get_default_router()
+        self._models = {}
+        # Token accounting and quotas; the app sets who the calls are made for on each rerun
+        self.usage = get_default_usage_ledger()
+        self.user_id = ''
+        self.session_id = ''
+        # JD_ANALYSIS=0 always sends the raw job description
+        self.use_jd_analysis = os.getenv("JD_ANALYSIS", "1") != "0"
+    
+    def _get_model(self, model_name: str):
+        """Return a cached GenerativeModel for the routed model name."""
+        if model_name not in self._models:
+            if self.backend == "offline":
+                model = OfflineModel(model_name)
+            elif self.backend == "replay":
+                model = ReplayModel(model_name, self.cassette)
+            else:
+                model = genai.GenerativeModel(model_name)
+            # GEMINI_RECORD=path writes every call, whatever the backend, to a cassette
+            recorder = get_recorder()
+            self._models[model_name] = RecordingModel(model, model_name, recorder) if recorder else model
+        return self._models[model_name]
+    
+    def _notify(self, level: str, message: str):
+        if self.notify:
+            self.notify(level, message)
+        else:
+            logger.log(logging.ERROR if level == 'error' else logging.WARNING, message)
+    
+    def _generate(self, operation: str, prompt: str):
+        """Call the routed model under the operation's deadline, retry and hedging policy."""
+        user_id, session_id = self.user_id, self.session_id
+        if self.usage is not None:
+            self.usage.check(user_id, session_id, operation)  # raises UsageQuotaError before any tokens are spent
+        failed = set()  # models that failed an earlier attempt of this call
+        billed = itertools.count()  # the first successful attempt counts as the request; hedges only add tokens
+        
+        observe_size('llm_attempt', 'input', len(prompt), operation=operation)
+        
+        def attempt(timeout: float):
+            # Routed per attempt so a retry fails over instead of repeating the failing model
+            model_name = self.router.choose(operation, exclude=failed)
+            model = self._get_model(model_name)
+            started = time.monotonic()
+            try:
+                with track('llm_attempt', operation=operation, model=model_name):
+                    response = model.generate_content(prompt, request_options={'timeout': timeout})
+            except Exception as exc:
+                # A bad prompt or exhausted quota (non-retryable 4xx) says nothing about the model's health
+                if is_retryable(exc):
+                    failed.add(model_name)
+                    self.router.record(operation, model_name, time.monotonic() - started, ok=False)
+                raise
+            self.router.record(operation, model_name, time.monotonic() - started, ok=True)
+            observe_size('llm_attempt', 'output', len(response.text), operation=operation)
+            if self.usage is not None:  # every successful attempt's tokens are billed, hedges included
+                self.usage.record(user_id, session_id, operation, model_name, *response_tokens(response, prompt),
+                                  calls=int(next(billed) == 0))
+            return response
+        
+        return self.caller.call(operation, attempt)
+    
+    def job_summary(self, job_details: Dict) -> Optional[str]:
+        """Compact analysis of the job description to send instead of the raw text, if one is cached.
+
+        On a miss the analysis starts in the background at low priority and this
+        call returns None, so the prompt falls back to the raw description rather
+        than waiting; every later prompt for the same posting (any candidate)
+        gets the summary.
+        """
+        description = (job_details or {}).get('job_description') or ''
+        if not self.use_jd_analysis or len(description) < MIN_DESCRIPTION_CHARS:
+            return None
+        cache = get_default_jd_cache()
+        key = description_key(description)
+        analysis = cache.get(key)
+        if analysis is not None:
+            return analysis.to_prompt()
+        
+        def analyze():
+            try:
+                prompt = build_jd_analysis_prompt(job_details).text
+                return parse_analysis(key, self._generate('jd_analysis', prompt).text)
+            except Exception as e:
+                logger.warning("job description analysis failed; prompts keep the raw text: %s", e)
+                raise
+        
+        cache.compute(key, analyze, executor=get_async_executor())
+        return None
+    
+    @timed('gemini_method', method='generate_questions')
+    def generate_questions(self, resume_text: str, job_details: Dict, num_questions: int) -> List[str]:
+        """Generate behavioral interview questions based on resume and job details."""
+        prompt = build_questions_prompt(resume_text, job_details, num_questions, self.job_summary(job_details)).text
+        
+        try:
+            response = self._generate('questions', prompt)
+            questions_text = response.text.strip()
+            
+            # Clean up the response text
+            questions_text = questions_text.strip()
+            
+            # Remove any markdown formatting if present
+            if questions_text.startswith('```'):
+                lines = questions_text.split('\n')
+                questions_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else questions_text
+            
+            # Try to extract JSON array
+            start_idx = questions_text.find('[')
+            end_idx = questions_text.rfind(']') + 1
+            
+            if start_idx != -1 and end_idx > start_idx:
+                json_text = questions_text[start_idx:end_idx]
+                try:
+                    questions = json.loads(json_text)
+                    if isinstance(questions, list) and len(questions) >= num_questions:
+                        return questions[:num_questions]
+                    elif isinstance(questions, list):
+                        fallback = self._get_fallback_questions(num_questions - len(questions))
+                        return questions + fallback
+                except json.JSONDecodeError:
+                    pass
+            
+            # Enhanced fallback parsing
+            questions = []
+            lines = questions_text.split('\n')
+            
+            for line in lines:
+                line = line.strip()
+                if line.startswith('"') and line.endswith('",'):
+                    questions.append(line[1:-2])
+                elif line.startswith('"') and line.endswith('"'):
+                    questions.append(line[1:-1])
+                elif line.startswith('- '):
+                    questions.append(line[2:])
+                elif line.startswith(f'{len(questions)+1}.'):
+                    questions.append(line[len(f'{len(questions)+1}.'):].strip())
+            
+            if len(questions) < num_questions:
+                fallback_questions = self._get_fallback_questions(num_questions - len(questions))
+                questions.extend(fallback_questions)
+            
+            return questions[:num_questions]
+                
+        except self.raised_errors:
+            raise
+        except CircuitOpenError:
+            self._notify('warning', "⚠️ The AI service is temporarily degraded - using our standard behavioral question set.")
+            return self._get_fallback_questions(num_questions)
+        except UsageQuotaError as e:
+            self._notify('warning', f"⚠️ {e} Using our standard behavioral question set.")
+            return self._get_fallback_questions(num_questions)
+        except Exception as e:
+            self._notify('error', f"Error generating questions: {str(e)}")
+            return self._get_fallback_questions(num_questions)
+    
+    @timed('gemini_method', method='generate_individual_feedback')
+    def generate_individual_feedback(self, question: str, answer: str, job_details: Dict, question_number: int) -> Dict:
+        """Generate HEARS feedback for individual question - FIXED VERSION."""
+        if not answer or answer.strip() == "" or answer == "[Question Skipped]":
+            return {
+                'question_number': question_number,
+                'success': False,
+                'feedback': "**Question was skipped** - No feedback available for skipped questions.",
+                'error': None
+            }
+        
+        prompt = build_individual_feedback_prompt(question, answer, job_details, question_number).text
+        
+        try:
+            response = self._generate('individual_feedback', prompt)
+            feedback_text = response.text.strip()
+            
+            if not feedback_text or len(feedback_text) < 50:
+                return {
+                    'question_number': question_number,
+                    'success': False,
+                    'feedback': "**Unable to generate detailed feedback** - Response too short or empty.",
+                    'error': "Empty or insufficient feedback generated"
+                }
+            
+            return {
+                'question_number': question_number,
+                'success': True,
+                'feedback': feedback_text,
+                'error': None
+            }
+            
+        except self.raised_errors:
+            raise
+        except CircuitOpenError as e:
+            return {
+                'question_number': question_number,
+                'success': False,
+                'feedback': "**AI feedback is temporarily unavailable** - the analysis service is recovering from an outage. Please try again in a minute.",
+                'error': str(e)
+            }
+        except UsageQuotaError as e:
+            return {
+                'question_number': question_number,
+                'success': False,
+                'feedback': f"**AI feedback is unavailable** - {e}",
+                'error': str(e)
+            }
+        except Exception as e:
+            error_msg = str(e)
+            return {
+                'question_number': question_number,
+                'success': False,
+                'feedback': f"**Unable to generate feedback due to technical error:**\n\n*Error: {error_msg}*\n\nPlease try again or contact support if this issue persists.",
+                'error': error_msg
+            }
+    
+    @timed('gemini_method', method='generate_overall_feedback')
+    def generate_overall_feedback(self, all_responses: List, job_details: Dict) -> Dict:
+        """Generate comprehensive HEARS methodology feedback - FIXED VERSION."""
+        if not all_responses or len(all_responses) == 0:
+            return {
+                'success': False,
+                'feedback': "No interview responses available for analysis.",
+                'error': "Empty responses list"
+            }
+        
+        prompt = build_overall_feedback_prompt(all_responses, job_details, self.job_summary(job_details)).text
+        
+        try:
+            response = self._generate('overall_feedback', prompt)
+            feedback_text = response.text.strip()
+            
+            if not feedback_text or len(feedback_text) < 100:
+                return {
+                    'success': False,
+                    'feedback': "Unable to generate comprehensive feedback - response too short.",
+                    'error': "Insufficient feedback generated"
+                }
+            
+            return {
+                'success': True,
+                'feedback': feedback_text,
+                'error': None
+            }
+            
+        except self.raised_errors:
+            raise
+        except CircuitOpenError as e:
+            return {
+                'success': False,
+                'feedback': "**Overall feedback is temporarily unavailable** - the analysis service is recovering from an outage. Please try again in a minute.",
+                'error': str(e)
+            }
+        except UsageQuotaError as e:
+            return {
+                'success': False,
+                'feedback': f"**Overall feedback is unavailable** - {e}",
+                'error': str(e)
+            }
+        except Exception as e:
+            error_msg = str(e)
+            return {
+                'success': False,
+                'feedback': f"**Technical Error Generating Overall Feedback:**\n\n*Error: {error_msg}*\n\nPlease try refreshing the page or contact support.",
+                'error': error_msg
+            }
+    
+    def _get_fallback_questions(self, num_questions: int) -> List[str]:
+        """Fallback questions if API fails."""
+        fallback_questions = [
+            "Tell me about a time when you had to lead a team through a difficult project. What was your approach and what were the results?",
+            "Describe a situation where you had to solve a complex problem with limited resources. How did you handle it and what did you learn?",
+            "Can you share an example of when you had to work with a difficult team member or stakeholder? What actions did you take?",
+            "Tell me about a time when you had to adapt quickly to a significant change in your work environment. What was the outcome?",
+            "Describe a situation where you made a mistake. How did you handle it and what did you learn from the experience?",
+            "Give me an example of when you had to influence others without having direct authority over them. What was the result?",
+            "Tell me about a time when you had to work under tight deadlines. How did you prioritize and manage your time?",
+            "Describe a situation where you had to learn a new skill quickly to complete a project. What was the impact?",
+            "Can you share an example of when you had to give difficult feedback to a colleague? How did you approach it?",
+            "Tell me about a time when you had to make a decision with incomplete information. What was the outcome?",
+            "Describe a situation where you had to manage competing priorities from different stakeholders. How did you handle it?",
+            "Give me an example of when you went above and beyond what was expected in your role. What were the results?"
+        ]
+        
+        return fallback_questions[:num_questions]
+    
+    # Async API - same implementation as the sync methods, run on the shared executor.
+    # Calls keep the caller's scheduler priority (e.g. background_priority()).
+    async def _in_executor(self, method: Callable, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_async_executor(), inherit_priority(functools.partial(method, *args)))
+    
+    async def agenerate_questions(self, resume_text: str, job_details: Dict, num_questions: int) -> List[str]:
+        return await self._in_executor(self.generate_questions, resume_text, job_details, num_questions)
+    
+    async def agenerate_individual_feedback(self, question: str, answer: str, job_details: Dict, question_number: int) -> Dict:
+        return await self._in_executor(self.generate_individual_feedback, question, answer, job_details, question_number)
+    
+    async def agenerate_overall_feedback(self, all_responses: List, job_details: Dict) -> Dict:
+        return await self._in_executor(self.generate_overall_feedback, all_responses, job_details)
+    
+    async def agenerate_all_individual_feedback(self, responses: List[Dict], job_details: Dict, concurrency: int = 4) -> List[Dict]:
+        """Score every response concurrently; results follow the order of `responses`."""
+        return await fan_out(
+            [functools.partial(self.agenerate_individual_feedback, r['question'], r['answer'], job_details,
+                               r.get('question_number', i + 1))
+             for i, r in enumerate(responses)],
+            limit=concurrency,
+        )
+    
+    def submit_individual_feedback(self, question: str, answer: str, job_details: Dict, question_number: int) -> Future:
+        """Start generate_individual_feedback on the shared executor without waiting for it."""
+        return get_async_executor().submit(
+            inherit_priority(self.generate_individual_feedback), question, answer, job_details, question_number)
+    
+    def generate_all_individual_feedback(self, responses: List[Dict], job_details: Dict, concurrency: int = 4) -> List[Dict]:
+        """Blocking wrapper for callers without an event loop (the Streamlit script thread)."""
+        return asyncio.run(self.agenerate_all_individual_feedback(responses, job_details, concurrency))
@@ -0,0 +1,211 @@
+# Practice history - append-only SQLite log of finished interviews with per-user running aggregates
+# Aggregates are folded in on each write, so a user's progress loads as one row however long their history is.
+
+import json
+import os
+import re
+import sqlite3
+import threading
+from contextlib import closing
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+HEARS_DIMENSIONS = ('headline', 'events', 'actions', 'results', 'significance')
+RECENT_INTERVIEWS = 10
+TREND_SMOOTHING = 0.3  # weight of the newest interview in the score trend
+MAX_USER_ID_CHARS = 100
+
+_DIMENSION_HEADING = re.compile(r'\((Headline|Events|Actions|Results|Significance)\)', re.IGNORECASE)
+_DIMENSION_SCORE = re.compile(r'Score:\**\s*(\d+(?:\.\d+)?)\s*/\s*10\b')
+_TOTAL_SCORE = re.compile(r'Total HEARS Score:\**\s*(\d+(?:\.\d+)?)\s*/\s*50\b')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interviews (
+    interview_id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    completed_at TEXT NOT NULL,
+    job_title TEXT,
+    company_name TEXT,
+    duration_minutes INTEGER,
+    questions INTEGER NOT NULL,
+    answered INTEGER NOT NULL,
+    scored INTEGER NOT NULL,
+    score REAL
+);
+CREATE INDEX IF NOT EXISTS interviews_by_user ON interviews (user_id, completed_at);
+CREATE TABLE IF NOT EXISTS question_scores (
+    interview_id TEXT NOT NULL,
+    question_number INTEGER NOT NULL,
+    question TEXT,
+    skipped INTEGER NOT NULL,
+    seconds REAL,
+    answer_chars INTEGER,
+    headline REAL, events REAL, actions REAL, results REAL, significance REAL, total REAL,
+    PRIMARY KEY (interview_id, question_number)
+);
+CREATE TABLE IF NOT EXISTS user_progress (
+    user_id TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def parse_hears_scores(feedback: str) -> Optional[Dict[str, float]]:
+    """Per-dimension scores (/10) and total (/50) from HEARS feedback markdown; None if any is missing."""
+    scores, current = {}, None
+    for line in (feedback or '').splitlines():
+        heading = _DIMENSION_HEADING.search(line)
+        if heading:
+            current = heading.group(1).lower()
+            continue
+        score = _DIMENSION_SCORE.search(line)
+        if score and current and current not in scores:
+            scores[current] = float(score.group(1))
+            current = None
+    if len(scores) != len(HEARS_DIMENSIONS):
+        return None
+    total = _TOTAL_SCORE.search(feedback)
+    scores['total'] = float(total.group(1)) if total else sum(scores.values())
+    return scores
+
+
+def normalize_user_id(value: str) -> str:
+    return ' '.join((value or '').split()).casefold()[:MAX_USER_ID_CHARS]
+
+
+def _empty_progress() -> Dict:
+    return {
+        'interviews': 0, 'questions': 0, 'answered': 0, 'scored': 0, 'scored_interviews': 0,
+        'timed': 0, 'answer_seconds': 0.0, 'sums': {name: 0.0 for name in HEARS_DIMENSIONS + ('total',)},
+        'best_score': None, 'last_score': None, 'trend': None, 'recent': [], 'first_at': None, 'last_at': None,
+    }
+
+
+def fold_interview(progress: Dict, completed_at: str, rows: List[Dict], score: Optional[float]) -> Dict:
+    """Add one interview's question rows to a user's running aggregates (in place)."""
+    progress['interviews'] += 1
+    progress['questions'] += len(rows)
+    for row in rows:
+        if not row['skipped']:
+            progress['answered'] += 1
+        if row['seconds'] is not None:
+            progress['timed'] += 1
+            progress['answer_seconds'] += row['seconds']
+        if row['total'] is not None:
+            progress['scored'] += 1
+            for name in progress['sums']:
+                progress['sums'][name] += row[name]
+    if score is not None:
+        progress['scored_interviews'] += 1
+        progress['best_score'] = score if progress['best_score'] is None else max(progress['best_score'], score)
+        progress['last_score'] = score
+        progress['trend'] = score if progress['trend'] is None else (
+            TREND_SMOOTHING * score + (1 - TREND_SMOOTHING) * progress['trend'])
+        progress['recent'] = (progress['recent'] + [[completed_at, round(score, 2)]])[-RECENT_INTERVIEWS:]
+    progress['first_at'] = progress['first_at'] or completed_at
+    progress['last_at'] = completed_at
+    return progress
+
+
+class HistoryStore:
+    """Finished interviews per user in one SQLite file; rows are only ever inserted.
+
+    Each `record` writes the interview, its per-question HEARS scores and the
+    user's updated aggregates in one transaction, so `progress` is a single
+    primary-key read.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def record(self, user_id: str, session, resolve: Callable = lambda value: value,
+               completed_at: Optional[str] = None) -> bool:
+        """Append a finished InterviewSession for `user_id`; False if that interview is already stored."""
+        user_id = normalize_user_id(user_id)
+        if not user_id:
+            raise ValueError("a user id is required to record practice history")
+        completed_at = completed_at or datetime.now().isoformat(timespec='seconds')
+
+        rows = []
+        for response in session.question_responses:
+            feedback = session.individual_feedback.get(response.question_number)
+            scores = None
+            if feedback is not None and feedback.success and not response.skipped:
+                scores = parse_hears_scores(resolve(feedback.feedback))
+            row = {'question_number': response.question_number, 'question': response.question,
+                   'skipped': response.skipped, 'seconds': response.seconds,
+                   'answer_chars': 0 if response.skipped else len(response.answer)}
+            row.update(scores or dict.fromkeys(HEARS_DIMENSIONS + ('total',)))
+            rows.append(row)
+        totals = [row['total'] for row in rows if row['total'] is not None]
+        score = sum(totals) / len(totals) if totals else None
+
+        with closing(self._connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                inserted = conn.execute(
+                    'INSERT OR IGNORE INTO interviews VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (session.interview_id, user_id, completed_at, session.job_details.get('job_title'),
+                     session.job_details.get('company_name'), session.interview_duration, len(rows),
+                     sum(1 for row in rows if not row['skipped']), len(totals), score)).rowcount
+                if not inserted:
+                    conn.execute('ROLLBACK')
+                    return False
+                conn.executemany(
+                    'INSERT INTO question_scores VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    [(session.interview_id, row['question_number'], row['question'], int(row['skipped']),
+                      row['seconds'], row['answer_chars'], *(row[name] for name in HEARS_DIMENSIONS), row['total'])
+                     for row in rows])
+                stored = conn.execute('SELECT data FROM user_progress WHERE user_id = ?', (user_id,)).fetchone()
+                progress = json.loads(stored['data']) if stored else _empty_progress()
+                fold_interview(progress, completed_at, rows, score)
+                conn.execute('INSERT OR REPLACE INTO user_progress VALUES (?, ?)',
+                             (user_id, json.dumps(progress, separators=(',', ':'))))
+                conn.execute('COMMIT')
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+        return True
+
+    def progress(self, user_id: str) -> Optional[Dict]:
+        """A user's aggregates with averages worked out; None before their first recorded interview."""
+        with closing(self._connect()) as conn:
+            stored = conn.execute('SELECT data FROM user_progress WHERE user_id = ?',
+                                  (normalize_user_id(user_id),)).fetchone()
+        if stored is None:
+            return None
+        progress = json.loads(stored['data'])
+        scored = progress['scored']
+        progress['averages'] = {name: value / scored for name, value in progress['sums'].items()} if scored else {}
+        progress['average_seconds'] = progress['answer_seconds'] / progress['timed'] if progress['timed'] else None
+        return progress
+
+    def interviews(self, user_id: str, limit: int = 20) -> List[Dict]:
+        """The user's most recent interviews, newest first."""
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT * FROM interviews WHERE user_id = ? ORDER BY completed_at DESC LIMIT ?',
+                                (normalize_user_id(user_id), limit)).fetchall()
+        return [dict(row) for row in rows]
+
+
+_default_store = None
+_default_store_lock = threading.Lock()
+
+
+def get_default_history_store() -> Optional[HistoryStore]:
+    """Process-wide store at PRACTICE_HISTORY_DB; PRACTICE_HISTORY=0 turns history off (None)."""
+    global _default_store
+    if os.getenv('PRACTICE_HISTORY', '1') == '0':
+        return None
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = HistoryStore(os.getenv('PRACTICE_HISTORY_DB', 'practice_history.sqlite3'))
+        return _default_store
@@ -0,0 +1,230 @@
+# Job description analysis - one compact reading of each posting, shared by every candidate practicing for it
+# Keyed by a normalized hash of the description; kept in a process-wide LRU and optionally on disk (JD_CACHE_DIR).
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Shorter descriptions cost fewer tokens than their analysis saves, so they are sent as-is
+MIN_DESCRIPTION_CHARS = 600
+MAX_COMPETENCIES = 8
+MAX_KEY_PHRASES = 10
+MAX_ITEM_CHARS = 80
+
+
+class JDAnalysis:
+    """Required competencies, seniority signals and key phrases extracted from one job description."""
+    __slots__ = ('key', 'competencies', 'seniority', 'key_phrases')
+
+    def __init__(self, key: str, competencies: List[str], seniority: str, key_phrases: List[str]):
+        self.key = key
+        self.competencies = competencies
+        self.seniority = seniority
+        self.key_phrases = key_phrases
+
+    def to_prompt(self) -> str:
+        """Compact stand-in for the raw description inside question and feedback prompts."""
+        parts = [f"Seniority: {self.seniority}." if self.seniority else '']
+        if self.competencies:
+            parts.append(f"Required competencies: {', '.join(self.competencies)}.")
+        if self.key_phrases:
+            parts.append(f"Key phrases: {'; '.join(self.key_phrases)}.")
+        return ' '.join(part for part in parts if part)
+
+    def to_dict(self) -> Dict:
+        return {'key': self.key, 'competencies': self.competencies, 'seniority': self.seniority,
+                'key_phrases': self.key_phrases}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'JDAnalysis':
+        return cls(data['key'], list(data['competencies']), data['seniority'], list(data['key_phrases']))
+
+
+def normalize_description(text: str) -> str:
+    """Case, Unicode form and whitespace differences don't make a different posting."""
+    text = unicodedata.normalize('NFKC', text or '').casefold()
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def description_key(text: str) -> str:
+    return hashlib.blake2b(normalize_description(text).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _clean_items(value, limit: int) -> List[str]:
+    if not isinstance(value, list):
+        raise ValueError("expected a list of strings")
+    items = []
+    for item in value:
+        if isinstance(item, str) and item.strip() and len(items) < limit:
+            items.append(item.strip()[:MAX_ITEM_CHARS])
+    return items
+
+
+def parse_analysis(key: str, response_text: str) -> JDAnalysis:
+    """Read the model's JSON object; raises ValueError if it is missing or malformed."""
+    start, end = response_text.find('{'), response_text.rfind('}') + 1
+    if start == -1 or end <= start:
+        raise ValueError("no JSON object in the analysis response")
+    data = json.loads(response_text[start:end])
+    seniority = data.get('seniority')
+    analysis = JDAnalysis(
+        key,
+        competencies=_clean_items(data.get('competencies'), MAX_COMPETENCIES),
+        seniority=seniority.strip()[:MAX_ITEM_CHARS] if isinstance(seniority, str) else '',
+        key_phrases=_clean_items(data.get('key_phrases'), MAX_KEY_PHRASES),
+    )
+    if not analysis.competencies:
+        raise ValueError("analysis has no competencies")
+    return analysis
+
+
+class JDAnalysisCache:
+    """LRU of analyses by description key. Concurrent misses for one key share a single computation.
+
+    A failed analysis is remembered for `failure_backoff` seconds, during which
+    `compute` fails fast instead of calling the model again.
+    """
+
+    def __init__(self, max_entries: int = 512, directory: Optional[str] = None, failure_backoff: float = 60.0):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.failure_backoff = failure_backoff
+        self._entries = OrderedDict()
+        self._inflight = {}  # key -> Future of the running analysis
+        self._failed = OrderedDict()  # key -> (monotonic time to retry after, exception)
+        self._stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'failures': 0, 'backed_off': 0}
+        self._lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def _remember(self, analysis: JDAnalysis):
+        with self._lock:
+            self._entries[analysis.key] = analysis
+            self._entries.move_to_end(analysis.key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[JDAnalysis]:
+        with self._lock:
+            analysis = self._entries.get(key)
+            if analysis is not None:
+                self._entries.move_to_end(key)
+                self._stats['hits'] += 1
+                return analysis
+        if self.directory:
+            try:
+                with open(self._path(key), encoding='utf-8') as f:
+                    analysis = JDAnalysis.from_dict(json.load(f))
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError) as e:
+                logger.warning("ignoring unreadable cached analysis %s: %s", key, e)
+            else:
+                self._remember(analysis)
+                with self._lock:
+                    self._stats['disk_hits'] += 1
+                return analysis
+        with self._lock:
+            self._stats['misses'] += 1
+        return None
+
+    def put(self, analysis: JDAnalysis):
+        self._remember(analysis)
+        if self.directory:
+            path = self._path(analysis.key)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(analysis.to_dict(), f)
+            os.replace(tmp_path, path)
+
+    def compute(self, key: str, analyze: Callable[[], JDAnalysis], executor=None) -> Future:
+        """Run `analyze` for `key` (on `executor` if given) unless it is already running or done.
+
+        Within the failure backoff of a failed attempt the returned future
+        already holds that failure, so callers keep using the raw description.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = Future()
+            if key in self._entries:  # finished while this caller was deciding to start it
+                future.set_result(self._entries[key])
+                return future
+            failed = self._failed.get(key)
+            if failed is not None and failed[0] > time.monotonic():
+                self._stats['backed_off'] += 1
+                future.set_exception(failed[1])
+                return future
+            self._inflight[key] = future
+
+        def run():
+            try:
+                analysis = analyze()
+            except BaseException as e:
+                with self._lock:
+                    self._stats['failures'] += 1
+                    self._inflight.pop(key, None)
+                    self._failed[key] = (time.monotonic() + self.failure_backoff, e)
+                    self._failed.move_to_end(key)
+                    while len(self._failed) > self.max_entries:
+                        self._failed.popitem(last=False)
+                future.set_exception(e)
+            else:
+                self.put(analysis)
+                with self._lock:
+                    self._inflight.pop(key, None)
+                    self._failed.pop(key, None)
+                future.set_result(analysis)
+
+        if executor is None:
+            run()
+        else:
+            executor.submit(run)
+        return future
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries), inflight=len(self._inflight))
+
+    def metric_samples(self):
+        stats = self.stats()
+        return [
+            ('jd_analysis_cache_entries', 'gauge', 'Job description analyses held in memory', {}, stats['entries']),
+            ('jd_analysis_failures_total', 'counter', 'Job description analyses that failed', {}, stats['failures']),
+            ('jd_analysis_backed_off_total', 'counter', 'Analyses not retried within the failure backoff', {},
+             stats['backed_off']),
+        ] + [
+            ('jd_analysis_cache_lookups_total', 'counter', 'Job description analysis lookups by outcome',
+             {'outcome': outcome}, stats[outcome])
+            for outcome in ('hits', 'disk_hits', 'misses')
+        ]
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_jd_cache() -> JDAnalysisCache:
+    """Process-wide cache; JD_CACHE_SIZE sets the LRU size, JD_CACHE_DIR adds a shared on-disk copy
+    and JD_FAILURE_BACKOFF the seconds before a failed analysis is retried."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = JDAnalysisCache(max_entries=int(os.getenv('JD_CACHE_SIZE', 512)),
+                                             directory=os.getenv('JD_CACHE_DIR') or None,
+                                             failure_backoff=float(os.getenv('JD_FAILURE_BACKOFF', 60)))
+        return _default_cache
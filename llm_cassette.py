@@ -0,0 +1,380 @@
+# LLM cassettes - record generate_content traffic with its timing, replay it offline and deterministically
+# GEMINI_RECORD=path wraps whichever backend is live; GEMINI_BACKEND=replay with GEMINI_CASSETTE=path serves it back.
+"""Record/replay of Gemini calls for benchmarks and regression runs.
+
+A cassette is gzip-compressed JSON lines, one interaction per line: the
+model, the prompt (and its hash), the request timeout, the response text as
+timed chunks, usage metadata, total latency and any error. Cassettes hold
+full prompts, resume text included, so treat them like production data.
+
+Replay matches a prompt by its hash and serves that prompt's recordings in
+recorded order, wrapping around when they run out. Prompts that were never
+recorded fall back to a recording of the same template (first line of the
+prompt, digits ignored) unless GEMINI_CASSETTE_STRICT=1.
+GEMINI_CASSETTE_SPEED=1 replays at recorded speed, 2 twice as fast, and 0
+(the default) returns immediately.
+
+    GEMINI_RECORD=traffic.jsonl.gz streamlit run app.py
+    GEMINI_BACKEND=replay GEMINI_CASSETTE=traffic.jsonl.gz python benchmarks/load_test.py
+    python llm_cassette.py traffic.jsonl.gz     # what's in it
+"""
+
+import atexit
+import builtins
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CASSETTE_VERSION = 1
+USAGE_FIELDS = ('prompt_token_count', 'candidates_token_count', 'total_token_count')
+
+
+class CassetteMiss(LookupError):
+    """Replay found no recording for a prompt."""
+
+
+class ReplayedError(Exception):
+    """A recorded failure served back; `code` keeps the original status so retries behave the same."""
+
+    def __init__(self, message: str, code: Optional[int] = None, original_type: str = ''):
+        super().__init__(message)
+        self.code = code
+        self.original_type = original_type
+
+
+def replayed_error(error: Dict) -> Exception:
+    """The exception to raise for a recorded failure.
+
+    Timeouts and connection errors carry no status code, so they come back as
+    their built-in type (e.g. ConnectionResetError) for is_retryable to see.
+    """
+    original = getattr(builtins, error.get('type', ''), None)
+    if isinstance(original, type) and issubclass(original, (TimeoutError, ConnectionError)):
+        return original(error['message'])
+    return ReplayedError(error['message'], error.get('code'), error.get('type', ''))
+
+
+def prompt_text(prompt) -> str:
+    return prompt if isinstance(prompt, str) else str(prompt)
+
+
+def prompt_key(text: str) -> str:
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def template_key(text: str) -> str:
+    """The prompt's first line with digits masked, e.g. one key for every questions prompt."""
+    first = next((line.strip() for line in text.splitlines() if line.strip()), '')
+    return re.sub(r'\d+', '#', first.casefold())[:120]
+
+
+def _usage(response) -> Optional[Dict[str, int]]:
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is None:
+        return None
+    return {field: int(getattr(usage, field, 0) or 0) for field in USAGE_FIELDS}
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    code = getattr(exc, 'code', None)
+    code = getattr(code, 'value', code)
+    return code if isinstance(code, int) else None
+
+
+# Recording
+
+class CassetteWriter:
+    """Appends interactions to a cassette; one writer per file, shared by all threads."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = gzip.open(path, 'at', encoding='utf-8')
+        atexit.register(self.close)
+
+    def write(self, entry: Dict):
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line)
+                self._file.flush()  # sync-flushed, so a crash loses at most the line being written
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_recorder() -> Optional[CassetteWriter]:
+    """Process-wide writer for GEMINI_RECORD, or None when not recording."""
+    path = os.getenv('GEMINI_RECORD')
+    if not path:
+        return None
+    with _writers_lock:
+        if path not in _writers:
+            _writers[path] = CassetteWriter(path)
+        return _writers[path]
+
+
+class RecordingModel:
+    """Passes generate_content through to `model` and writes each call to the cassette."""
+
+    def __init__(self, model, model_name: str, writer: CassetteWriter):
+        self.model = model
+        self.model_name = model_name
+        self.writer = writer
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        text = prompt_text(prompt)
+        entry = {
+            'v': CASSETTE_VERSION, 'model': self.model_name, 'key': prompt_key(text), 'template': template_key(text),
+            'prompt': text, 'timeout': (request_options or {}).get('timeout'), 'stream': bool(kwargs.get('stream')),
+            'recorded_at': round(time.time(), 3),
+        }
+        started = time.monotonic()
+        try:
+            response = self.model.generate_content(prompt, request_options=request_options, **kwargs)
+        except Exception as e:
+            self._finish(entry, started, [], None, e)
+            raise
+        if entry['stream']:
+            return _RecordingStream(self, response, entry, started)
+        self._finish(entry, started, [[round(time.monotonic() - started, 4), response.text]], _usage(response))
+        return response
+
+    def _finish(self, entry: Dict, started: float, chunks: List, usage: Optional[Dict],
+                error: Optional[BaseException] = None):
+        entry['latency'] = round(time.monotonic() - started, 4)
+        entry['chunks'] = chunks
+        entry['usage'] = usage
+        if error is not None:
+            entry['error'] = {'type': type(error).__name__, 'message': str(error), 'code': _status_code(error)}
+        try:
+            self.writer.write(entry)
+        except Exception as e:  # a full disk must not fail the user's request
+            logger.warning("could not record LLM call to %s: %s", self.writer.path, e)
+
+
+class _RecordingStream:
+    """A streamed response that notes each chunk's arrival time as the caller iterates it."""
+
+    def __init__(self, recorder: RecordingModel, response, entry: Dict, started: float):
+        self._recorder = recorder
+        self._response = response
+        self._entry = entry
+        self._started = started
+        self._chunks = []
+        self._done = False
+
+    def __iter__(self):
+        try:
+            for chunk in self._response:
+                self._chunks.append([round(time.monotonic() - self._started, 4), chunk.text])
+                yield chunk
+        except Exception as e:
+            self._finish(e)
+            raise
+        self._finish()
+
+    def _finish(self, error: Optional[BaseException] = None):
+        if not self._done:
+            self._done = True
+            self._recorder._finish(self._entry, self._started, self._chunks, _usage(self._response), error)
+
+    def resolve(self):
+        for _ in self:
+            pass
+
+    def __getattr__(self, name):
+        return getattr(self._response, name)
+
+
+# Replay
+
+def read_cassette(path: str) -> List[Dict]:
+    """Every complete interaction in a cassette; a torn last line (crash while recording) is skipped."""
+    entries = []
+    try:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except json.JSONDecodeError:
+                    break
+    except (EOFError, zlib.error, gzip.BadGzipFile) as e:
+        logger.warning("cassette %s ends early (%s); using %d complete interactions", path, e, len(entries))
+    return entries
+
+
+class Cassette:
+    """Recorded interactions indexed by prompt hash and by template, with a replay cursor per key."""
+
+    def __init__(self, entries: List[Dict]):
+        self.entries = entries
+        self._by_key = {}
+        self._by_template = {}
+        for entry in entries:
+            self._by_key.setdefault(entry['key'], []).append(entry)
+            self._by_template.setdefault(entry['template'], []).append(entry)
+        self._cursors = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def load(cls, path: str) -> 'Cassette':
+        return cls(read_cassette(path))
+
+    def _next(self, index: Dict, key: str) -> Optional[Dict]:
+        recordings = index.get(key)
+        if not recordings:
+            return None
+        cursor = self._cursors.get(key, 0)
+        self._cursors[key] = cursor + 1
+        return recordings[cursor % len(recordings)]
+
+    def lookup(self, text: str, strict: bool = False) -> Dict:
+        with self._lock:
+            entry = self._next(self._by_key, prompt_key(text))
+            if entry is not None:
+                self.hits += 1
+                return entry
+            if not strict:
+                entry = self._next(self._by_template, template_key(text))
+                if entry is not None:
+                    self.fallbacks += 1
+                    return entry
+        raise CassetteMiss(f"no recording for prompt {prompt_key(text)} ({template_key(text)[:60]!r})")
+
+
+_cassettes = {}
+_cassettes_lock = threading.Lock()
+
+
+def get_replay_cassette() -> Cassette:
+    """Process-wide cassette loaded from GEMINI_CASSETTE."""
+    path = os.getenv('GEMINI_CASSETTE')
+    if not path:
+        raise ValueError("GEMINI_BACKEND=replay needs GEMINI_CASSETTE set to a recorded cassette")
+    with _cassettes_lock:
+        if path not in _cassettes:
+            _cassettes[path] = Cassette.load(path)
+        return _cassettes[path]
+
+
+class ReplayModel:
+    """Drop-in for genai.GenerativeModel.generate_content that serves a cassette."""
+
+    def __init__(self, model_name: str, cassette: Cassette, speed: float = None, strict: bool = None):
+        self.model_name = model_name
+        self.cassette = cassette
+        self.speed = float(os.getenv('GEMINI_CASSETTE_SPEED', 0)) if speed is None else speed
+        self.strict = os.getenv('GEMINI_CASSETTE_STRICT') == '1' if strict is None else strict
+
+    def _wait(self, seconds: float, timeout: Optional[float], waited: float = 0.0) -> float:
+        """Sleep until `seconds` into the call at replay speed; raise like a real timeout past `timeout`."""
+        if self.speed <= 0:
+            return waited
+        target = seconds / self.speed
+        if timeout is not None and target > timeout:
+            time.sleep(max(0.0, timeout - waited))
+            raise TimeoutError(f"replayed call exceeded {timeout:.1f}s")
+        time.sleep(max(0.0, target - waited))
+        return target
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        entry = self.cassette.lookup(prompt_text(prompt), self.strict)
+        timeout = (request_options or {}).get('timeout')
+        if kwargs.get('stream'):
+            return _ReplayStream(self, entry, timeout)
+        self._wait(entry.get('latency', 0.0), timeout)
+        if entry.get('error'):
+            raise replayed_error(entry['error'])
+        return _replayed_response(entry)
+
+
+def _replayed_response(entry: Dict, text: Optional[str] = None) -> SimpleNamespace:
+    usage = entry.get('usage')
+    return SimpleNamespace(
+        text=''.join(chunk for _, chunk in entry['chunks']) if text is None else text,
+        usage_metadata=SimpleNamespace(**usage) if usage else None,
+    )
+
+
+class _ReplayStream:
+    """Yields the recorded chunks, spaced as recorded when replaying at speed."""
+
+    def __init__(self, model: ReplayModel, entry: Dict, timeout: Optional[float]):
+        self._model = model
+        self._entry = entry
+        self._timeout = timeout
+        self.text = ''.join(chunk for _, chunk in entry['chunks'])
+        self.usage_metadata = _replayed_response(entry).usage_metadata
+
+    def __iter__(self) -> Iterator[SimpleNamespace]:
+        waited = 0.0
+        for offset, chunk in self._entry['chunks']:
+            waited = self._model._wait(offset, self._timeout, waited)
+            yield SimpleNamespace(text=chunk)
+        if self._entry.get('error'):
+            self._model._wait(self._entry.get('latency', 0.0), self._timeout, waited)
+            raise replayed_error(self._entry['error'])
+
+    def resolve(self):
+        for _ in self:
+            pass
+
+
+def summarize(entries: List[Dict]) -> List[Dict]:
+    """Per template: calls, errors, latency percentiles and payload sizes."""
+    groups = {}
+    for entry in entries:
+        groups.setdefault(entry['template'], []).append(entry)
+    rows = []
+    for template, group in sorted(groups.items(), key=lambda item: -len(item[1])):
+        latencies = sorted(entry.get('latency', 0.0) for entry in group)
+        rows.append({
+            'template': template[:60],
+            'calls': len(group),
+            'errors': sum(1 for entry in group if entry.get('error')),
+            'p50_s': latencies[len(latencies) // 2],
+            'p95_s': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+            'prompt_chars': sum(len(entry['prompt']) for entry in group) // len(group),
+            'response_chars': sum(len(chunk) for entry in group for _, chunk in entry['chunks']) // len(group),
+            'tokens': sum((entry.get('usage') or {}).get('total_token_count', 0) for entry in group),
+        })
+    return rows
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python llm_cassette.py CASSETTE", file=sys.stderr)
+        return 2
+    entries = read_cassette(argv[0])
+    print(f"{len(entries)} interactions in {argv[0]}")
+    for row in summarize(entries):
+        print(f"  {row['calls']:>5} calls  {row['errors']:>3} errors  p50 {row['p50_s']:6.2f}s  "
+              f"p95 {row['p95_s']:6.2f}s  in {row['prompt_chars']:>6} chars  out {row['response_chars']:>6} chars  "
+              f"{row['tokens']:>8} tokens  {row['template']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,434 @@
+# LLM call resilience - per-call deadlines, jittered retries, hedged requests and circuit breaking
+# Shared by every GeminiClient in the process so latency history and stats are global.
+
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+from llm_scheduler import RequestScheduler, SchedulerBusyError, get_default_scheduler
+
+# HTTP status codes worth retrying (google.api_core exceptions expose them as `.code`)
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+class CallTimeoutError(TimeoutError):
+    """Raised when an LLM call exceeds its attempt timeout or overall deadline."""
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without contacting the backend while the circuit breaker is open."""
+
+
+class CallPolicy:
+    """Deadline, retry and hedging settings for one GeminiClient operation."""
+
+    def __init__(self, attempt_timeout: float = 30.0, deadline: float = 90.0, max_attempts: int = 3,
+                 base_delay: float = 0.5, max_delay: float = 8.0, hedge: bool = False,
+                 hedge_initial_delay: float = 8.0, hedge_min_delay: float = 1.0,
+                 hedge_quantile: float = 0.95):
+        self.attempt_timeout = attempt_timeout
+        self.deadline = deadline
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge = hedge
+        self.hedge_initial_delay = hedge_initial_delay
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_quantile = hedge_quantile
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)."""
+        cap = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return random.uniform(0, cap)
+
+
+DEFAULT_POLICIES = {
+    'questions': CallPolicy(attempt_timeout=45.0, deadline=100.0, max_attempts=3),
+    'individual_feedback': CallPolicy(attempt_timeout=40.0, deadline=90.0, max_attempts=3),
+    'overall_feedback': CallPolicy(attempt_timeout=75.0, deadline=150.0, max_attempts=2),
+    'jd_analysis': CallPolicy(attempt_timeout=30.0, deadline=60.0, max_attempts=2),
+}
+
+
+def load_policies(env=None) -> Dict[str, CallPolicy]:
+    """Build per-operation policies, applying environment overrides.
+
+    Recognised variables (OP is QUESTIONS, INDIVIDUAL_FEEDBACK, OVERALL_FEEDBACK or JD_ANALYSIS):
+    GEMINI_<OP>_TIMEOUT, GEMINI_<OP>_DEADLINE, GEMINI_<OP>_MAX_ATTEMPTS, and
+    GEMINI_HEDGE_OPERATIONS as a comma-separated list of operations to hedge.
+    """
+    env = os.environ if env is None else env
+    hedged = {op.strip() for op in env.get('GEMINI_HEDGE_OPERATIONS', '').split(',') if op.strip()}
+    policies = {}
+    for operation, default in DEFAULT_POLICIES.items():
+        prefix = f"GEMINI_{operation.upper()}_"
+        policies[operation] = CallPolicy(
+            attempt_timeout=float(env.get(prefix + 'TIMEOUT', default.attempt_timeout)),
+            deadline=float(env.get(prefix + 'DEADLINE', default.deadline)),
+            max_attempts=int(env.get(prefix + 'MAX_ATTEMPTS', default.max_attempts)),
+            base_delay=default.base_delay,
+            max_delay=default.max_delay,
+            hedge=default.hedge or operation in hedged,
+            hedge_initial_delay=default.hedge_initial_delay,
+            hedge_min_delay=default.hedge_min_delay,
+            hedge_quantile=default.hedge_quantile,
+        )
+    return policies
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """Return True for timeouts, connection errors and transient 429/5xx responses."""
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, 'code', None)
+    code = getattr(code, 'value', code)  # grpc/http status enums
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+
+class LatencyTracker:
+    """Sliding window of successful call latencies per operation."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, operation: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(operation, deque(maxlen=self.window)).append(seconds)
+
+    def count(self, operation: str) -> int:
+        with self._lock:
+            return len(self._samples.get(operation, ()))
+
+    def quantile(self, operation: str, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(operation, ()))
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(q * len(samples)))
+        return samples[index]
+
+
+class CallStats:
+    """Thread-safe attempt, retry, timeout and hedge counters per operation."""
+
+    FIELDS = ('calls', 'attempts', 'retries', 'successes', 'failures', 'timeouts', 'hedges', 'hedge_wins',
+              'short_circuited')
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, operation: str, field: str, amount: int = 1):
+        with self._lock:
+            counters = self._counters.setdefault(operation, dict.fromkeys(self.FIELDS, 0))
+            counters[field] += amount
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Copy of all counters plus derived hedge win rate and attempts per call."""
+        with self._lock:
+            result = {op: dict(counters) for op, counters in self._counters.items()}
+        for counters in result.values():
+            counters['hedge_win_rate'] = counters['hedge_wins'] / counters['hedges'] if counters['hedges'] else 0.0
+            counters['attempts_per_call'] = counters['attempts'] / counters['calls'] if counters['calls'] else 0.0
+        return result
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker around the whole LLM backend.
+
+    Closed: calls flow and outcomes fill a sliding window. Once the window holds
+    `min_calls` outcomes and the failure rate reaches the threshold the breaker
+    opens and rejects calls for `open_seconds`. It then goes half-open and lets
+    `half_open_max_calls` trial calls through; if all succeed it closes, any
+    failure reopens it.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate_threshold: float = 0.5, window: int = 20, min_calls: int = 8,
+                 open_seconds: float = 30.0, half_open_max_calls: int = 2):
+        self.failure_rate_threshold = failure_rate_threshold
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.half_open_max_calls = half_open_max_calls
+        self._outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trials_started = 0
+        self._trial_successes = 0
+        self._times_opened = 0
+        self._rejected = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _refresh(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._trials_started = 0
+            self._trial_successes = 0
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._times_opened += 1
+        self._outcomes.clear()
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError."""
+        with self._lock:
+            self._refresh()
+            if self._state == self.OPEN or (
+                    self._state == self.HALF_OPEN and self._trials_started >= self.half_open_max_calls):
+                self._rejected += 1
+                retry_in = max(0.0, self.open_seconds - (time.monotonic() - self._opened_at))
+                raise CircuitOpenError(f"LLM backend circuit is open; retrying in {retry_in:.0f}s")
+            if self._state == self.HALF_OPEN:
+                self._trials_started += 1
+
+    def record_success(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_max_calls:
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(True)
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._open()
+                return
+            self._outcomes.append(False)
+            if len(self._outcomes) >= self.min_calls and self._failure_rate() >= self.failure_rate_threshold:
+                self._open()
+
+    def release(self):
+        """Record a call whose outcome says nothing about backend health (e.g. a 400)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._trials_started > 0:
+                self._trials_started -= 1
+
+    def _failure_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def snapshot(self) -> Dict[str, object]:
+        with self._lock:
+            self._refresh()
+            return {
+                'state': self._state,
+                'failure_rate': self._failure_rate(),
+                'window_calls': len(self._outcomes),
+                'times_opened': self._times_opened,
+                'rejected': self._rejected,
+            }
+
+
+class ResilientCaller:
+    """Runs LLM calls on a worker pool with deadlines, retries, hedging and a circuit breaker."""
+
+    def __init__(self, policies: Optional[Dict[str, CallPolicy]] = None, max_workers: int = 32,
+                 breaker: Optional[CircuitBreaker] = None, scheduler: Optional[RequestScheduler] = None):
+        self.policies = policies if policies is not None else load_policies()
+        self.latencies = LatencyTracker()
+        self.stats = CallStats()
+        self.breaker = breaker or CircuitBreaker(
+            failure_rate_threshold=float(os.environ.get('GEMINI_BREAKER_FAILURE_RATE', 0.5)),
+            open_seconds=float(os.environ.get('GEMINI_BREAKER_OPEN_SECONDS', 30.0)),
+        )
+        self.scheduler = scheduler or get_default_scheduler()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm-call')
+
+    def policy_for(self, operation: str) -> CallPolicy:
+        return self.policies.get(operation) or CallPolicy()
+
+    def call(self, operation: str, fn: Callable[[float], object]):
+        """Call `fn(timeout)` under the operation's policy and return its result.
+
+        `fn` receives the seconds left for the attempt so it can pass a matching
+        transport timeout. The calling thread never waits past the overall deadline.
+        Raises CircuitOpenError immediately while the backend is considered down,
+        and SchedulerBusyError when the shared request queue cannot admit an attempt.
+        Every attempt, retry and hedge takes its own scheduler token and slot.
+        """
+        try:
+            self.breaker.before_call()
+        except CircuitOpenError:
+            self.stats.incr(operation, 'short_circuited')
+            raise
+
+        try:
+            result = self._call_with_retries(operation, fn)
+        except Exception as exc:
+            if is_retryable(exc):
+                self.breaker.record_failure()
+            else:
+                self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return result
+
+    def _call_with_retries(self, operation: str, fn: Callable[[float], object]):
+        policy = self.policy_for(operation)
+        deadline_at = None
+        self.stats.incr(operation, 'calls')
+        attempt = 0
+
+        while True:
+            attempt += 1
+            try:
+                admitted_at = self.scheduler.acquire(operation)
+            except SchedulerBusyError:
+                self.stats.incr(operation, 'failures')
+                raise
+            if deadline_at is None:
+                deadline_at = admitted_at + policy.deadline  # queueing for the first slot isn't counted
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                self.scheduler.release(admitted_at)
+                self.stats.incr(operation, 'failures')
+                raise CallTimeoutError(f"{operation} exceeded its {policy.deadline:.0f}s deadline")
+
+            self.stats.incr(operation, 'attempts')
+            try:
+                result = self._attempt(operation, policy, fn, min(policy.attempt_timeout, remaining), admitted_at)
+            except Exception as exc:
+                delay = policy.backoff(attempt)
+                retry = (attempt < policy.max_attempts and is_retryable(exc)
+                         and time.monotonic() + delay < deadline_at)
+                if not retry:
+                    self.stats.incr(operation, 'failures')
+                    raise
+                self.stats.incr(operation, 'retries')
+                time.sleep(delay)
+                continue
+
+            self.stats.incr(operation, 'successes')
+            return result
+
+    def _hedge_delay(self, operation: str, policy: CallPolicy) -> float:
+        if self.latencies.count(operation) >= 20:
+            delay = self.latencies.quantile(operation, policy.hedge_quantile)
+        else:
+            delay = policy.hedge_initial_delay
+        return max(policy.hedge_min_delay, delay)
+
+    def _submit(self, fn: Callable[[float], object], timeout: float, admitted_at: float):
+        """Run `fn(timeout)` on the pool; its scheduler slot is released when it actually finishes."""
+        try:
+            future = self._executor.submit(fn, timeout)
+        except BaseException:
+            self.scheduler.release(admitted_at)
+            raise
+        future.add_done_callback(lambda _: self.scheduler.release(admitted_at))
+        return future
+
+    def _attempt(self, operation: str, policy: CallPolicy, fn: Callable[[float], object], timeout: float,
+                 admitted_at: float):
+        started = time.monotonic()
+        expires_at = started + timeout
+        primary = self._submit(fn, timeout, admitted_at)
+        roles = {primary: 'primary'}
+
+        if policy.hedge:
+            hedge_delay = self._hedge_delay(operation, policy)
+            if hedge_delay < timeout:
+                done, _ = wait([primary], timeout=hedge_delay)
+                if not done:
+                    try:
+                        # A hedge is optional: send it only if the scheduler can admit it now
+                        hedge_admitted_at = self.scheduler.acquire(operation, wait=False)
+                    except SchedulerBusyError:
+                        hedge_admitted_at = None
+                    if hedge_admitted_at is not None:
+                        roles[self._submit(fn, timeout - hedge_delay, hedge_admitted_at)] = 'hedge'
+                        self.stats.incr(operation, 'hedges')
+
+        pending = set(roles)
+        last_error = None
+        while pending:
+            done, pending = wait(pending, timeout=max(0.0, expires_at - time.monotonic()),
+                                 return_when=FIRST_COMPLETED)
+            if not done:
+                break
+            for future in done:
+                error = future.exception()
+                if error is None:
+                    if roles[future] == 'hedge':
+                        self.stats.incr(operation, 'hedge_wins')
+                    self.latencies.record(operation, time.monotonic() - started)
+                    for other in pending:
+                        other.cancel()
+                    return future.result()
+                last_error = error
+
+        if not pending and last_error is not None:
+            raise last_error
+
+        # Abandon the stragglers; the worker threads finish in the background
+        for future in pending:
+            future.cancel()
+        self.stats.incr(operation, 'timeouts')
+        raise CallTimeoutError(f"{operation} attempt timed out after {timeout:.1f}s")
+
+    def snapshot(self) -> Dict[str, object]:
+        """Per-operation call stats, circuit breaker and scheduler state for metrics export."""
+        return {
+            'operations': self.stats.snapshot(),
+            'circuit_breaker': self.breaker.snapshot(),
+            'scheduler': self.scheduler.snapshot(),
+        }
+
+    def metric_samples(self):
+        """Point-in-time samples for the metrics registry collector."""
+        snapshot = self.snapshot()
+        samples = []
+        for operation, counters in snapshot['operations'].items():
+            for event in CallStats.FIELDS:
+                samples.append(('llm_call_events_total', 'counter', 'LLM call attempts, retries, hedges and outcomes',
+                                {'operation': operation, 'event': event}, counters[event]))
+            samples.append(('llm_hedge_win_ratio', 'gauge', 'Share of hedged requests won by the hedge',
+                            {'operation': operation}, counters['hedge_win_rate']))
+        breaker = snapshot['circuit_breaker']
+        for state in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+            samples.append(('llm_circuit_state', 'gauge', 'Circuit breaker state (1 = current)',
+                            {'state': state}, 1 if breaker['state'] == state else 0))
+        samples.append(('llm_circuit_failure_rate', 'gauge', 'Failure rate in the breaker window', {},
+                        breaker['failure_rate']))
+        samples.append(('llm_circuit_opened_total', 'counter', 'Times the breaker opened', {},
+                        breaker['times_opened']))
+        scheduler = snapshot['scheduler']
+        samples.append(('llm_queue_depth', 'gauge', 'LLM calls waiting for a slot', {}, scheduler['queued']))
+        samples.append(('llm_in_flight', 'gauge', 'LLM calls currently running', {}, scheduler['in_flight']))
+        samples.append(('llm_scheduler_rejected_total', 'counter', 'LLM calls rejected by the scheduler', {},
+                        scheduler['rejected']))
+        return samples
+
+
+_default_caller = None
+_default_caller_lock = threading.Lock()
+
+
+def get_default_caller() -> ResilientCaller:
+    """Process-wide caller shared by all Streamlit sessions."""
+    global _default_caller
+    with _default_caller_lock:
+        if _default_caller is None:
+            _default_caller = ResilientCaller()
+        return _default_caller
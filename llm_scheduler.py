@@ -0,0 +1,220 @@
+# LLM request scheduling - process-wide token-bucket rate limit and priority queue
+# Every Streamlit session shares one scheduler so the per-key Gemini quota is respected.
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+# Lower value = served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_FEEDBACK = 1
+PRIORITY_BACKGROUND = 2
+
+OPERATION_PRIORITIES = {
+    'questions': PRIORITY_INTERACTIVE,
+    'individual_feedback': PRIORITY_FEEDBACK,
+    'overall_feedback': PRIORITY_FEEDBACK,
+    'jd_analysis': PRIORITY_BACKGROUND,
+}
+
+_local = threading.local()
+
+
+class SchedulerBusyError(RuntimeError):
+    """Raised when the LLM queue is full or a request waited too long for a slot."""
+
+
+@contextmanager
+def queue_status(callback: Callable[[int, float], None]):
+    """Report (queue position, estimated wait seconds) to `callback` while this thread waits."""
+    previous = getattr(_local, 'callback', None)
+    _local.callback = callback
+    try:
+        yield
+    finally:
+        _local.callback = previous
+
+
+@contextmanager
+def background_priority():
+    """Schedule LLM calls made by this thread behind interactive traffic."""
+    previous = getattr(_local, 'priority', None)
+    _local.priority = PRIORITY_BACKGROUND
+    try:
+        yield
+    finally:
+        _local.priority = previous
+
+
+def inherit_priority(fn: Callable) -> Callable:
+    """Wrap `fn` so it runs with the calling thread's scheduling priority on a worker thread."""
+    priority = getattr(_local, 'priority', None)
+
+    def run(*args, **kwargs):
+        previous = getattr(_local, 'priority', None)
+        _local.priority = priority
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.priority = previous
+    return run
+
+
+class TokenBucket:
+    """Classic token bucket; `rate` tokens per second up to `burst`."""
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available (0 if one is available now). Caller holds the lock."""
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self):
+        self._tokens -= 1
+
+
+class RequestScheduler:
+    """Bounded, priority-ordered admission of LLM calls.
+
+    A request is admitted when it is first in (priority, arrival) order, fewer than
+    `max_in_flight` calls are running and the token bucket has a token. Waiters are
+    told their queue position and an estimated wait derived from recent service times.
+    """
+
+    def __init__(self, rate_per_minute: float = 60.0, burst: int = 10, max_in_flight: int = 8,
+                 max_queue: int = 64, max_wait: float = 120.0):
+        self.bucket = TokenBucket(rate_per_minute / 60.0, burst)
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._queue = []  # heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._avg_service = 5.0
+        self._admitted = 0
+        self._rejected = 0
+        self._cond = threading.Condition()
+
+    def _position(self, ticket) -> int:
+        return sum(1 for queued in self._queue if queued < ticket) + 1
+
+    def _estimated_wait(self, position: int) -> float:
+        by_service = (position / self.max_in_flight) * self._avg_service
+        by_rate = position / self.bucket.rate
+        return max(by_service, by_rate)
+
+    def acquire(self, operation: str, priority: Optional[int] = None, wait: bool = True) -> float:
+        """Take a token and an in-flight slot, waiting in priority order; returns the admission time.
+
+        With `wait=False` a call that cannot be admitted right away raises
+        SchedulerBusyError without counting as a rejection (e.g. an optional hedge).
+        Every successful acquire must be paired with `release`.
+        """
+        if priority is None:
+            priority = getattr(_local, 'priority', None)
+        if priority is None:
+            priority = OPERATION_PRIORITIES.get(operation, PRIORITY_FEEDBACK)
+        callback = getattr(_local, 'callback', None) if wait else None
+
+        with self._cond:
+            if len(self._queue) >= self.max_queue:
+                self._rejected += wait
+                raise SchedulerBusyError("LLM request queue is full - please try again shortly")
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._queue, ticket)
+            give_up_at = time.monotonic() + (self.max_wait if wait else 0.0)
+            last_report = 0.0
+            try:
+                while True:
+                    if self._queue[0] == ticket and self._in_flight < self.max_in_flight:
+                        token_wait = self.bucket.wait_time()
+                        if token_wait == 0:
+                            break
+                    else:
+                        token_wait = 0.5
+                    now = time.monotonic()
+                    if now >= give_up_at:
+                        self._rejected += wait
+                        raise SchedulerBusyError(f"Waited more than {self.max_wait:.0f}s for an LLM slot")
+                    if callback and now - last_report >= 0.5:
+                        position = self._position(ticket)
+                        eta = self._estimated_wait(position)
+                        last_report = now
+                        # Never run UI code while holding the scheduler lock
+                        self._cond.release()
+                        try:
+                            callback(position, eta)
+                        finally:
+                            self._cond.acquire()
+                        continue
+                    self._cond.wait(timeout=min(0.5, max(token_wait, 0.01), give_up_at - now))
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+            heapq.heappop(self._queue)
+            self.bucket.take()
+            self._in_flight += 1
+            self._admitted += 1
+            self._cond.notify_all()
+        return time.monotonic()
+
+    def release(self, admitted_at: float):
+        """Give back the in-flight slot taken by `acquire` once the call has finished."""
+        with self._cond:
+            self._in_flight -= 1
+            self._avg_service = 0.8 * self._avg_service + 0.2 * (time.monotonic() - admitted_at)
+            self._cond.notify_all()
+
+    @contextmanager
+    def slot(self, operation: str, priority: Optional[int] = None):
+        """Hold one admission slot for the duration of an LLM call."""
+        admitted_at = self.acquire(operation, priority)
+        try:
+            yield
+        finally:
+            self.release(admitted_at)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                'queued': len(self._queue),
+                'in_flight': self._in_flight,
+                'admitted': self._admitted,
+                'rejected': self._rejected,
+                'avg_service_seconds': self._avg_service,
+            }
+
+
+_default_scheduler = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_default_scheduler() -> RequestScheduler:
+    """Process-wide scheduler configured from GEMINI_RATE_PER_MINUTE, GEMINI_MAX_IN_FLIGHT and GEMINI_MAX_QUEUE."""
+    global _default_scheduler
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            _default_scheduler = RequestScheduler(
+                rate_per_minute=float(os.environ.get('GEMINI_RATE_PER_MINUTE', 60)),
+                max_in_flight=int(os.environ.get('GEMINI_MAX_IN_FLIGHT', 8)),
+                max_queue=int(os.environ.get('GEMINI_MAX_QUEUE', 64)),
+            )
+        return _default_scheduler
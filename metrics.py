@@ -0,0 +1,235 @@
+# Lightweight instrumentation - latency/size histograms and error counters for hot paths
+# Exported in Prometheus text format from a local HTTP endpoint (METRICS_PORT) and/or a
+# periodically rewritten file (METRICS_FILE) so p50/p99 can be dashboarded in production.
+
+import functools
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+PREFIX = 'interview_'
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> LabelKey:
+    return tuple(sorted((str(k), str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = ('{}="{}"'.format(k, v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+               for k, v in pairs)
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series: Dict[LabelKey, List] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, key: LabelKey):
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = [0] * len(self.buckets) + [0.0, 0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {series[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {series[-2]}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {series[-1]}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._series: Dict[LabelKey, float] = {}
+
+    def inc(self, key: LabelKey, amount: float = 1):
+        self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self._series.items()):
+            lines.append(f"{self.name}{_format_labels(key)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    """Process-wide metric store. Collectors add point-in-time samples at export time."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._collectors: Dict[str, Callable[[], List[Tuple[str, str, str, Dict[str, object], float]]]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, help_text: str, *args):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = cls(name, help_text, *args)
+        return metric
+
+    def observe(self, name: str, value: float, labels: Dict[str, object], help_text: str = '',
+                buckets=LATENCY_BUCKETS):
+        with self._lock:
+            self._get(Histogram, PREFIX + name, help_text or name, buckets).observe(value, _label_key(labels))
+
+    def inc(self, name: str, labels: Dict[str, object], amount: float = 1, help_text: str = ''):
+        with self._lock:
+            self._get(Counter, PREFIX + name + '_total', help_text or name).inc(_label_key(labels), amount)
+
+    def register_collector(self, name: str, collector):
+        """`collector()` returns (metric, type, help, labels, value) samples; re-registering replaces it."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            lines = []
+            for metric in self._metrics.values():
+                lines.extend(metric.render())
+            collectors = list(self._collectors.values())
+        declared = set()
+        for collector in collectors:
+            try:
+                samples = collector()
+            except Exception:
+                continue  # a broken collector must not take down the export
+            for metric, metric_type, help_text, labels, value in samples:
+                name = PREFIX + metric
+                if name not in declared:
+                    lines.append(f"# HELP {name} {help_text}")
+                    lines.append(f"# TYPE {name} {metric_type}")
+                    declared.add(name)
+                lines.append(f"{name}{_format_labels(_label_key(labels))} {_format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+
+def observe_size(name: str, kind: str, size: int, **labels):
+    """Record an input/output size in bytes or characters."""
+    REGISTRY.observe(f"{name}_{kind}_size", size, labels, f"{name} {kind} size", buckets=SIZE_BUCKETS)
+
+
+@contextmanager
+def track(name: str, ignore: Tuple[type, ...] = (), **labels):
+    """Time the block into `<name>_seconds` and count failures in `<name>_errors_total`.
+
+    Exceptions listed in `ignore` (e.g. Streamlit's rerun/stop control flow) are
+    re-raised without being counted as errors.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except ignore:
+        raise
+    except BaseException as exc:
+        REGISTRY.inc(f"{name}_errors", dict(labels, error=type(exc).__name__), help_text=f"{name} failures")
+        raise
+    finally:
+        REGISTRY.observe(f"{name}_seconds", time.perf_counter() - started, labels, f"{name} latency in seconds")
+
+
+def timed(name: str, input_size: Optional[Callable] = None, output_size: Optional[Callable] = None, **labels):
+    """Decorator form of `track`; optional callables measure the call's input and output size."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if input_size is not None:
+                observe_size(name, 'input', input_size(*args, **kwargs), **labels)
+            with track(name, **labels):
+                result = func(*args, **kwargs)
+            if output_size is not None:
+                observe_size(name, 'output', output_size(result), **labels)
+            return result
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_metrics_file(path: str):
+    """Atomically replace `path` with the current Prometheus exposition."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+    with os.fdopen(fd, 'w') as f:
+        f.write(REGISTRY.render_prometheus())
+    os.replace(tmp_path, path)
+
+
+_exporter_started = False
+_exporter_lock = threading.Lock()
+
+
+def start_exporter():
+    """Start the exporters configured by METRICS_PORT / METRICS_FILE once per process."""
+    global _exporter_started
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+    port = os.environ.get('METRICS_PORT')
+    if port:
+        server = ThreadingHTTPServer((os.environ.get('METRICS_HOST', '127.0.0.1'), int(port)), _MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+
+    path = os.environ.get('METRICS_FILE')
+    if path:
+        interval = float(os.environ.get('METRICS_INTERVAL', 15))
+
+        def write_forever():
+            while True:
+                try:
+                    write_metrics_file(path)
+                except OSError:
+                    pass
+                time.sleep(interval)
+
+        threading.Thread(target=write_forever, name='metrics-file', daemon=True).start()
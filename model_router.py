@@ -0,0 +1,188 @@
+# Model routing - per-operation model choice with latency/error-aware failover
+# Keeps per-operation, per-model latency histograms so every routing decision can be audited.
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Collection, Dict, List, Optional, Tuple
+
+DEFAULT_ROUTES = {
+    'questions': ['gemini-1.5-pro', 'gemini-1.5-flash'],
+    'individual_feedback': ['gemini-1.5-flash', 'gemini-1.5-flash-8b'],
+    'overall_feedback': ['gemini-1.5-pro', 'gemini-1.5-flash'],
+    'jd_analysis': ['gemini-1.5-flash', 'gemini-1.5-flash-8b'],
+}
+
+# Fail over when a model's recent p95 latency (seconds) exceeds this for the operation
+DEFAULT_MAX_P95 = {
+    'questions': 30.0,
+    'individual_feedback': 20.0,
+    'overall_feedback': 45.0,
+    'jd_analysis': 20.0,
+}
+
+LATENCY_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0, float('inf'))
+
+
+class ModelHealth:
+    """Latency histogram plus a sliding window of recent outcomes for one model on one operation."""
+
+    def __init__(self, window: int = 50):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.latency_sum = 0.0
+        self.count = 0
+        self.errors = 0
+        self.recent = deque(maxlen=window)  # (latency_seconds, ok)
+        self.degraded_until = 0.0
+
+    def record(self, latency: float, ok: bool):
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency <= bound:
+                self.bucket_counts[i] += 1
+                break
+        self.latency_sum += latency
+        self.count += 1
+        if not ok:
+            self.errors += 1
+        self.recent.append((latency, ok))
+
+    def p95(self) -> Optional[float]:
+        latencies = sorted(latency for latency, ok in self.recent if ok)
+        if not latencies:
+            return None
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def error_rate(self) -> float:
+        if not self.recent:
+            return 0.0
+        return sum(1 for _, ok in self.recent if not ok) / len(self.recent)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in zip(LATENCY_BUCKETS, self.bucket_counts)},
+            'sum': self.latency_sum,
+            'count': self.count,
+            'errors': self.errors,
+            'recent_p95': self.p95(),
+            'recent_error_rate': self.error_rate(),
+            'degraded': self.degraded_until > time.monotonic(),
+        }
+
+
+class ModelRouter:
+    """Pick a model per operation, falling over to the next candidate when the
+    preferred one is slow or failing. A degraded model is skipped for
+    `cooldown_seconds`, after which its window is cleared and it is tried again.
+
+    Health is kept per (operation, model): a model that is slow at long question
+    generation is not held against the much tighter feedback p95, and vice versa.
+    """
+
+    def __init__(self, routes: Optional[Dict[str, List[str]]] = None,
+                 max_p95: Optional[Dict[str, float]] = None, max_error_rate: float = 0.3,
+                 min_samples: int = 10, cooldown_seconds: float = 60.0):
+        self.routes = routes or load_routes()
+        self.max_p95 = max_p95 or dict(DEFAULT_MAX_P95)
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.cooldown_seconds = cooldown_seconds
+        self._health: Dict[Tuple[str, str], ModelHealth] = {}
+        self._decisions = deque(maxlen=200)
+        self._lock = threading.Lock()
+
+    def _health_for(self, operation: str, model: str) -> ModelHealth:
+        health = self._health.get((operation, model))
+        if health is None:
+            health = self._health[(operation, model)] = ModelHealth()
+        return health
+
+    def _unhealthy_reason(self, operation: str, health: ModelHealth) -> Optional[str]:
+        if len(health.recent) < self.min_samples:
+            return None
+        error_rate = health.error_rate()
+        if error_rate > self.max_error_rate:
+            return f"error rate {error_rate:.0%} > {self.max_error_rate:.0%}"
+        p95 = health.p95()
+        limit = self.max_p95.get(operation)
+        if limit is not None and p95 is not None and p95 > limit:
+            return f"p95 {p95:.1f}s > {limit:.1f}s"
+        return None
+
+    def choose(self, operation: str, exclude: Collection[str] = ()) -> str:
+        """Return the model to use for `operation` and log the decision.
+
+        Models in `exclude` (e.g. ones that just failed this call) are passed
+        over unless no other candidate is left.
+        """
+        candidates = self.routes.get(operation) or self.routes['questions']
+        if exclude and any(model not in exclude for model in candidates):
+            candidates = [model for model in candidates if model not in exclude]
+        now = time.monotonic()
+        with self._lock:
+            skipped = [f"{model} failed this call" for model in exclude]
+            for model in candidates:
+                health = self._health_for(operation, model)
+                if health.degraded_until > now:
+                    skipped.append(f"{model} degraded")
+                    continue
+                if health.degraded_until:
+                    # Cool-down over: forget the bad window and probe the model again
+                    health.degraded_until = 0.0
+                    health.recent.clear()
+                reason = self._unhealthy_reason(operation, health)
+                if reason:
+                    health.degraded_until = now + self.cooldown_seconds
+                    skipped.append(f"{model} {reason}")
+                    continue
+                break
+            else:
+                model = candidates[-1]
+            self._decisions.append({
+                'time': time.time(),
+                'operation': operation,
+                'model': model,
+                'skipped': skipped,
+            })
+            return model
+
+    def record(self, operation: str, model: str, latency: float, ok: bool):
+        with self._lock:
+            self._health_for(operation, model).record(latency, ok)
+
+    def snapshot(self) -> Dict[str, object]:
+        """Per-operation, per-model latency histograms and the most recent routing decisions."""
+        with self._lock:
+            health_by_operation: Dict[str, Dict[str, object]] = {}
+            for (operation, model), health in self._health.items():
+                health_by_operation.setdefault(operation, {})[model] = health.to_dict()
+            return {
+                'routes': {op: list(models) for op, models in self.routes.items()},
+                'models': health_by_operation,
+                'decisions': list(self._decisions)[-20:],
+            }
+
+
+def load_routes(env=None) -> Dict[str, List[str]]:
+    """Default routes, overridable per operation with GEMINI_MODEL_<OP>="primary,fallback,..."."""
+    env = os.environ if env is None else env
+    routes = {}
+    for operation, default in DEFAULT_ROUTES.items():
+        override = env.get(f"GEMINI_MODEL_{operation.upper()}", '')
+        models = [name.strip() for name in override.split(',') if name.strip()]
+        routes[operation] = models or list(default)
+    return routes
+
+
+_default_router = None
+_default_router_lock = threading.Lock()
+
+
+def get_default_router() -> ModelRouter:
+    """Process-wide router so health observed by one session benefits all of them."""
+    global _default_router
+    with _default_router_lock:
+        if _default_router is None:
+            _default_router = ModelRouter()
+        return _default_router
@@ -0,0 +1,139 @@
+# Offline LLM stand-in - deterministic Gemini look-alike with configurable latency
+# Enabled with GEMINI_BACKEND=offline; used by load tests, benchmarks and local development.
+
+import os
+import random
+import re
+import time
+from types import SimpleNamespace
+
+QUESTION_BANK = [
+    "Tell me about a time you led a project under a tight deadline. What did you do and what was the result?",
+    "Describe a situation where you disagreed with a stakeholder. How did you resolve it?",
+    "Give an example of a complex problem you solved with limited information. What was your approach?",
+    "Tell me about a time you had to learn a new technology quickly. How did it affect the outcome?",
+    "Describe a mistake you made at work and what you changed afterwards.",
+    "Tell me about a time you improved a process for your team. How did you measure the impact?",
+]
+
+INDIVIDUAL_FEEDBACK = """## 🎯 HEARS Analysis for Question {number}
+
+### **H (Headline) - Situation Summary**
+**Score: 7/10**
+**Analysis:** The situation is introduced clearly but could be framed in one sentence.
+
+### **E (Events) - Challenges & Context**
+**Score: 6/10**
+**Analysis:** The challenge is described; constraints and stakes need more detail.
+
+### **A (Actions) - Detailed Actions Taken**
+**Score: 8/10**
+**Analysis:** Actions are specific and owned by the candidate.
+
+### **R (Results) - Measurable Outcomes**
+**Score: 5/10**
+**Analysis:** Results are mentioned without metrics.
+
+### **S (Significance) - Skills & Learning**
+**Score: 6/10**
+**Analysis:** Some reflection on lessons learned.
+
+### **📊 Overall Assessment**
+**Total HEARS Score: 32/50**
+**Overall Rating: Good**
+
+### **✅ Key Strengths**
+- Clear ownership of actions
+- Relevant example for the role
+- Logical structure
+
+### **🎯 Areas for Improvement**
+- Quantify the outcome
+- Explain why the situation mattered
+
+### **💡 Coaching Tips**
+Lead with a one-line headline, then give two numbers that prove the result.
+"""
+
+OVERALL_FEEDBACK = """# 🎯 COMPREHENSIVE INTERVIEW FEEDBACK REPORT
+
+## **📊 Interview Overview**
+- **Interview Performance:** Solid, with room to quantify results
+
+## **📰 HEADLINE ANALYSIS (H)**
+**Score: 7/10**
+Situations were generally introduced clearly.
+
+## **📅 EVENTS ANALYSIS (E)**
+**Score: 6/10**
+Context was present but constraints were often implicit.
+
+## **⚡ ACTIONS ANALYSIS (A)**
+**Score: 8/10**
+Actions were specific and first-person.
+
+## **🎊 RESULTS ANALYSIS (R)**
+**Score: 5/10**
+Outcomes lacked metrics.
+
+## **💡 SIGNIFICANCE ANALYSIS (S)**
+**Score: 6/10**
+Learning was mentioned briefly.
+
+## **📈 OVERALL ASSESSMENT**
+**Total HEARS Score: 32/50**
+**Interview Rating: HIRE**
+"""
+
+JD_ANALYSIS = """{"competencies": ["Distributed systems design", "Python", "Incident response", "Mentoring", "Stakeholder communication"],
+ "seniority": "Senior, 5+ years", "key_phrases": ["customer-facing services", "reliability ownership", "on-call rotation"]}"""
+
+
+class OfflineError(Exception):
+    """Simulated transient backend failure (looks like a 503 to the retry layer)."""
+    code = 503
+
+
+class OfflineModel:
+    """Drop-in for genai.GenerativeModel.generate_content with canned, shape-correct output."""
+
+    def __init__(self, model_name: str, latency: float = None, jitter: float = None, error_rate: float = None):
+        self.model_name = model_name
+        self.latency = float(os.environ.get('OFFLINE_LLM_LATENCY', 0.5)) if latency is None else latency
+        self.jitter = float(os.environ.get('OFFLINE_LLM_JITTER', 0.25)) if jitter is None else jitter
+        self.error_rate = float(os.environ.get('OFFLINE_LLM_ERROR_RATE', 0.0)) if error_rate is None else error_rate
+
+    def generate_content(self, prompt, request_options=None, **kwargs):
+        delay = max(0.0, random.gauss(self.latency, self.latency * self.jitter))
+        timeout = (request_options or {}).get('timeout')
+        if timeout is not None and delay > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"offline model exceeded {timeout:.1f}s")
+        time.sleep(delay)
+        if random.random() < self.error_rate:
+            raise OfflineError("simulated upstream failure")
+
+        text = self._respond(prompt if isinstance(prompt, str) else str(prompt))
+        prompt_tokens = len(str(prompt)) // 4
+        output_tokens = len(text) // 4
+        return SimpleNamespace(
+            text=text,
+            usage_metadata=SimpleNamespace(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens,
+            ),
+        )
+
+    def _respond(self, prompt: str) -> str:
+        match = re.search(r'Generate exactly (\d+) behavioral interview questions', prompt)
+        if match:
+            count = int(match.group(1))
+            questions = [QUESTION_BANK[i % len(QUESTION_BANK)] for i in range(count)]
+            return '[' + ', '.join('"' + q.replace('"', '\\"') + '"' for q in questions) + ']'
+        if 'Analyze this job description once' in prompt:
+            return JD_ANALYSIS
+        match = re.search(r'HEARS Analysis for Question (\d+)', prompt)
+        if match:
+            return INDIVIDUAL_FEEDBACK.format(number=match.group(1))
+        return OVERALL_FEEDBACK
@@ -0,0 +1,413 @@
+# Prompt building - templates for every GeminiClient operation with pre-flight token accounting
+# Variable sections (resume, job description, answers) are measured before each send and the
+# largest ones are compacted or truncated so a prompt never exceeds its operation's budget.
+
+import logging
+import math
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Rough budget of input tokens per operation; override with PROMPT_BUDGET_<OP>
+DEFAULT_TOKEN_BUDGETS = {
+    'questions': 6000,
+    'individual_feedback': 3000,
+    'overall_feedback': 12000,
+    'jd_analysis': 4000,
+}
+
+# A truncated section always keeps at least this many tokens
+MIN_SECTION_TOKENS = 150
+
+# Gemini's SentencePiece tokenizer averages ~4 characters per token on English prose
+CHARS_PER_TOKEN = 4
+
+QUESTIONS_TEMPLATE = """
+You are an expert behavioral interviewer. Generate exactly {num_questions} behavioral interview questions based on the resume and job description provided.
+
+RESUME CONTENT:
+{resume_text}
+
+JOB DETAILS:
+- Title: {job_title}
+- Company: {company_name}
+- Description: {job_description}
+- Experience Level: {experience_years} years
+- Interview Duration: {duration} minutes
+
+REQUIREMENTS:
+1. Generate exactly {num_questions} questions - no more, no less
+2. Focus on HEARS method (Headline, Events, Actions, Results, Significance)
+3. Tailor questions to candidate's background and job requirements
+4. Include variety: leadership, problem-solving, conflict resolution, teamwork, adaptability, communication
+5. Match difficulty to experience level and interview duration
+6. Make questions specific and actionable
+7. Ensure questions encourage detailed responses covering all HEARS elements
+
+IMPORTANT: Return your response in this EXACT format as a valid JSON array:
+["Question 1 text here", "Question 2 text here", "Question 3 text here"]
+
+Do not include any other text, explanations, or formatting. Just the JSON array with exactly {num_questions} questions.
+"""
+
+INDIVIDUAL_FEEDBACK_TEMPLATE = """
+Analyze this single interview question and answer using the HEARS methodology:
+
+QUESTION: {question}
+CANDIDATE'S ANSWER: {answer}
+JOB CONTEXT: {job_title} at {company_name}
+
+Provide comprehensive feedback in this EXACT format:
+
+## 🎯 HEARS Analysis for Question {question_number}
+
+### **H (Headline) - Situation Summary**
+**Score: X/10**
+**Analysis:** [Detailed analysis of how well they provided a clear situation summary]
+
+### **E (Events) - Challenges & Context**
+**Score: X/10**
+**Analysis:** [Detailed analysis of specific events/challenges described]
+
+### **A (Actions) - Detailed Actions Taken**
+**Score: X/10**
+**Analysis:** [Detailed analysis of the specific actions they took]
+
+### **R (Results) - Measurable Outcomes**
+**Score: X/10**
+**Analysis:** [Detailed analysis of measurable results and outcomes]
+
+### **S (Significance) - Skills & Learning**
+**Score: X/10**
+**Analysis:** [Detailed analysis of skills demonstrated and lessons learned]
+
+### **📊 Overall Assessment**
+**Total HEARS Score: XX/50**
+**Overall Rating: [Excellent/Good/Average/Needs Improvement]**
+
+### **✅ Key Strengths**
+- [Specific strength 1 with example from their answer]
+- [Specific strength 2 with example from their answer]
+- [Specific strength 3 with example from their answer]
+
+### **🎯 Areas for Improvement**
+- [Specific improvement area 1 with actionable suggestion]
+- [Specific improvement area 2 with actionable suggestion]
+
+### **💡 Coaching Tips**
+[2-3 specific, actionable tips for improving this type of response in future interviews]
+
+IMPORTANT: Provide specific, detailed analysis with concrete examples from their answer. Be constructive and helpful.
+"""
+
+OVERALL_FEEDBACK_TEMPLATE = """
+Analyze this complete behavioral interview using the HEARS methodology:
+
+INTERVIEW RESPONSES: {responses_text}
+JOB CONTEXT:
+{job_context}
+INTERVIEW DURATION: {duration} minutes
+TOTAL QUESTIONS: {total_questions}
+COMPLETED QUESTIONS: {completed_questions}
+SKIPPED QUESTIONS: {skipped_questions}
+
+Provide comprehensive feedback in this EXACT format:
+
+# 🎯 COMPREHENSIVE INTERVIEW FEEDBACK REPORT
+
+## **📊 Interview Overview**
+- **Position:** {job_title}
+- **Company:** {company_name}
+- **Questions Completed:** {completed_questions}/{total_questions}
+- **Interview Performance:** [Overall assessment]
+
+## **📰 HEADLINE ANALYSIS (H)**
+**Score: X/10**
+[Comprehensive analysis of situation summaries across all responses]
+
+**Key Observations:**
+- [Specific observation 1]
+- [Specific observation 2]
+- [Specific observation 3]
+
+## **📅 EVENTS ANALYSIS (E)**
+**Score: X/10**
+[Comprehensive analysis of challenges/contexts described]
+
+**Notable Examples:**
+- **Strong Event Description:** [Quote from responses]
+- **Area for Improvement:** [Specific suggestion]
+
+## **⚡ ACTIONS ANALYSIS (A)**
+**Score: X/10**
+[Comprehensive analysis of action descriptions]
+
+**Action Quality Assessment:**
+- **Specific Actions:** [Analysis with examples]
+- **Leadership Examples:** [Analysis]
+- **Problem-Solving Approach:** [Analysis]
+
+## **🎊 RESULTS ANALYSIS (R)**
+**Score: X/10**
+[Analysis of measurable outcomes and impact]
+
+**Results Effectiveness:**
+- **Quantified Results:** [Examples with numbers/metrics]
+- **Impact Demonstration:** [Analysis]
+- **Missing Metrics:** [Areas needing improvement]
+
+## **💡 SIGNIFICANCE ANALYSIS (S)**
+**Score: X/10**
+[Analysis of skills demonstrated and learning]
+
+**Skills Assessment:**
+- **Leadership:** X/10 - [Analysis with examples]
+- **Problem-Solving:** X/10 - [Analysis with examples]
+- **Communication:** X/10 - [Analysis with examples]
+- **Teamwork:** X/10 - [Analysis with examples]
+- **Adaptability:** X/10 - [Analysis with examples]
+
+## **📈 OVERALL ASSESSMENT**
+**Total HEARS Score: XX/50**
+**Interview Rating: [EXCELLENT/STRONG HIRE/HIRE/MAYBE/NEEDS IMPROVEMENT]**
+**Time Management: [Analysis of how well they used interview time]**
+
+## **🌟 TOP STRENGTHS**
+1. **[Strength Category]:** [Detailed analysis with specific examples from responses]
+2. **[Strength Category]:** [Detailed analysis with specific examples from responses]
+3. **[Strength Category]:** [Detailed analysis with specific examples from responses]
+
+## **🎯 PRIORITY DEVELOPMENT AREAS**
+1. **[Development Area]:** [Specific, actionable improvement recommendations]
+2. **[Development Area]:** [Specific, actionable improvement recommendations]
+3. **[Development Area]:** [Specific, actionable improvement recommendations]
+
+## **🚀 ACTION PLAN FOR IMPROVEMENT**
+### **For Your Next Interview:**
+- [Specific preparation tip 1]
+- [Specific preparation tip 2]
+- [Specific preparation tip 3]
+
+### **For Long-term Professional Development:**
+- [Career development recommendation 1]
+- [Career development recommendation 2]
+
+## **📋 HEARS METHOD MASTERY TIPS**
+[Specific tips for better implementation of HEARS methodology based on this interview performance]
+
+IMPORTANT: Provide specific, actionable feedback with concrete examples from their responses.
+"""
+
+JD_ANALYSIS_TEMPLATE = """
+Analyze this job description once so it can be reused for many candidates.
+
+JOB TITLE: {job_title}
+JOB DESCRIPTION:
+{job_description}
+
+Extract:
+1. competencies: up to 8 required competencies or skills, most important first, each a short noun phrase
+2. seniority: one short phrase with the seniority level and any years-of-experience requirement
+3. key_phrases: up to 10 distinctive phrases from the posting (responsibilities, domain, tools) worth probing in interview questions
+
+IMPORTANT: Return only a valid JSON object in this EXACT shape:
+{{"competencies": ["..."], "seniority": "...", "key_phrases": ["..."]}}
+"""
+
+
+class BuiltPrompt:
+    """Final prompt text plus the token accounting that produced it."""
+
+    def __init__(self, operation: str, text: str, section_tokens: Dict[str, int],
+                 fixed_tokens: int, budget: int, truncated: List[str]):
+        self.operation = operation
+        self.text = text
+        self.section_tokens = section_tokens
+        self.fixed_tokens = fixed_tokens
+        self.budget = budget
+        self.truncated = truncated
+
+    @property
+    def total_tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap local token estimate; avoids a count_tokens round trip before every call."""
+    if not text:
+        return 0
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def token_budget(operation: str) -> int:
+    default = DEFAULT_TOKEN_BUDGETS.get(operation, 8000)
+    return int(os.environ.get(f"PROMPT_BUDGET_{operation.upper()}", default))
+
+
+def compact_text(text: str) -> str:
+    """Collapse runs of spaces and blank lines, which cost tokens but carry no content."""
+    text = re.sub(r'[ \t\f\v]+', ' ', text or '')
+    text = re.sub(r' *\n[ \n]*\n', '\n\n', text)
+    return text.strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Keep the head and tail of `text` within roughly `max_tokens` tokens."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    keep = max(0, max_chars - 48)  # leave room for the omission marker
+    head = (keep * 2) // 3
+    tail = keep - head
+    omitted = len(text) - head - tail
+    return f"{text[:head]}\n[... {omitted} characters omitted ...]\n{text[len(text) - tail:]}"
+
+
+def _water_level(sizes: List[int], available: int) -> int:
+    """Largest per-section cap such that sum(min(size, cap)) fits in `available`."""
+    remaining = available
+    ordered = sorted(sizes)
+    for i, size in enumerate(ordered):
+        share = remaining // (len(ordered) - i)
+        if size > share:
+            return share
+        remaining -= size
+    return ordered[-1] if ordered else 0
+
+
+def fit_sections(operation: str, sections: Dict[str, str], fixed_tokens: int) -> Tuple[Dict[str, str], List[str]]:
+    """Compact every section, then shrink the largest ones until the prompt fits its budget.
+
+    Sections are capped at a common level so the biggest contributors lose the most
+    and small sections (a short job description, a one-line answer) stay intact.
+    """
+    budget = token_budget(operation)
+    fitted = {name: compact_text(value) for name, value in sections.items()}
+    sizes = {name: estimate_tokens(value) for name, value in fitted.items()}
+    if fixed_tokens + sum(sizes.values()) <= budget:
+        return fitted, []
+
+    cap = max(MIN_SECTION_TOKENS, _water_level(list(sizes.values()), budget - fixed_tokens))
+    truncated = []
+    for name, size in sizes.items():
+        if size > cap:
+            fitted[name] = truncate_to_tokens(fitted[name], cap)
+            truncated.append(name)
+    return fitted, truncated
+
+
+def _build(operation: str, template: str, sections: Dict[str, str], fields: Dict[str, object],
+           assemble=None) -> BuiltPrompt:
+    """Fill `template` after fitting `sections`; `assemble` maps fitted sections to template fields."""
+    assemble = assemble or (lambda fitted: fitted)
+    empty = assemble({name: '' for name in sections})
+    fixed_tokens = estimate_tokens(template.format(**fields, **empty))
+    fitted, truncated = fit_sections(operation, sections, fixed_tokens)
+    text = template.format(**fields, **assemble(fitted))
+
+    built = BuiltPrompt(
+        operation=operation,
+        text=text,
+        section_tokens={name: estimate_tokens(value) for name, value in fitted.items()},
+        fixed_tokens=fixed_tokens,
+        budget=token_budget(operation),
+        truncated=truncated,
+    )
+    logger.info("prompt %s: ~%d tokens (template %d, sections %s)",
+                operation, built.total_tokens, fixed_tokens, built.section_tokens)
+    if truncated:
+        original = {name: estimate_tokens(value) for name, value in sections.items() if name in truncated}
+        logger.warning("prompt %s over its %d token budget; truncated %s (was %s)",
+                       operation, built.budget, truncated, original)
+    return built
+
+
+def build_jd_analysis_prompt(job_details: Dict) -> BuiltPrompt:
+    return _build(
+        'jd_analysis',
+        JD_ANALYSIS_TEMPLATE,
+        sections={'job_description': job_details.get('job_description', 'N/A')},
+        fields={'job_title': job_details.get('job_title', 'N/A')},
+    )
+
+
+def build_questions_prompt(resume_text: str, job_details: Dict, num_questions: int,
+                           job_summary: Optional[str] = None) -> BuiltPrompt:
+    """`job_summary` (a cached JDAnalysis) replaces the raw job description when given."""
+    return _build(
+        'questions',
+        QUESTIONS_TEMPLATE,
+        sections={
+            'resume_text': resume_text,
+            'job_description': job_summary or job_details.get('job_description', 'N/A'),
+        },
+        fields={
+            'num_questions': num_questions,
+            'job_title': job_details.get('job_title', 'N/A'),
+            'company_name': job_details.get('company_name', 'N/A'),
+            'experience_years': job_details.get('experience_years', 0),
+            'duration': job_details.get('duration', 15),
+        },
+    )
+
+
+def build_individual_feedback_prompt(question: str, answer: str, job_details: Dict,
+                                     question_number: int) -> BuiltPrompt:
+    return _build(
+        'individual_feedback',
+        INDIVIDUAL_FEEDBACK_TEMPLATE,
+        sections={'question': question, 'answer': answer},
+        fields={
+            'question_number': question_number,
+            'job_title': job_details.get('job_title', 'N/A'),
+            'company_name': job_details.get('company_name', 'N/A'),
+        },
+    )
+
+
+def format_job_context(job_details: Dict, description: str) -> str:
+    """Readable job context block instead of the raw job_details dict repr."""
+    lines = [
+        f"- Title: {job_details.get('job_title', 'N/A')}",
+        f"- Company: {job_details.get('company_name', 'N/A')}",
+        f"- Experience Level: {job_details.get('experience_years', 0)} years",
+    ]
+    if job_details.get('industry'):
+        lines.append(f"- Industry: {job_details['industry']}")
+    lines.append(f"- Description: {description}")
+    return '\n'.join(lines)
+
+
+def build_overall_feedback_prompt(all_responses: List, job_details: Dict,
+                                  job_summary: Optional[str] = None) -> BuiltPrompt:
+    completed_questions = len([r for r in all_responses if r['answer'] != "[Question Skipped]"])
+    sections = {'job_description': job_summary or job_details.get('job_description', 'N/A')}
+    for i, response in enumerate(all_responses):
+        sections[f"answer_{i + 1}"] = response['answer']
+
+    def assemble(fitted: Dict[str, str]) -> Dict[str, str]:
+        responses_text = "\n\n".join(
+            f"Q{i + 1}: {response['question']}\nA{i + 1}: {fitted[f'answer_{i + 1}']}"
+            for i, response in enumerate(all_responses)
+        )
+        return {
+            'responses_text': responses_text,
+            'job_context': format_job_context(job_details, fitted['job_description']),
+        }
+
+    return _build(
+        'overall_feedback',
+        OVERALL_FEEDBACK_TEMPLATE,
+        sections=sections,
+        fields={
+            'duration': job_details.get('duration', 15),
+            'total_questions': len(all_responses),
+            'completed_questions': completed_questions,
+            'skipped_questions': len(all_responses) - completed_questions,
+            'job_title': job_details.get('job_title', 'N/A'),
+            'company_name': job_details.get('company_name', 'N/A'),
+        },
+        assemble=assemble,
+    )
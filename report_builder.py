@@ -0,0 +1,333 @@
+# Interview report builder - markdown kept up to date section by section, file exports rendered off the UI thread
+# One builder per browser session; only sections whose answer or feedback changed are re-rendered.
+
+import html
+import io
+import os
+import re
+import textwrap
+import threading
+import zlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from metrics import timed
+
+# format -> (label, mime type, file extension)
+EXPORT_FORMATS = {
+    'html': ('HTML', 'text/html', 'html'),
+    'docx': ('Word', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document', 'docx'),
+    'pdf': ('PDF', 'application/pdf', 'pdf'),
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_export_executor() -> ThreadPoolExecutor:
+    """Process-wide pool for report exports; REPORT_EXPORT_WORKERS sets its size."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=int(os.getenv("REPORT_EXPORT_WORKERS", 2)),
+                                           thread_name_prefix='report-export')
+        return _executor
+
+
+class ReportBuilder:
+    """Markdown HEARS report for one InterviewSession, cached by the session's version.
+
+    `resolve` turns offloaded values (BlobRefs) back into text. Sections are
+    remembered with the objects they were rendered from, so a new answer or a
+    re-analysis re-renders that one question and nothing else.
+    """
+
+    def __init__(self, resolve: Callable = lambda value: value, executor: Optional[ThreadPoolExecutor] = None):
+        self.resolve = resolve
+        self.executor = executor
+        self._session = None
+        self._version = None
+        self._markdown = ''
+        self._sections = {}  # question_number -> (inputs, markdown)
+        self._exports = {}  # format -> Future of the file's bytes
+
+    def markdown(self, session) -> str:
+        """The full report, rebuilt only if the session changed since the last call."""
+        if session is self._session and session.version == self._version:
+            return self._markdown
+
+        responses = session.question_responses
+        now = datetime.now()
+        parts = [f"""# 🎯 AI Interview Simulator - HEARS Methodology Report
+
+**Interview Details:**
+- **Position:** {session.job_details.get('job_title', 'N/A')}
+- **Company:** {session.job_details.get('company_name', 'N/A')}
+- **Duration:** {session.interview_duration} minutes
+- **Questions Completed:** {len([r for r in responses if not r.skipped])}/{len(responses)}
+- **Date:** {now.strftime('%Y-%m-%d %H:%M')}
+
+---
+
+## 📝 Individual Question Analysis
+
+"""]
+        sections = {}
+        for response in responses:
+            feedback = session.individual_feedback.get(response.question_number)
+            inputs = (response.question, response.answer, feedback)
+            cached = self._sections.get(response.question_number)
+            if cached is None or any(old is not new for old, new in zip(cached[0], inputs)):
+                cached = (inputs, self._render_section(response, feedback))
+            sections[response.question_number] = cached
+            parts.append(cached[1])
+
+        overall = self.resolve(session.overall_feedback) if session.overall_feedback else 'Overall feedback not generated.'
+        parts.append(f"""
+---
+
+## 🎯 Overall HEARS Analysis
+
+{overall}
+
+---
+
+*Generated by AI Interview Simulator using HEARS Methodology*
+*Report generated on {now.strftime('%Y-%m-%d at %H:%M')}*
+""")
+        self._sections = sections
+        self._markdown = ''.join(parts)
+        self._session = session
+        self._version = session.version
+        self._exports = {}
+        return self._markdown
+
+    def _render_section(self, response, feedback) -> str:
+        if feedback is None:
+            analysis = "Individual feedback not available for this question."
+        elif feedback.success:
+            analysis = self.resolve(feedback.feedback)
+        else:
+            analysis = f"**Feedback Error:** {self.resolve(feedback.feedback)}"
+        return f"""
+### Question {response.question_number}
+
+**Question:** {response.question}
+
+**Your Answer:** {self.resolve(response.answer)}
+
+**HEARS Analysis:**
+{analysis}
+
+"""
+
+    def exports(self, session) -> Dict[str, Future]:
+        """Futures of the HTML/DOCX/PDF files for the current report, started in the background."""
+        text = self.markdown(session)
+        executor = self.executor or get_export_executor()
+        for fmt, render in RENDERERS.items():
+            if fmt not in self._exports:
+                self._exports[fmt] = executor.submit(render, text)
+        return dict(self._exports)
+
+
+# Block-level reading of the report markdown: headings, bullets, rules and paragraphs
+
+_INLINE = re.compile(r'\*\*(.+?)\*\*|\*([^*\s][^*]*?)\*')
+
+
+def markdown_blocks(text: str) -> Iterator[Tuple[str, int, str]]:
+    """Yield (kind, heading level, text) for 'heading', 'bullet', 'rule' and 'paragraph' blocks."""
+    paragraph = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        heading = re.match(r'(#{1,6})\s+(.*)', stripped)
+        bullet = re.match(r'[-*]\s+(.*)', stripped)
+        if paragraph and (not stripped or heading or bullet or stripped == '---'):
+            yield 'paragraph', 0, ' '.join(paragraph)
+            paragraph = []
+        if not stripped:
+            continue
+        if stripped == '---':
+            yield 'rule', 0, ''
+        elif heading:
+            yield 'heading', len(heading.group(1)), heading.group(2)
+        elif bullet:
+            yield 'bullet', 0, bullet.group(1)
+        else:
+            paragraph.append(stripped)
+    if paragraph:
+        yield 'paragraph', 0, ' '.join(paragraph)
+
+
+def inline_runs(text: str) -> List[Tuple[str, bool, bool]]:
+    """Split **bold** and *italic* markup into (text, bold, italic) runs."""
+    runs, position = [], 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            runs.append((text[position:match.start()], False, False))
+        if match.group(1) is not None:
+            runs.append((match.group(1), True, False))
+        else:
+            runs.append((match.group(2), False, True))
+        position = match.end()
+    if position < len(text):
+        runs.append((text[position:], False, False))
+    return runs
+
+
+def plain_text(text: str) -> str:
+    return ''.join(run for run, _, _ in inline_runs(text))
+
+
+# Renderers - each takes the report markdown and returns the file's bytes
+
+HTML_STYLE = """body { font-family: -apple-system, 'Segoe UI', Helvetica, Arial, sans-serif; max-width: 820px;
+       margin: 2rem auto; padding: 0 1rem; color: #1f2937; line-height: 1.55; }
+h1, h2, h3 { color: #b45309; } hr { border: 0; border-top: 1px solid #e5e7eb; margin: 1.5rem 0; }"""
+
+
+@timed('report_export', output_size=len, format='html')
+def render_html(text: str) -> bytes:
+    def inline(value: str) -> str:
+        out = []
+        for run, bold, italic in inline_runs(value):
+            run = html.escape(run)
+            out.append(f"<strong>{run}</strong>" if bold else f"<em>{run}</em>" if italic else run)
+        return ''.join(out)
+
+    body, in_list = [], False
+    for kind, level, value in markdown_blocks(text):
+        if in_list and kind != 'bullet':
+            body.append('</ul>')
+            in_list = False
+        if kind == 'heading':
+            body.append(f"<h{level}>{inline(value)}</h{level}>")
+        elif kind == 'bullet':
+            if not in_list:
+                body.append('<ul>')
+                in_list = True
+            body.append(f"<li>{inline(value)}</li>")
+        elif kind == 'rule':
+            body.append('<hr>')
+        else:
+            body.append(f"<p>{inline(value)}</p>")
+    if in_list:
+        body.append('</ul>')
+    document = (f"<!DOCTYPE html>\n<html lang=\"en\"><head><meta charset=\"utf-8\">"
+                f"<title>HEARS Interview Report</title><style>{HTML_STYLE}</style></head>\n<body>\n"
+                + '\n'.join(body) + "\n</body></html>\n")
+    return document.encode('utf-8')
+
+
+@timed('report_export', output_size=len, format='docx')
+def render_docx(text: str) -> bytes:
+    from docx import Document
+
+    document = Document()
+    # Looking styles up by name scans the whole style table on every paragraph, so the
+    # ids are resolved once and set on the paragraph XML directly.
+    style_ids = {name: document.styles[name].style_id
+                 for name in ['List Bullet'] + [f"Heading {level}" for level in range(1, 7)]}
+    for kind, level, value in markdown_blocks(text):
+        paragraph = document.add_paragraph()
+        if kind == 'heading':
+            paragraph._p.style = style_ids[f"Heading {level}"]
+            paragraph.add_run(plain_text(value))
+            continue
+        if kind == 'bullet':
+            paragraph._p.style = style_ids['List Bullet']
+        for run_text, bold, italic in inline_runs(value):
+            run = paragraph.add_run(run_text)
+            if bold:
+                run.bold = True
+            if italic:
+                run.italic = True
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+# A4 text-only PDF with the standard Helvetica fonts, so no PDF library is needed.
+# Characters outside WinAnsi (emoji in the headings) are dropped.
+PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT, PDF_MARGIN = 595, 842, 56
+PDF_BODY_SIZE = 10.5
+PDF_HEADING_SIZES = {1: 18, 2: 15, 3: 13}
+
+
+def _pdf_string(value: str) -> bytes:
+    encoded = value.encode('cp1252', errors='ignore').strip()
+    return b'(' + encoded.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+@timed('report_export', output_size=len, format='pdf')
+def render_pdf(text: str) -> bytes:
+    usable = PDF_PAGE_WIDTH - 2 * PDF_MARGIN
+    pages, ops = [], []
+    y = PDF_PAGE_HEIGHT - PDF_MARGIN
+
+    def line(value: str, size: float, bold: bool = False, indent: float = 0):
+        nonlocal ops, y
+        if y - size * 1.4 < PDF_MARGIN:
+            pages.append(ops)
+            ops, y = [], PDF_PAGE_HEIGHT - PDF_MARGIN
+        y -= size * 1.4
+        ops.append(b'BT /%s %g Tf %g %g Td %s Tj ET' % (b'F2' if bold else b'F1', size, PDF_MARGIN + indent, y,
+                                                       _pdf_string(value)))
+
+    def wrapped(value: str, size: float, bold: bool = False, indent: float = 0, first_prefix: str = ''):
+        # Helvetica averages about half an em per character
+        width = max(20, int((usable - indent) / (size * (0.55 if bold else 0.5))))
+        for i, chunk in enumerate(textwrap.wrap(value, width) or ['']):
+            if i == 0:
+                line(first_prefix + chunk, size, bold, indent)
+            else:
+                line(chunk, size, bold, indent + (10 if first_prefix else 0))
+
+    for kind, level, value in markdown_blocks(text):
+        value = plain_text(value)
+        if kind == 'heading':
+            y -= 6
+            wrapped(value, PDF_HEADING_SIZES.get(level, 11.5), bold=True)
+        elif kind == 'bullet':
+            wrapped(value, PDF_BODY_SIZE, indent=12, first_prefix='• ')
+        elif kind == 'rule':
+            y -= 8
+            ops.append(b'0.8 G %g %g m %g %g l S 0 G' % (PDF_MARGIN, y, PDF_PAGE_WIDTH - PDF_MARGIN, y))
+        else:
+            wrapped(value, PDF_BODY_SIZE)
+            y -= 4
+    pages.append(ops)
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in once the page objects are numbered
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>',
+    ]
+    page_ids = []
+    for page_ops in pages:
+        stream = zlib.compress(b'\n'.join(page_ops))
+        objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(stream), stream))
+        objects.append(b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+                       b'/Resources << /Font << /F1 3 0 R /F2 4 0 R >> >> >>'
+                       % (PDF_PAGE_WIDTH, PDF_PAGE_HEIGHT, len(objects)))
+        page_ids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids))
+
+    out = io.BytesIO()
+    out.write(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(b'%d 0 obj\n%s\nendobj\n' % (number, body))
+    xref = out.tell()
+    out.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+    out.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+    out.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+RENDERERS = {'html': render_html, 'docx': render_docx, 'pdf': render_pdf}
@@ -0,0 +1,183 @@
+# Rerun profiler - opt-in cProfile of Streamlit script runs, keeping only the slowest ones
+# RERUN_PROFILER=1 turns it on; kept runs (stage, duration, top functions) go to RERUN_PROFILE_FILE and the dev panel.
+
+import cProfile
+import heapq
+import itertools
+import json
+import logging
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TOP_FUNCTIONS = 15
+
+
+def _function_label(func) -> str:
+    filename, line, name = func
+    if filename == '~':  # builtins
+        return name
+    return f"{os.path.basename(filename)}:{line}({name})"
+
+
+def top_functions(profile: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> Dict[str, List[Dict]]:
+    """The `limit` functions with the most self time and the most cumulative time."""
+    stats = pstats.Stats(profile).stats  # {func: (primitive calls, calls, tottime, cumtime, callers)}
+    rows = [
+        {'function': _function_label(func), 'calls': calls, 'self_s': round(tottime, 4), 'cumulative_s': round(cumtime, 4)}
+        for func, (_, calls, tottime, cumtime, _) in stats.items()
+        if func[2] not in ('<built-in method builtins.exec>', "<method 'disable' of '_lsprof.Profiler' objects>")
+    ]
+    return {
+        'self': heapq.nlargest(limit, rows, key=lambda row: row['self_s']),
+        'cumulative': heapq.nlargest(limit, rows, key=lambda row: row['cumulative_s']),
+    }
+
+
+class RerunProfiler:
+    """Times every script run and keeps the `keep` slowest, with their profiles, in a min-heap.
+
+    cProfile is attached to a sampled fraction of runs and to one run at a
+    time, so concurrent sessions don't all pay the profiling overhead.
+    Function tables are only extracted for runs slow enough to be kept.
+    """
+
+    def __init__(self, keep: int = 20, sample_rate: float = 1.0, dump_path: Optional[str] = None):
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self.dump_path = dump_path
+        self._slowest = []  # min-heap of (seconds, sequence, run)
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._profiling = threading.Lock()
+        self.runs = 0
+        self.profiled = 0
+        self.by_stage = {}  # stage -> [runs, total seconds, max seconds]
+
+    def _threshold(self) -> float:
+        with self._lock:
+            return self._slowest[0][0] if len(self._slowest) >= self.keep else 0.0
+
+    @contextmanager
+    def profile(self, stage: str, session: str = ''):
+        profile = None
+        if random.random() < self.sample_rate and self._profiling.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:  # another profiler already owns this thread
+                self._profiling.release()
+                profile = None
+        started_at = datetime.now().isoformat(timespec='seconds')
+        started = time.perf_counter()
+        outcome = 'ok'
+        try:
+            yield
+        except BaseException as exc:
+            outcome = type(exc).__name__  # RerunException/StopException are normal control flow
+            raise
+        finally:
+            seconds = time.perf_counter() - started
+            if profile is not None:
+                profile.disable()
+                self._profiling.release()
+            self._finish(stage, session, started_at, seconds, outcome, profile)
+
+    def _finish(self, stage: str, session: str, started_at: str, seconds: float, outcome: str,
+                profile: Optional[cProfile.Profile]):
+        with self._lock:
+            self.runs += 1
+            self.profiled += profile is not None
+            totals = self.by_stage.setdefault(stage, [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+        if seconds <= self._threshold():
+            return
+        run = {'stage': stage, 'session': session[:8], 'started_at': started_at, 'seconds': round(seconds, 4),
+               'outcome': outcome, 'profiled': profile is not None}
+        if profile is not None:
+            run.update(top_functions(profile))
+        with self._lock:
+            entry = (seconds, next(self._sequence), run)
+            if len(self._slowest) < self.keep:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heappushpop(self._slowest, entry)
+        if self.dump_path:
+            self.dump(self.dump_path)
+
+    def slowest(self) -> List[Dict]:
+        """Kept runs, slowest first."""
+        with self._lock:
+            return [run for _, _, run in sorted(self._slowest, key=lambda entry: -entry[0])]
+
+    def stage_summary(self) -> List[Dict]:
+        with self._lock:
+            return [{'stage': stage, 'runs': runs, 'mean_s': round(total / runs, 4), 'max_s': round(worst, 4)}
+                    for stage, (runs, total, worst) in sorted(self.by_stage.items())]
+
+    def report(self) -> Dict:
+        return {'runs': self.runs, 'profiled': self.profiled, 'stages': self.stage_summary(),
+                'slowest': self.slowest()}
+
+    def dump(self, path: str):
+        """Write the report as JSON, atomically so readers never see half a file."""
+        try:
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.rerun-profile-')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.report(), f, indent=1)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning("could not write rerun profile to %s: %s", path, e)
+
+    def clear(self):
+        with self._lock:
+            self._slowest = []
+            self.by_stage = {}
+            self.runs = self.profiled = 0
+
+
+_default_profiler = None
+_default_profiler_lock = threading.Lock()
+
+
+def get_default_profiler() -> Optional[RerunProfiler]:
+    """Process-wide profiler when RERUN_PROFILER=1, else None.
+
+    RERUN_PROFILE_KEEP sets how many slow runs are kept, RERUN_PROFILE_SAMPLE
+    the fraction of runs profiled and RERUN_PROFILE_FILE a JSON dump path,
+    the way to read it in production; the app's sidebar panel also needs
+    RERUN_PROFILER_VIEW=1 because every visitor would see it.
+    """
+    global _default_profiler
+    if os.getenv('RERUN_PROFILER') != '1':
+        return None
+    with _default_profiler_lock:
+        if _default_profiler is None:
+            _default_profiler = RerunProfiler(
+                keep=int(os.getenv('RERUN_PROFILE_KEEP', 20)),
+                sample_rate=float(os.getenv('RERUN_PROFILE_SAMPLE', 1.0)),
+                dump_path=os.getenv('RERUN_PROFILE_FILE') or None,
+            )
+        return _default_profiler
+
+
+@contextmanager
+def profile_rerun(stage: str, session: str = ''):
+    """Profile the enclosed script run if RERUN_PROFILER=1; a plain passthrough otherwise."""
+    profiler = get_default_profiler()
+    if profiler is None:
+        yield
+        return
+    with profiler.profile(stage, session):
+        yield
@@ -0,0 +1,174 @@
+# Session memory budget - blob offloading, idle-session eviction and per-process memory accounting
+# Each Streamlit session registers itself on every rerun; large text goes to the shared BlobStore.
+
+import os
+import sys
+import threading
+import time
+import weakref
+from typing import Dict, List, Optional
+
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from blob_store import BlobRef, get_default_store
+from session_model import FeedbackRecord
+
+# Shared, not owned by the session, so never counted against it
+UNACCOUNTED_KEYS = {'gemini_client'}
+EVICTED_FLAG = 'session_evicted'
+
+
+def deep_sizeof(value, seen=None) -> int:
+    """Approximate bytes held by plain containers and strings (BlobRefs count as the handle only)."""
+    seen = set() if seen is None else seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    elif hasattr(value, '__slots__') and not isinstance(value, BlobRef):
+        transient = getattr(value, '_TRANSIENT', ())
+        size += sum(deep_sizeof(getattr(value, slot), seen) for slot in value.__slots__
+                    if slot not in transient and hasattr(value, slot))
+    elif hasattr(value, '__dict__') and not isinstance(value, type):
+        size += deep_sizeof(vars(value), seen)
+    return size
+
+
+def _clear_state(state):
+    """Empty another session's state through its public mapping interface.
+
+    Streamlit only acts on a session's pending rerun/stop requests in that
+    session's own script thread, so item access from the sweeping thread is safe.
+    """
+    for key in list(state.filtered_state):
+        if key not in UNACCOUNTED_KEYS:
+            del state[key]
+    state[EVICTED_FLAG] = True
+
+
+class SessionRegistry:
+    """Tracks live sessions by id, evicts ones idle past the TTL and reports their footprint."""
+
+    def __init__(self, idle_ttl: float = 3600.0, sweep_interval: float = 60.0, store=None):
+        self.idle_ttl = idle_ttl
+        self.sweep_interval = sweep_interval
+        self.store = store or get_default_store()
+        self._sessions = {}  # session_id -> [weakref to SafeSessionState, last_seen, stage]
+        self._evicted = 0
+        self._last_sweep = time.monotonic()
+        self._lock = threading.Lock()
+
+    def touch(self, session_id: str, state, stage: str = ''):
+        """Record activity for a session; runs an eviction sweep at most once per sweep_interval."""
+        now = time.monotonic()
+        with self._lock:
+            self._sessions[session_id] = [weakref.ref(state), now, stage]
+            due = now - self._last_sweep >= self.sweep_interval
+            if due:
+                self._last_sweep = now
+        if due:
+            self.sweep(now)
+
+    def sweep(self, now: Optional[float] = None) -> int:
+        """Drop state and blobs of sessions idle past the TTL or already closed by Streamlit."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            expired = [(session_id, entry[0]()) for session_id, entry in self._sessions.items()
+                       if entry[0]() is None or now - entry[1] > self.idle_ttl]
+            for session_id, _ in expired:
+                del self._sessions[session_id]
+        for session_id, state in expired:
+            if state is not None:
+                _clear_state(state)
+            self.store.drop_namespace(session_id)
+        with self._lock:
+            self._evicted += len(expired)
+        return len(expired)
+
+    def report(self, top: int = 10) -> List[Dict]:
+        """Largest sessions first: in-memory bytes, offloaded blob bytes and idle time."""
+        now = time.monotonic()
+        with self._lock:
+            entries = [(session_id, entry[0](), entry[1], entry[2]) for session_id, entry in self._sessions.items()]
+        rows = []
+        for session_id, state, last_seen, stage in entries:
+            if state is None:
+                continue
+            values = {k: v for k, v in state.filtered_state.items() if k not in UNACCOUNTED_KEYS}
+            usage = self.store.usage(session_id)
+            rows.append({
+                'session': session_id[:8],
+                'stage': stage,
+                'memory_bytes': deep_sizeof(values),
+                'blob_count': usage['blobs'],
+                'blob_bytes': usage['stored_bytes'],
+                'idle_seconds': round(now - last_seen, 1),
+            })
+        rows.sort(key=lambda row: row['memory_bytes'], reverse=True)
+        return rows[:top]
+
+    def metric_samples(self):
+        rows = self.report(top=sys.maxsize)
+        usage = self.store.usage()
+        return [
+            ('sessions_active', 'gauge', 'Sessions seen within the idle TTL', {}, len(rows)),
+            ('sessions_evicted_total', 'counter', 'Sessions evicted for idleness', {}, self._evicted),
+            ('session_state_bytes', 'gauge', 'Approximate in-memory session state across sessions', {},
+             sum(row['memory_bytes'] for row in rows)),
+            ('blob_store_bytes', 'gauge', 'Compressed bytes of offloaded session blobs', {}, usage['stored_bytes']),
+            ('blob_cache_bytes', 'gauge', 'Decoded blob cache size', {}, usage['cached_bytes']),
+        ]
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> SessionRegistry:
+    """Process-wide registry; SESSION_IDLE_TTL (seconds) sets the eviction age."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = SessionRegistry(idle_ttl=float(os.getenv('SESSION_IDLE_TTL', 3600)))
+        return _registry
+
+
+def _session_id() -> str:
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else 'shared'
+
+
+def touch_session(stage: str = '') -> bool:
+    """Register this rerun; returns True once if the session had been evicted for idleness."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return False
+    get_registry().touch(ctx.session_id, ctx.session_state, stage)
+    if EVICTED_FLAG in ctx.session_state:
+        del ctx.session_state[EVICTED_FLAG]
+        return True
+    return False
+
+
+def offload(value):
+    """Move large text for the current session into the blob store (small values pass through)."""
+    return get_default_store().offload(_session_id(), value)
+
+
+def offload_feedback(feedback_result: Dict) -> FeedbackRecord:
+    """FeedbackRecord for a GeminiClient feedback dict, with its markdown offloaded."""
+    return FeedbackRecord.from_result(dict(feedback_result, feedback=offload(feedback_result.get('feedback'))))
+
+
+def resolve(value):
+    """Text behind an offloaded value; plain values are returned as-is."""
+    return get_default_store().load(value)
+
+
+def resolve_responses(responses: List) -> List[Dict]:
+    """question_responses as plain dicts with answers materialised, for prompt building."""
+    return [dict(r, answer=resolve(r['answer'])) for r in responses]
@@ -0,0 +1,283 @@
+# Session model - one compact, typed object per browser session instead of loose session_state keys
+# Slotted records keep per-session memory low; resets are O(1) and serialization is versioned.
+
+import json
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, Optional
+
+from blob_store import BlobRef
+
+SCHEMA_VERSION = 2
+SKIPPED_ANSWER = '[Question Skipped]'
+
+
+class _Record:
+    """Slotted record that also reads like the dicts it replaced (r['answer'], dict(r))."""
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def keys(self):
+        return self.__slots__
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(self[k] == other[k] for k in self.__slots__)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{k}={self[k]!r}' for k in self.__slots__)})"
+
+
+class QuestionResponse(_Record):
+    __slots__ = ('question', 'answer', 'question_number', 'seconds')
+
+    def __init__(self, question: str, answer, question_number: int, seconds: Optional[float] = None):
+        self.question = question
+        self.answer = answer  # str or BlobRef
+        self.question_number = question_number
+        self.seconds = seconds  # time from showing the question to answering it
+
+    @property
+    def skipped(self) -> bool:
+        return self.answer == SKIPPED_ANSWER
+
+
+class FeedbackRecord(_Record):
+    __slots__ = ('question_number', 'success', 'feedback', 'error')
+
+    def __init__(self, question_number: int, success: bool, feedback, error: Optional[str] = None):
+        self.question_number = question_number
+        self.success = success
+        self.feedback = feedback  # str or BlobRef
+        self.error = error
+
+    @classmethod
+    def from_result(cls, result: Dict) -> 'FeedbackRecord':
+        """Build from a GeminiClient feedback dict."""
+        return cls(result['question_number'], result['success'], result['feedback'], result.get('error'))
+
+
+class InterviewTimer:
+    __slots__ = ('duration_seconds', 'start_time', 'question_start_time')
+
+    def __init__(self, duration_minutes: int):
+        self.duration_seconds = duration_minutes * 60
+        self.start_time = None
+        self.question_start_time = None
+
+    def start_interview(self):
+        self.start_time = datetime.now()
+
+    def start_question(self):
+        self.question_start_time = datetime.now()
+
+    def get_remaining_time(self) -> int:
+        if not self.start_time:
+            return self.duration_seconds
+
+        elapsed = (datetime.now() - self.start_time).total_seconds()
+        remaining = max(0, self.duration_seconds - elapsed)
+        return int(remaining)
+
+    def get_question_time(self) -> int:
+        if not self.question_start_time:
+            return 0
+
+        elapsed = (datetime.now() - self.question_start_time).total_seconds()
+        return int(elapsed)
+
+    def format_time(self, seconds: int) -> str:
+        minutes = seconds // 60
+        seconds = seconds % 60
+        return f"{minutes:02d}:{seconds:02d}"
+
+
+class InterviewSession:
+    """All per-session interview state. Transient fields are skipped by sizing and serialization."""
+    __slots__ = (
+        'stage', 'interview_id', 'resume_text', 'job_details', 'interview_duration', 'num_questions', 'duration_selected',
+        'questions', 'current_question_idx', 'question_responses', 'individual_feedback', 'overall_feedback',
+        'interview_completed', 'timer', 'question_timer_start', 'feedback_retries', 'version',
+    )
+    _TRANSIENT = ('feedback_retries', 'version')
+
+    def __init__(self):
+        self.version = 0
+        self.reset_all()
+
+    def touch(self):
+        """Mark report-visible content as changed (see report_builder)."""
+        self.version += 1
+
+    def add_response(self, response: QuestionResponse):
+        self.question_responses.append(response)
+        self.touch()
+
+    def set_feedback(self, record: FeedbackRecord):
+        self.individual_feedback[record.question_number] = record
+        self.touch()
+
+    def set_overall_feedback(self, feedback):
+        self.overall_feedback = feedback
+        self.touch()
+
+    def reset_all(self):
+        """Back to the upload stage with nothing kept."""
+        self.stage = 'upload'
+        self.resume_text = ""
+        self.reset_position()
+
+    def reset_position(self):
+        """New job: keep the resume, forget job details and the interview."""
+        self.job_details = {}
+        self.interview_duration = 15
+        self.num_questions = 3
+        self.duration_selected = False
+        self.reset_interview()
+
+    def reset_interview(self):
+        """Practice again: keep resume and job details, start a fresh interview."""
+        self.interview_id = uuid.uuid4().hex
+        self.questions = []
+        self.current_question_idx = 0
+        self.question_responses = []
+        self.individual_feedback = {}  # question_number -> FeedbackRecord
+        self.overall_feedback = ""
+        self.interview_completed = False
+        self.timer = None
+        self.question_timer_start = None
+        self.feedback_retries = {}  # question_number -> Future of an in-flight re-analysis
+        self.touch()
+
+    # Versioned serialization - compact positional rows, BlobRefs stay references
+    def to_dict(self) -> Dict:
+        timer = self.timer
+        return {
+            'version': SCHEMA_VERSION,
+            'stage': self.stage,
+            'interview_id': self.interview_id,
+            'resume_text': _encode(self.resume_text),
+            'job_details': self.job_details,
+            'interview_duration': self.interview_duration,
+            'num_questions': self.num_questions,
+            'duration_selected': self.duration_selected,
+            'questions': self.questions,
+            'current_question_idx': self.current_question_idx,
+            'question_responses': [[r.question, _encode(r.answer), r.question_number, r.seconds]
+                                   for r in self.question_responses],
+            'individual_feedback': [[f.question_number, f.success, _encode(f.feedback), f.error]
+                                    for f in self.individual_feedback.values()],
+            'overall_feedback': _encode(self.overall_feedback),
+            'interview_completed': self.interview_completed,
+            'timer': timer and [timer.duration_seconds, _encode_time(timer.start_time),
+                                _encode_time(timer.question_start_time)],
+            'question_timer_start': _encode_time(self.question_timer_start),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'InterviewSession':
+        version = data.get('version', 0)
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"session was saved by a newer schema (v{version} > v{SCHEMA_VERSION})")
+        while version < SCHEMA_VERSION:
+            data = _MIGRATIONS[version](data)
+            version = data['version']
+
+        session = cls()
+        session.stage = data['stage']
+        session.interview_id = data['interview_id']
+        session.resume_text = _decode(data['resume_text'])
+        session.job_details = data['job_details']
+        session.interview_duration = data['interview_duration']
+        session.num_questions = data['num_questions']
+        session.duration_selected = data['duration_selected']
+        session.questions = data['questions']
+        session.current_question_idx = data['current_question_idx']
+        session.question_responses = [QuestionResponse(q, _decode(a), n, seconds)
+                                      for q, a, n, seconds in data['question_responses']]
+        session.individual_feedback = {n: FeedbackRecord(n, ok, _decode(text), error)
+                                       for n, ok, text, error in data['individual_feedback']}
+        session.overall_feedback = _decode(data['overall_feedback'])
+        session.interview_completed = data['interview_completed']
+        if data['timer']:
+            seconds, started, question_started = data['timer']
+            session.timer = InterviewTimer(0)
+            session.timer.duration_seconds = seconds
+            session.timer.start_time = _decode_time(started)
+            session.timer.question_start_time = _decode_time(question_started)
+        session.question_timer_start = _decode_time(data['question_timer_start'])
+        return session
+
+    def dumps(self) -> bytes:
+        return json.dumps(self.to_dict(), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+    @classmethod
+    def loads(cls, data: bytes) -> 'InterviewSession':
+        return cls.from_dict(json.loads(data))
+
+    def checkpoint(self, path: str):
+        """Atomically write the session to `path`."""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(self.dumps())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def restore(cls, path: str) -> 'InterviewSession':
+        with open(path, 'rb') as f:
+            return cls.loads(f.read())
+
+
+def _migrate_v0(data: Dict) -> Dict:
+    """v0 is the old flat session_state dict (dict responses, dict-of-dict feedback)."""
+    return dict(
+        data,
+        version=1,
+        question_responses=[[r['question'], r['answer'], r['question_number']]
+                            for r in data.get('question_responses', [])],
+        individual_feedback=[[f['question_number'], f['success'], f['feedback'], f.get('error')]
+                             for f in data.get('individual_feedback', {}).values()],
+        timer=None,
+        question_timer_start=None,
+    )
+
+
+def _migrate_v1(data: Dict) -> Dict:
+    """v2 adds per-answer timings and an id per interview (for the practice history)."""
+    return dict(
+        data,
+        version=2,
+        interview_id=uuid.uuid4().hex,
+        question_responses=[row + [None] for row in data['question_responses']],
+    )
+
+
+_MIGRATIONS = {0: _migrate_v0, 1: _migrate_v1}
+
+
+def _encode(value):
+    if isinstance(value, BlobRef):
+        return {'$blob': [value.namespace, value.key, value.length, value.stored_bytes]}
+    return value
+
+
+def _decode(value):
+    if isinstance(value, dict) and '$blob' in value:
+        return BlobRef(*value['$blob'])
+    return value
+
+
+def _encode_time(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
+def _decode_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
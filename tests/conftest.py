@@ -0,0 +1,13 @@
+# Test setup - run against the offline LLM stand-in with on-disk stores switched off
+# Modules live in the repository root, so it goes on sys.path before any test imports them.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault('GEMINI_BACKEND', 'offline')
+os.environ.setdefault('OFFLINE_LLM_LATENCY', '0')
+os.environ.setdefault('GEMINI_RATE_PER_MINUTE', '6000')
+os.environ.setdefault('USAGE_LEDGER', '0')
+os.environ.setdefault('PRACTICE_HISTORY', '0')
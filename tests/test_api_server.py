@@ -0,0 +1,129 @@
+import pytest
+
+pytest.importorskip('httpx')  # starlette's TestClient
+
+from starlette.testclient import TestClient
+
+import api_server
+from llm_resilience import get_default_caller
+from llm_scheduler import get_default_scheduler
+from usage_ledger import UsageLedger
+
+QUESTIONS = {'resume_text': 'Backend engineer, 6 years of Python.', 'job_details': {}, 'num_questions': 2}
+OVERALL = {'responses': [{'question': 'Tell me about a conflict.', 'answer': 'I listened first.'}], 'job_details': {}}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(api_server, '_client', None)
+    return TestClient(api_server.create_app())
+
+
+@pytest.fixture
+def full_queue(monkeypatch):
+    monkeypatch.setattr(get_default_scheduler(), 'max_queue', 0)
+
+
+@pytest.fixture
+def one_question_set_a_day(client, monkeypatch, tmp_path):
+    ledger = UsageLedger(str(tmp_path / 'usage.sqlite3'), operation_limits={'questions': 1})
+    monkeypatch.setattr(api_server.get_client(), 'usage', ledger)
+    monkeypatch.setenv('API_KEYS', 'team-a,team-b')
+    monkeypatch.setattr(api_server, '_api_keys', None)
+    return ledger
+
+
+def test_questions_ok(client):
+    response = client.post('/v1/questions', json=QUESTIONS)
+    assert response.status_code == 200
+    assert len(response.json()['questions']) == 2
+
+
+@pytest.mark.parametrize('path, body', [
+    ('/v1/questions', QUESTIONS),
+    ('/v1/feedback/individual', {'question': 'Tell me about a conflict.', 'answer': 'I listened first.'}),
+    ('/v1/feedback/overall', OVERALL),
+])
+def test_full_queue_is_429_with_retry_after(client, full_queue, path, body):
+    response = client.post(path, json=body)
+    assert response.status_code == 429
+    assert response.headers['Retry-After']
+    assert 'queue is full' in response.json()['error']
+
+
+def test_used_up_quota_is_429(client, one_question_set_a_day):
+    assert client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'team-a'}).status_code == 200
+    response = client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'team-a'})
+    assert response.status_code == 429
+    assert 'Daily limit' in response.json()['error']
+
+
+def test_quota_is_per_caller(client, one_question_set_a_day):
+    assert client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'team-a'}).status_code == 200
+    assert client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'team-b'}).status_code == 200
+    assert client.post('/v1/questions', json=QUESTIONS).status_code == 200  # by client address
+    assert client.post('/v1/questions', json=QUESTIONS).status_code == 429
+    users = {row['user_id'] or row['session_id'] for row in one_question_set_a_day.summary(by=['user_id', 'session_id'])}
+    assert len(users) == 3 and 'team-a' not in ' '.join(users)
+
+
+def test_unknown_keys_share_the_address_quota(client, one_question_set_a_day):
+    assert client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'made-up-1'}).status_code == 200
+    assert client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'made-up-2'}).status_code == 429
+    assert client.post('/v1/questions', json=QUESTIONS, headers={'X-API-Key': 'team-a'}).status_code == 200
+
+
+def test_open_circuit_is_503_with_retry_after(client, monkeypatch):
+    breaker = get_default_caller().breaker
+    with breaker._lock:
+        breaker._open()
+    try:
+        response = client.post('/v1/questions', json=QUESTIONS)
+    finally:
+        with breaker._lock:
+            breaker._state = breaker.CLOSED
+    assert response.status_code == 503
+    assert response.headers['Retry-After']
+
+
+@pytest.mark.parametrize('path, body, error', [
+    ('/v1/questions', dict(QUESTIONS, job_details='Backend Engineer'), "'job_details' must be an object"),
+    ('/v1/questions', dict(QUESTIONS, num_questions='2'), "'num_questions' must be an integer"),
+    ('/v1/feedback/individual', {'question': ['Q1?']}, "'question' must be a string"),
+    ('/v1/feedback/individual', {'question': 'Q1?', 'answer': {'text': 'Yes.'}}, "'answer' must be a string"),
+    ('/v1/feedback/individual', {'question': 'Q1?', 'question_number': '1'}, "'question_number' must be an integer"),
+    ('/v1/feedback/individual', {'question': 'Q1?', 'question_number': True}, "'question_number' must be an integer"),
+    ('/v1/feedback/individual', {'question': 'Q1?', 'job_details': []}, "'job_details' must be an object"),
+    ('/v1/feedback/individual/batch', {'responses': [{'question': 42}]}, "responses[0]: 'question' must be a string"),
+    ('/v1/feedback/overall', {'responses': [{'question': 'Q1?', 'answer': 7}]}, "responses[0]: 'answer' must be"),
+    ('/v1/feedback/overall', {'responses': [{'question': 'Q1?', 'question_number': 1.5}]}, "'question_number' must be"),
+    ('/v1/feedback/overall', dict(OVERALL, job_details='Acme'), "'job_details' must be an object"),
+    ('/v1/feedback/overall', {'responses': [{'answer': 'Yes.'}]}, "responses[0]: 'question' is required"),
+])
+def test_mistyped_fields_are_400(client, path, body, error):
+    response = client.post(path, json=body)
+    assert response.status_code == 400
+    assert error in response.json()['error']
+
+
+def test_optional_fields_may_be_omitted_or_null(client):
+    body = {'question': 'Tell me about a conflict.', 'answer': None, 'job_details': None}
+    assert client.post('/v1/feedback/individual', json=body).status_code == 200
+    assert client.post('/v1/feedback/overall', json={'responses': [{'question': 'Q1?', 'answer': ''}]}).status_code == 200
+
+
+def test_non_numeric_content_length_is_400(client):
+    response = client.post('/v1/resume?filename=resume.txt', content=b'Backend engineer. ' * 50,
+                           headers={'content-length': 'lots'})
+    assert response.status_code == 400
+
+
+def test_oversized_streamed_upload_stops_with_413(client):
+    chunk = b'a' * 65536
+
+    def body():  # no Content-Length, so only the streaming limit can stop it
+        for _ in range(200):
+            yield chunk
+
+    response = client.post('/v1/resume?filename=resume.txt', content=body())
+    assert response.status_code == 413
@@ -0,0 +1,44 @@
+import cohort_analytics
+from history_store import HEARS_DIMENSIONS, HistoryStore
+from session_model import FeedbackRecord, InterviewSession, QuestionResponse
+
+SCORED = '\n'.join(f"### {name.title()} ({name.title()})\nScore: 7/10" for name in HEARS_DIMENSIONS)
+
+
+def interview(scored: bool = True) -> InterviewSession:
+    session = InterviewSession()
+    session.job_details = {'job_title': 'Backend Engineer'}
+    session.add_response(QuestionResponse('Tell me about a conflict.', 'I listened first.', 1, 42.0))
+    if scored:
+        session.set_feedback(FeedbackRecord(1, True, SCORED))
+    else:
+        session.set_feedback(FeedbackRecord(1, False, 'Unable to generate feedback.', 'timeout'))
+    return session
+
+
+def test_record_after_empty_history(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    assert cohort_analytics.get_cohort(store.path).empty
+
+    store.record('ann', interview())
+    cohort = cohort_analytics.get_cohort(store.path)
+    assert len(cohort) == 1
+    assert cohort['total'].iloc[0] == 35.0
+
+    store.record('bob', interview())
+    assert list(cohort_analytics.get_cohort(store.path)['user_id']) == ['ann', 'bob']
+
+
+def test_unscored_interview_after_scored_ones(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.sqlite3'))
+    store.record('ann', interview())
+    assert len(cohort_analytics.get_cohort(store.path)) == 1
+
+    store.record('ann', interview(scored=False))
+    cohort = cohort_analytics.get_cohort(store.path)
+    assert len(cohort) == 1
+
+    store.record('bob', interview())
+    cohort = cohort_analytics.get_cohort(store.path)
+    assert list(cohort['user_id']) == ['ann', 'bob']
+    assert cohort['user_id'].dtype == 'category'
@@ -0,0 +1,173 @@
+import io
+import struct
+import zipfile
+
+import docx
+import pytest
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+import file_processor
+from file_processor import (FileProcessor, InMemoryUpload, UploadRejected, check_content, iter_docx_blocks,
+                            process_resume_path, sniff_content)
+
+RESUME = 'Backend engineer with six years of Python, Postgres and AWS experience. '
+
+
+def resume_docx() -> bytes:
+    """Body paragraphs around a table whose middle cell holds a nested table."""
+    document = docx.Document()
+    document.add_heading('Jane Doe', level=1)
+    intro = document.add_paragraph(RESUME)
+    intro.add_run('Remote\tor London.').add_break()
+    intro.add_run('Available now.')
+    table = document.add_table(rows=2, cols=3)
+    for row, cells in zip(table.rows, [('Company', 'Role', 'Years'), ('Acme', '', '2019-2024')]):
+        for cell, text in zip(row.cells, cells):
+            cell.text = text
+    role = table.cell(1, 1)
+    role.text = 'Senior engineer'
+    nested = role.add_table(rows=2, cols=2)
+    for row, cells in zip(nested.rows, [('Stack', 'Python'), ('Team', '6')]):
+        for cell, text in zip(row.cells, cells):
+            cell.text = text
+    document.add_paragraph('')
+    document.add_paragraph('Education: BSc Computer Science.')
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
+
+
+def python_docx_blocks(data: bytes):
+    """What iter_docx_blocks should yield, read through python-docx's object model."""
+    document = docx.Document(io.BytesIO(data))
+
+    def rows(tbl, parent):
+        for row in Table(tbl, parent).rows:
+            yield ' | '.join(text for text in (cell_text(cell) for cell in row.cells) if text)
+
+    def cell_text(cell):
+        parts = []
+        for child in cell._tc.iterchildren():
+            if child.tag == qn('w:p'):
+                parts.append(Paragraph(child, cell).text)
+            elif child.tag == qn('w:tbl'):
+                parts.extend(rows(child, cell))
+        return ' '.join(part for part in parts if part.strip())
+
+    for child in document.element.body.iterchildren():
+        if child.tag == qn('w:p'):
+            yield Paragraph(child, document).text
+        elif child.tag == qn('w:tbl'):
+            yield from (row for row in rows(child, document) if row)
+
+
+def zip_bytes(files) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in files.items():
+            archive.writestr(name, data)
+    return buf.getvalue()
+
+
+def test_docx_blocks_match_python_docx():
+    data = resume_docx()
+    blocks = list(iter_docx_blocks(io.BytesIO(data)))
+    assert blocks == list(python_docx_blocks(data))
+    assert 'Acme | Senior engineer Stack | Python Team | 6 | 2019-2024' in blocks
+    assert blocks[-1] == 'Education: BSc Computer Science.'  # the body resumes after the table
+    assert f'{RESUME}Remote\tor London.\nAvailable now.' in blocks
+
+
+def test_docx_upload_keeps_tables_in_order():
+    ok, text = FileProcessor.process_resume_file(InMemoryUpload(resume_docx(), 'resume.docx'))
+    assert ok
+    assert text.index('Company | Role | Years') < text.index('Acme | Senior engineer') < text.index('Education')
+
+
+@pytest.mark.parametrize('head, kind', [
+    (b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n', 'pdf'),
+    (b'\r\n%PDF-1.4\n', 'pdf'),  # junk before the header is tolerated
+    (b'PK\x03\x04\x14\x00', 'zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1\x00\x00', 'ole'),
+    ('Jane Doe — Backend engineer\n'.encode('utf-8'), 'text'),
+    ('é'.encode('utf-8') * 4095 + b'\xc3', 'text'),  # the sniffed head may end mid-character
+    (b'\x89PNG\r\n\x1a\n\x00\x00', None),
+    (b'\xff\xfe\xfd not utf-8', None),
+])
+def test_sniff_content(head, kind):
+    assert sniff_content(head) == kind
+
+
+@pytest.mark.parametrize('name, head, reason', [
+    ('resume.docx', b'%PDF-1.7\n', 'content_mismatch'),       # a PDF renamed to .docx
+    ('resume.pdf', RESUME.encode(), 'content_mismatch'),      # plain text renamed to .pdf
+    ('resume.doc', b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'legacy_doc'),
+    ('resume.exe', b'MZ', 'extension'),
+])
+def test_check_content_rejects_mismatches(name, head, reason):
+    with pytest.raises(UploadRejected) as rejected:
+        check_content(name, head)
+    assert rejected.value.reason == reason
+
+
+@pytest.mark.parametrize('name, head', [
+    ('resume.docx', b'PK\x03\x04'), ('resume.pdf', b'%PDF-1.4'), ('resume.txt', RESUME.encode()),
+])
+def test_check_content_accepts_matching_uploads(name, head):
+    check_content(name, head)
+
+
+def test_pdf_renamed_to_docx_is_rejected_before_parsing():
+    ok, message = FileProcessor.process_resume_file(InMemoryUpload(b'%PDF-1.4\n' + b'0' * 200, 'resume.docx'))
+    assert not ok
+    assert 'looks like a PDF' in message
+
+
+def test_zip_that_is_not_a_docx_is_rejected():
+    upload = InMemoryUpload(zip_bytes({'notes.txt': RESUME * 10}), 'resume.docx')
+    ok, message = FileProcessor.process_resume_file(upload)
+    assert not ok
+    assert message.startswith('Not a valid Word document')
+
+
+def test_plain_text_resume_is_read():
+    ok, text = FileProcessor.process_resume_file(InMemoryUpload((RESUME * 3).encode(), 'resume.txt'))
+    assert ok
+    assert text == (RESUME * 3).strip()
+
+
+def test_zip_member_with_an_understated_size_is_not_inflated(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_processor, 'MAX_UPLOAD_BYTES', 4096)
+    data = bytearray(zip_bytes({'resume.txt': RESUME * 1000}))
+    # Claim 1000 bytes in the local and central headers; the member really inflates to ~72kB,
+    # so reading stops at the claimed size and the CRC check fails instead of inflating it all
+    data[22:26] = struct.pack('<I', 1000)
+    central = data.find(b'PK\x01\x02')
+    data[central + 24:central + 28] = struct.pack('<I', 1000)
+    path = tmp_path / 'resumes.zip'
+    path.write_bytes(bytes(data))
+
+    ok, message = process_resume_path(str(path), 'resume.txt')
+    assert not ok
+    assert message.startswith('Error reading file')
+
+
+def test_file_that_grew_after_stat_is_rejected_by_bytes_read(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_processor, 'MAX_UPLOAD_BYTES', 4096)
+    path = tmp_path / 'resume.txt'
+    path.write_bytes((RESUME * 100).encode())
+    monkeypatch.setattr(file_processor.os.path, 'getsize', lambda p: 1000)  # size seen before the file grew
+
+    ok, message = process_resume_path(str(path))
+    assert not ok
+    assert message == 'File size exceeds maximum allowed size (10MB)'
+
+
+def test_resume_path_reads_zip_members(tmp_path):
+    path = tmp_path / 'resumes.zip'
+    path.write_bytes(zip_bytes({'jane.txt': RESUME * 3, 'jane.docx': resume_docx()}))
+    assert process_resume_path(str(path), 'jane.txt') == (True, (RESUME * 3).strip())
+    ok, text = process_resume_path(str(path), 'jane.docx')
+    assert ok and 'Education: BSc Computer Science.' in text
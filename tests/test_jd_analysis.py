@@ -0,0 +1,118 @@
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+import gemini_client
+import jd_analysis
+from gemini_client import GeminiClient
+from jd_analysis import JDAnalysis, JDAnalysisCache, description_key
+
+DESCRIPTION = "We are hiring a senior backend engineer to own our payments platform. " * 12
+ANALYSIS = {'competencies': ['Python', 'Distributed systems'], 'seniority': 'Senior', 'key_phrases': ['payments']}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = JDAnalysisCache(failure_backoff=60)
+    monkeypatch.setattr(gemini_client, 'get_default_jd_cache', lambda: cache)
+    return cache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(jd_analysis, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+def test_concurrent_job_summaries_share_one_llm_call(cache, monkeypatch):
+    client = GeminiClient()
+    calls = []
+    release = threading.Event()
+
+    def generate(operation, prompt):
+        calls.append(operation)
+        release.wait(5)
+        return SimpleNamespace(text=json.dumps(ANALYSIS))
+
+    monkeypatch.setattr(client, '_generate', generate)
+    job_details = {'job_title': 'Backend Engineer', 'job_description': DESCRIPTION}
+    start = threading.Barrier(8)
+    summaries = []
+
+    def summarize():
+        start.wait(5)
+        summaries.append(client.job_summary(job_details))
+
+    threads = [threading.Thread(target=summarize) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert summaries == [None] * 8  # nobody waits for the analysis; prompts use the raw text meanwhile
+
+    release.set()
+    cache.compute(description_key(DESCRIPTION), lambda: pytest.fail("analysis ran twice")).result(timeout=5)
+    assert calls == ['jd_analysis']
+    summary = client.job_summary(dict(job_details, job_description=DESCRIPTION.upper()))  # same posting
+    assert summary == 'Seniority: Senior. Required competencies: Python, Distributed systems. Key phrases: payments.'
+    assert calls == ['jd_analysis']
+
+
+def test_failed_analysis_is_not_retried_within_the_backoff(clock):
+    cache = JDAnalysisCache(failure_backoff=60)
+    calls = []
+
+    def analyze():
+        calls.append(clock.now)
+        raise ValueError("no JSON object in the analysis response")
+
+    with pytest.raises(ValueError):
+        cache.compute('jd', analyze).result()
+    clock.advance(59)
+    with pytest.raises(ValueError):
+        cache.compute('jd', analyze).result()  # fails fast with the remembered error
+    assert len(calls) == 1
+    assert (cache.stats()['failures'], cache.stats()['backed_off']) == (1, 1)
+
+    clock.advance(1)
+    assert cache.compute('jd', lambda: JDAnalysis('jd', ['Python'], '', [])).result().competencies == ['Python']
+    clock.advance(1000)
+    assert cache.compute('jd', analyze).result().key == 'jd'  # success clears the failure for good
+    assert len(calls) == 1
+
+
+def test_concurrent_misses_on_an_executor_run_once():
+    cache = JDAnalysisCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def analyze():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return JDAnalysis('jd', ['Python'], 'Senior', [])
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        first = cache.compute('jd', analyze, executor=executor)
+        assert started.wait(5)
+        others = [cache.compute('jd', analyze, executor=executor) for _ in range(5)]
+        assert all(future is first for future in others)
+        release.set()
+        assert first.result(timeout=5).seniority == 'Senior'
+    assert calls == [1]
+    assert cache.stats()['inflight'] == 0
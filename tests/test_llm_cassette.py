@@ -0,0 +1,45 @@
+import pytest
+
+from llm_cassette import Cassette, ReplayedError, ReplayModel, prompt_key, template_key
+from llm_resilience import is_retryable
+
+PROMPT = 'Generate 3 interview questions for a backend engineer.'
+
+
+def cassette(error, chunks=()) -> Cassette:
+    return Cassette([{
+        'v': 1, 'model': 'gemini-1.5-flash', 'key': prompt_key(PROMPT), 'template': template_key(PROMPT),
+        'prompt': PROMPT, 'timeout': 30, 'stream': bool(chunks), 'latency': 0.5,
+        'chunks': [list(chunk) for chunk in chunks], 'usage': None, 'error': error,
+    }])
+
+
+@pytest.mark.parametrize('error, expected, retryable', [
+    ({'type': 'TimeoutError', 'message': 'read timed out', 'code': None}, TimeoutError, True),
+    ({'type': 'ConnectionError', 'message': 'connection dropped', 'code': None}, ConnectionError, True),
+    ({'type': 'ConnectionResetError', 'message': 'reset by peer', 'code': None}, ConnectionResetError, True),
+    ({'type': 'ResourceExhausted', 'message': '429 quota exceeded', 'code': 429}, ReplayedError, True),
+    ({'type': 'InvalidArgument', 'message': '400 bad prompt', 'code': 400}, ReplayedError, False),
+    ({'type': 'ValueError', 'message': 'response was blocked', 'code': None}, ReplayedError, False),
+])
+def test_recorded_errors_replay_with_their_type(error, expected, retryable):
+    model = ReplayModel('gemini-1.5-flash', cassette(error), speed=0)
+    with pytest.raises(expected) as raised:
+        model.generate_content(PROMPT)
+    assert type(raised.value) is expected
+    assert str(raised.value) == error['message']
+    assert is_retryable(raised.value) is retryable
+
+    stream = ReplayModel('gemini-1.5-flash', cassette(error, chunks=[(0.1, 'Q1. ')]), speed=0)
+    response = stream.generate_content(PROMPT, stream=True)
+    with pytest.raises(expected):
+        response.resolve()
+    assert response.text == 'Q1. '
+
+
+def test_replayed_error_keeps_the_original_type_name():
+    error = {'type': 'ServiceUnavailable', 'message': '503 overloaded', 'code': 503}
+    with pytest.raises(ReplayedError) as raised:
+        ReplayModel('gemini-1.5-flash', cassette(error), speed=0).generate_content(PROMPT)
+    assert raised.value.code == 503
+    assert raised.value.original_type == 'ServiceUnavailable'
@@ -0,0 +1,206 @@
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import llm_resilience
+from llm_resilience import CallPolicy, CircuitBreaker, CircuitOpenError, ResilientCaller, is_retryable
+from llm_scheduler import RequestScheduler
+
+
+class StatusError(Exception):
+    """Stands in for a google.api_core error carrying an HTTP status."""
+
+    def __init__(self, code):
+        super().__init__(f"status {code}")
+        self.code = code
+
+
+class FakeModel:
+    """Scripted attempts: each entry is an exception to raise, a (seconds, result) delay, or a result."""
+
+    def __init__(self, *script):
+        self.script = list(script)
+        self.calls = []  # monotonic start time of every attempt
+        self._lock = threading.Lock()
+
+    def __call__(self, timeout: float):
+        with self._lock:
+            self.calls.append(time.monotonic())
+            outcome = self.script[min(len(self.calls), len(self.script)) - 1]
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, tuple):
+            time.sleep(outcome[0])
+            return outcome[1]
+        return outcome
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_resilience, 'time', SimpleNamespace(monotonic=clock.monotonic, sleep=clock.advance))
+    return clock
+
+
+def make_caller(breaker=None, **policy) -> ResilientCaller:
+    policy = dict({'attempt_timeout': 5.0, 'deadline': 10.0, 'max_attempts': 3, 'base_delay': 0.001,
+                   'max_delay': 0.002}, **policy)
+    return ResilientCaller(policies={'op': CallPolicy(**policy)}, max_workers=4,
+                           breaker=breaker or CircuitBreaker(min_calls=100),
+                           scheduler=RequestScheduler(rate_per_minute=60000, burst=100))
+
+
+@pytest.mark.parametrize('exc, retryable', [
+    (StatusError(408), True), (StatusError(429), True), (StatusError(500), True),
+    (StatusError(502), True), (StatusError(503), True), (StatusError(504), True),
+    (StatusError(400), False), (StatusError(401), False), (StatusError(403), False), (StatusError(404), False),
+    (StatusError(SimpleNamespace(value=503)), True),  # grpc/http status enum
+    (TimeoutError(), True), (ConnectionResetError(), True), (ValueError('blocked'), False),
+])
+def test_is_retryable(exc, retryable):
+    assert is_retryable(exc) is retryable
+
+
+def test_retryable_error_is_retried():
+    caller = make_caller()
+    model = FakeModel(StatusError(503), StatusError(429), 'questions')
+    assert caller.call('op', model) == 'questions'
+    stats = caller.stats.snapshot()['op']
+    assert (stats['attempts'], stats['retries'], stats['successes']) == (3, 2, 1)
+
+
+def test_non_retryable_error_fails_at_once():
+    caller = make_caller()
+    model = FakeModel(StatusError(400), 'never')
+    with pytest.raises(StatusError):
+        caller.call('op', model)
+    assert len(model.calls) == 1
+    assert caller.breaker.snapshot()['window_calls'] == 0  # a bad request says nothing about the backend
+
+
+def test_retries_stop_at_max_attempts():
+    caller = make_caller(max_attempts=2)
+    model = FakeModel(StatusError(503))
+    with pytest.raises(StatusError):
+        caller.call('op', model)
+    assert len(model.calls) == 2
+    assert caller.scheduler.snapshot()['in_flight'] == 0
+
+
+def test_backoff_is_full_jitter_within_the_cap():
+    random.seed(7)
+    policy = CallPolicy(base_delay=0.5, max_delay=8.0)
+    for attempt in range(1, 9):
+        cap = min(8.0, 0.5 * 2 ** (attempt - 1))
+        delays = [policy.backoff(attempt) for _ in range(500)]
+        assert all(0 <= delay <= cap for delay in delays)
+        assert max(delays) > 0.9 * cap and min(delays) < 0.1 * cap
+
+
+def test_hedge_fires_at_p95_and_first_result_wins():
+    caller = make_caller(hedge=True, hedge_min_delay=0.01, hedge_initial_delay=5.0)
+    for seconds in [0.01] * 19 + [0.1]:
+        caller.latencies.record('op', seconds)
+    assert caller._hedge_delay('op', caller.policy_for('op')) == 0.1
+
+    model = FakeModel((1.0, 'slow primary'), 'hedge')
+    started = time.monotonic()
+    assert caller.call('op', model) == 'hedge'
+    assert 0.1 <= model.calls[1] - model.calls[0] < 0.5
+    assert time.monotonic() - started < 0.9
+    stats = caller.stats.snapshot()['op']
+    assert (stats['hedges'], stats['hedge_wins']) == (1, 1)
+
+    time.sleep(1.0)  # the abandoned primary still gives its slot back when it finishes
+    assert caller.scheduler.snapshot()['in_flight'] == 0
+
+
+def test_no_hedge_when_primary_answers_in_time():
+    caller = make_caller(hedge=True, hedge_min_delay=0.2)
+    model = FakeModel('primary', 'hedge')
+    assert caller.call('op', model) == 'primary'
+    assert len(model.calls) == 1
+    assert caller.stats.snapshot()['op']['hedges'] == 0
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, window=4, min_calls=4, open_seconds=30,
+                             half_open_max_calls=2)
+    for ok in (True, False, True, False):
+        breaker.before_call()
+        if ok:
+            breaker.record_success()
+        else:
+            breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock.advance(29.9)
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.advance(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # only half_open_max_calls trials at once
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.snapshot()['window_calls'] == 0
+
+
+def test_half_open_failure_reopens(clock):
+    breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=30, half_open_max_calls=2)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.snapshot()['times_opened'] == 2
+    clock.advance(29)
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_release_frees_a_half_open_trial(clock):
+    breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=30, half_open_max_calls=1)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock.advance(30)
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.release()
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_non_retryable_error_during_half_open_releases_the_trial():
+    breaker = CircuitBreaker(window=2, min_calls=2, open_seconds=30, half_open_max_calls=1)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker._opened_at -= 30  # as if the open period had passed
+    caller = make_caller(breaker=breaker)
+
+    with pytest.raises(StatusError):
+        caller.call('op', FakeModel(StatusError(400)))
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert caller.call('op', FakeModel('ok')) == 'ok'  # the trial was handed back, not used up
+    assert breaker.state == CircuitBreaker.CLOSED
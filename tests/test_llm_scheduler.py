@@ -0,0 +1,107 @@
+import threading
+import time
+
+import pytest
+
+from llm_resilience import CallPolicy, CircuitBreaker, ResilientCaller
+from llm_scheduler import RequestScheduler, SchedulerBusyError, TokenBucket, background_priority
+
+
+def wait_until(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def queue_behind(scheduler: RequestScheduler, order: list, name: str, operation: str, background: bool = False):
+    def run():
+        if background:
+            with background_priority():
+                admitted_at = scheduler.acquire(operation)
+        else:
+            admitted_at = scheduler.acquire(operation)
+        order.append(name)
+        scheduler.release(admitted_at)
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_background_request_waits_behind_interactive_one():
+    scheduler = RequestScheduler(rate_per_minute=60000, burst=100, max_in_flight=1)
+    held = scheduler.acquire('questions')
+    order = []
+    threads = [queue_behind(scheduler, order, 'bulk', 'questions', background=True)]
+    wait_until(lambda: scheduler.snapshot()['queued'] == 1)
+    threads.append(queue_behind(scheduler, order, 'candidate', 'questions'))  # arrives later, served first
+    wait_until(lambda: scheduler.snapshot()['queued'] == 2)
+
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(5)
+    assert order == ['candidate', 'bulk']
+    assert scheduler.snapshot()['in_flight'] == 0
+
+
+def test_no_wait_acquire_raises_without_a_free_slot():
+    scheduler = RequestScheduler(rate_per_minute=60000, burst=100, max_in_flight=1, max_queue=1)
+    held = scheduler.acquire('questions')
+    with pytest.raises(SchedulerBusyError):
+        scheduler.acquire('questions', wait=False)  # queue has room, but no slot is free right now
+
+    order = []
+    thread = queue_behind(scheduler, order, 'waiter', 'questions')
+    wait_until(lambda: scheduler.snapshot()['queued'] == 1)
+    with pytest.raises(SchedulerBusyError, match='queue is full'):
+        scheduler.acquire('questions', wait=False)
+    assert scheduler.snapshot()['rejected'] == 0  # an optional hedge being skipped is not a rejection
+    with pytest.raises(SchedulerBusyError, match='queue is full'):
+        scheduler.acquire('questions')
+    assert scheduler.snapshot()['rejected'] == 1
+
+    scheduler.release(held)
+    thread.join(5)
+    assert order == ['waiter']
+    assert (scheduler.snapshot()['queued'], scheduler.snapshot()['in_flight']) == (0, 0)
+
+
+def test_slot_is_released_on_exceptions():
+    scheduler = RequestScheduler(rate_per_minute=60000, burst=100, max_in_flight=1)
+    with pytest.raises(ValueError):
+        with scheduler.slot('questions'):
+            raise ValueError("model blew up")
+    assert scheduler.snapshot()['in_flight'] == 0
+    with scheduler.slot('questions'):  # would block forever had the slot leaked
+        pass
+
+
+def test_every_attempt_takes_and_returns_its_own_slot():
+    scheduler = RequestScheduler(rate_per_minute=60000, burst=100, max_in_flight=1)
+    caller = ResilientCaller(policies={'op': CallPolicy(max_attempts=3, base_delay=0.001, max_delay=0.002)},
+                             breaker=CircuitBreaker(min_calls=100), scheduler=scheduler)
+    in_flight = []
+
+    def fail(timeout: float):
+        in_flight.append(scheduler.snapshot()['in_flight'])
+        raise TimeoutError("backend timed out")
+
+    with pytest.raises(TimeoutError):
+        caller.call('op', fail)
+    wait_until(lambda: scheduler.snapshot()['in_flight'] == 0)
+    assert in_flight == [1, 1, 1]  # one slot per attempt, none held across the backoff
+    assert scheduler.snapshot()['admitted'] == 3
+
+
+def test_token_bucket_limits_the_rate():
+    scheduler = RequestScheduler(rate_per_minute=600, burst=2, max_in_flight=8)
+    started = time.monotonic()
+    for _ in range(3):
+        scheduler.release(scheduler.acquire('questions'))
+    assert time.monotonic() - started >= 0.09  # the third call waits ~0.1s for a token
+
+    bucket = TokenBucket(rate=1.0, burst=1)
+    assert bucket.wait_time() == 0
+    bucket.take()
+    assert 0.9 < bucket.wait_time() <= 1.0
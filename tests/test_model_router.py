@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+import model_router
+from model_router import ModelRouter
+
+ROUTES = {
+    'questions': ['pro', 'flash'],
+    'individual_feedback': ['flash', 'flash-8b'],
+}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(model_router, 'time', SimpleNamespace(monotonic=clock.monotonic, time=lambda: clock.now))
+    return clock
+
+
+def make_router() -> ModelRouter:
+    return ModelRouter(routes=ROUTES, max_p95={'questions': 30.0, 'individual_feedback': 5.0},
+                       min_samples=4, cooldown_seconds=60.0)
+
+
+def test_failing_model_is_skipped_until_the_cooldown_ends(clock):
+    router = make_router()
+    assert router.choose('questions') == 'pro'
+    for _ in range(4):
+        router.record('questions', 'pro', 1.0, ok=False)
+
+    assert router.choose('questions') == 'flash'
+    assert router.snapshot()['decisions'][-1]['skipped'] == ['pro error rate 100% > 30%']
+    clock.advance(59)
+    assert router.choose('questions') == 'flash'
+
+    clock.advance(1)
+    assert router.choose('questions') == 'pro'  # cooled down: the bad window is forgotten and pro is probed
+    assert router.snapshot()['models']['questions']['pro']['recent_error_rate'] == 0.0
+
+
+def test_excluded_model_fails_over_within_one_call():
+    router = make_router()
+    assert router.choose('questions', exclude={'pro'}) == 'flash'
+    assert router.choose('questions', exclude={'pro', 'flash'}) == 'pro'  # nothing else left: back to the route
+
+
+def test_latency_is_judged_per_operation(clock):
+    router = make_router()
+    for _ in range(4):
+        router.record('questions', 'flash', 12.0, ok=True)  # fine for questions (30s), too slow for feedback (5s)
+    assert router.choose('individual_feedback') == 'flash'
+
+    for _ in range(4):
+        router.record('individual_feedback', 'flash', 12.0, ok=True)
+    assert router.choose('individual_feedback') == 'flash-8b'
+    assert router.choose('questions', exclude={'pro'}) == 'flash'  # still healthy for questions
+    assert set(router.snapshot()['models']) == {'questions', 'individual_feedback'}
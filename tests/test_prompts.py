@@ -0,0 +1,67 @@
+import pytest
+
+from prompts import MIN_SECTION_TOKENS, _water_level, estimate_tokens, fit_sections
+
+
+def text(tokens: int, word: str = 'lorem') -> str:
+    """Compact prose of roughly `tokens` estimated tokens."""
+    unit = word + ' '
+    return (unit * (tokens * 4 // len(unit) + 1)).strip()
+
+
+@pytest.fixture(autouse=True)
+def budget(monkeypatch):
+    monkeypatch.setenv('PROMPT_BUDGET_QUESTIONS', '3000')
+
+
+@pytest.mark.parametrize('sizes, available, level', [
+    ([100, 200, 300], 600, 300),   # everything fits: no section is capped
+    ([100, 200, 300], 599, 299),   # only the largest is cut
+    ([100, 1000, 4000], 2800, 1700),
+    ([50, 3000, 4000], 2800, 1375),  # the two large sections meet at one level
+    ([500, 500], 400, 200),
+    ([], 1000, 0),
+])
+def test_water_level(sizes, available, level):
+    assert _water_level(sizes, available) == level
+    assert sum(min(size, level) for size in sizes) <= available
+
+
+def test_sections_under_budget_are_unchanged():
+    sections = {'resume': text(1000), 'job_description': text(500, 'ipsum')}
+    fitted, truncated = fit_sections('questions', sections, fixed_tokens=200)
+    assert fitted == sections
+    assert truncated == []
+
+
+def test_whitespace_is_compacted_before_anything_is_cut():
+    sections = {'resume': 'Python   developer.\n\n\n\nBuilt    APIs.  '}
+    fitted, truncated = fit_sections('questions', sections, fixed_tokens=200)
+    assert fitted == {'resume': 'Python developer.\n\nBuilt APIs.'}
+    assert truncated == []
+
+
+def test_largest_section_is_cut_first():
+    sections = {'resume': text(4000), 'job_description': text(1000, 'ipsum'), 'title': text(50, 'dolor')}
+    fitted, truncated = fit_sections('questions', sections, fixed_tokens=200)
+    assert truncated == ['resume']
+    assert fitted['job_description'] == sections['job_description']
+    assert fitted['title'] == sections['title']
+    assert 'characters omitted' in fitted['resume']
+    assert 200 + sum(estimate_tokens(value) for value in fitted.values()) <= 3000
+
+
+def test_large_sections_are_cut_to_one_shared_level():
+    sections = {'resume': text(4000), 'job_description': text(3000, 'ipsum'), 'title': text(50, 'dolor')}
+    fitted, truncated = fit_sections('questions', sections, fixed_tokens=200)
+    assert sorted(truncated) == ['job_description', 'resume']
+    assert fitted['title'] == sections['title']
+    resume, job_description = estimate_tokens(fitted['resume']), estimate_tokens(fitted['job_description'])
+    assert abs(resume - job_description) <= 2
+    assert 200 + sum(estimate_tokens(value) for value in fitted.values()) <= 3000
+
+
+def test_truncated_sections_keep_a_minimum():
+    fitted, truncated = fit_sections('questions', {'resume': text(4000)}, fixed_tokens=2950)
+    assert truncated == ['resume']
+    assert MIN_SECTION_TOKENS - 5 <= estimate_tokens(fitted['resume']) <= MIN_SECTION_TOKENS
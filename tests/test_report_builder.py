@@ -0,0 +1,105 @@
+import io
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from report_builder import ReportBuilder, render_docx, render_pdf
+from session_model import FeedbackRecord, InterviewSession, QuestionResponse
+
+
+@pytest.fixture
+def executor():
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        yield pool
+
+
+def interview(questions: int = 3) -> InterviewSession:
+    session = InterviewSession()
+    session.job_details = {'job_title': 'Backend Engineer', 'company_name': 'Acme'}
+    for n in range(1, questions + 1):
+        session.add_response(QuestionResponse(f"Question {n}?", f"Answer {n}.", n, 30.0))
+        session.set_feedback(FeedbackRecord(n, True, f"**Score:** {n}/10 for answer {n}"))
+    return session
+
+
+def counting_builder(monkeypatch, **kwargs):
+    builder = ReportBuilder(**kwargs)
+    rendered = []
+    render_section = builder._render_section
+
+    def spy(response, feedback):
+        rendered.append(response.question_number)
+        return render_section(response, feedback)
+
+    monkeypatch.setattr(builder, '_render_section', spy)
+    return builder, rendered
+
+
+def test_changed_answer_rerenders_only_its_section(monkeypatch):
+    builder, rendered = counting_builder(monkeypatch)
+    session = interview()
+    first = builder.markdown(session)
+    assert rendered == [1, 2, 3]
+
+    session.question_responses[1] = QuestionResponse("Question 2?", "A better answer.", 2, 45.0)
+    session.touch()
+    second = builder.markdown(session)
+    assert rendered == [1, 2, 3, 2]
+    assert 'A better answer.' in second and 'Answer 2.' not in second
+    assert first.split('### Question 3')[1] == second.split('### Question 3')[1]
+
+
+def test_reanalysis_rerenders_only_its_section(monkeypatch):
+    builder, rendered = counting_builder(monkeypatch)
+    session = interview()
+    builder.markdown(session)
+    session.set_feedback(FeedbackRecord(3, True, "**Score:** 9/10 after retry"))
+    assert '9/10 after retry' in builder.markdown(session)
+    assert rendered == [1, 2, 3, 3]
+
+
+def test_unchanged_session_reuses_the_report(monkeypatch):
+    builder, rendered = counting_builder(monkeypatch)
+    session = interview()
+    assert builder.markdown(session) is builder.markdown(session)
+    assert rendered == [1, 2, 3]
+
+
+def test_exports_are_resubmitted_when_the_session_changes(executor):
+    builder = ReportBuilder(executor=executor)
+    session = interview()
+    exports = builder.exports(session)
+    assert builder.exports(session) == exports
+
+    session.set_overall_feedback("Strong structure overall.")
+    changed = builder.exports(session)
+    assert set(changed) == {'html', 'docx', 'pdf'}
+    assert all(changed[fmt] is not exports[fmt] for fmt in changed)
+    assert b'Strong structure overall.' in changed['html'].result(timeout=30)
+
+
+def test_pdf_xref_offsets_point_at_their_objects():
+    pdf = render_pdf(ReportBuilder().markdown(interview(questions=40)))  # long enough for several pages
+    startxref = int(re.search(rb'startxref\n(\d+)\n%%EOF\n$', pdf).group(1))
+    assert pdf[startxref:].startswith(b'xref\n0 ')
+    header, *entries = pdf[startxref:].split(b'trailer')[0].splitlines()[1:]
+    count = int(header.split()[1])
+    assert len(entries) == count
+    for number, entry in enumerate(entries[1:], start=1):
+        offset = int(entry.split()[0])
+        assert pdf[offset:].startswith(b'%d 0 obj\n' % number)
+
+    PyPDF2 = pytest.importorskip('PyPDF2')
+    reader = PyPDF2.PdfReader(io.BytesIO(pdf), strict=True)
+    assert len(reader.pages) > 1
+    assert 'Question 40' in reader.pages[-1].extract_text() + reader.pages[-2].extract_text()
+
+
+def test_docx_opens_with_python_docx():
+    docx = pytest.importorskip('docx')
+    document = docx.Document(io.BytesIO(render_docx(ReportBuilder().markdown(interview()))))
+    headings = [p.text for p in document.paragraphs if p.style.name.startswith('Heading')]
+    assert 'Question 2' in headings
+    [analysis] = [p for p in document.paragraphs if p.text == 'HEARS Analysis: Score: 2/10 for answer 2']
+    assert [run.text for run in analysis.runs if run.bold] == ['HEARS Analysis:', 'Score:']
@@ -0,0 +1,86 @@
+from types import SimpleNamespace
+
+import pytest
+
+import session_memory
+from blob_store import BlobStore
+from session_memory import EVICTED_FLAG, SessionRegistry
+
+
+class FakeState(dict):
+    """Stands in for Streamlit's SafeSessionState: a weak-referenceable mapping with filtered_state."""
+
+    @property
+    def filtered_state(self):
+        return dict(self)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_memory, 'time', SimpleNamespace(monotonic=clock.monotonic))
+    return clock
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(root=str(tmp_path), threshold=16, cache_bytes=64)  # tiny cache: loads go to disk
+
+
+def test_idle_session_is_evicted_and_active_one_keeps_its_blobs(clock, store):
+    registry = SessionRegistry(idle_ttl=600, sweep_interval=60, store=store)
+    resume, answer = 'Backend engineer. ' * 50, 'I led the migration. ' * 50
+    idle, active = FakeState(), FakeState()
+    idle['resume_text'] = store.offload('idle', resume)
+    active['resume_text'] = store.offload('active', resume)
+    active['answer'] = store.offload('active', answer)
+    registry.touch('idle', idle)
+    registry.touch('active', active)
+
+    for _ in range(10):  # the active session keeps rerunning; sweeps run along the way
+        clock.advance(61)
+        registry.touch('active', active)
+    assert list(idle) == [EVICTED_FLAG]
+    assert store.usage('idle')['blobs'] == 0
+    assert [row['session'] for row in registry.report()] == ['active']
+
+    # Offloaded text of the surviving session is restored from disk, not from the cache
+    assert store.usage()['cached_bytes'] <= 64
+    assert store.load(active['resume_text']) == resume
+    assert store.load(active['answer']) == answer
+    assert registry.metric_samples()[1][-1] == 1  # sessions_evicted_total
+
+
+def test_session_is_kept_until_the_ttl_passes(clock, store):
+    registry = SessionRegistry(idle_ttl=600, sweep_interval=60, store=store)
+    ref = store.offload('s1', 'Backend engineer. ' * 50)
+    state = FakeState(resume_text=ref)
+    registry.touch('s1', state)
+    clock.advance(600)
+    assert registry.sweep() == 0
+    assert store.load(ref) == 'Backend engineer. ' * 50
+    clock.advance(1)
+    assert registry.sweep() == 1
+    assert list(state) == [EVICTED_FLAG]
+    with pytest.raises(KeyError, match='session evicted'):
+        store.load(ref)
+
+
+def test_closed_session_is_dropped_on_the_next_sweep(clock, store):
+    registry = SessionRegistry(idle_ttl=600, sweep_interval=60, store=store)
+    state = FakeState(resume_text=store.offload('s1', 'Backend engineer. ' * 50))
+    registry.touch('s1', state)
+    del state  # Streamlit closed the session
+    assert registry.sweep() == 1
+    assert store.usage('s1')['blobs'] == 0
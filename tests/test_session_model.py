@@ -0,0 +1,78 @@
+import json
+
+import pytest
+
+from blob_store import BlobStore
+from session_model import SCHEMA_VERSION, FeedbackRecord, InterviewSession, QuestionResponse
+
+# The flat session_state layout saved before the schema was versioned
+V0_SESSION = {
+    'stage': 'feedback',
+    'resume_text': 'Backend engineer, 6 years of Python.',
+    'job_details': {'job_title': 'Backend Engineer', 'company_name': 'Acme'},
+    'interview_duration': 15,
+    'num_questions': 2,
+    'duration_selected': True,
+    'questions': ['Tell me about a conflict.', 'Describe a migration you led.'],
+    'current_question_idx': 2,
+    'question_responses': [
+        {'question': 'Tell me about a conflict.', 'answer': 'I listened first.', 'question_number': 1},
+        {'question': 'Describe a migration you led.', 'answer': '[Question Skipped]', 'question_number': 2},
+    ],
+    'individual_feedback': {
+        1: {'question_number': 1, 'success': True, 'feedback': '**Score:** 7/10'},
+        2: {'question_number': 2, 'success': False, 'feedback': 'Unable to generate feedback.', 'error': 'timeout'},
+    },
+    'overall_feedback': 'Solid answers overall.',
+    'interview_completed': True,
+}
+
+
+def test_v0_session_migrates_and_round_trips():
+    session = InterviewSession.from_dict(json.loads(json.dumps(V0_SESSION)))
+    assert session.stage == 'feedback'
+    assert session.question_responses == [
+        QuestionResponse('Tell me about a conflict.', 'I listened first.', 1, None),
+        QuestionResponse('Describe a migration you led.', '[Question Skipped]', 2, None),
+    ]
+    assert session.question_responses[1].skipped
+    assert session.individual_feedback == {
+        1: FeedbackRecord(1, True, '**Score:** 7/10'),
+        2: FeedbackRecord(2, False, 'Unable to generate feedback.', 'timeout'),
+    }
+    assert len(session.interview_id) == 32  # v2 gives every interview an id
+    assert session.timer is None and session.question_timer_start is None
+
+    saved = session.to_dict()
+    assert saved['version'] == SCHEMA_VERSION
+    assert InterviewSession.loads(session.dumps()).to_dict() == saved
+    for field in ('stage', 'resume_text', 'job_details', 'questions', 'overall_feedback', 'interview_completed'):
+        assert saved[field] == V0_SESSION[field]
+
+
+def test_v1_session_gains_timings_and_an_id():
+    v1 = InterviewSession.from_dict(V0_SESSION).to_dict()
+    v1.update(version=1, question_responses=[row[:3] for row in v1['question_responses']])
+    del v1['interview_id']
+    session = InterviewSession.from_dict(v1)
+    assert [r.seconds for r in session.question_responses] == [None, None]
+    assert session.interview_id
+
+
+def test_newer_schema_is_refused():
+    with pytest.raises(ValueError, match='newer schema'):
+        InterviewSession.from_dict(dict(InterviewSession().to_dict(), version=SCHEMA_VERSION + 1))
+
+
+def test_checkpoint_keeps_blob_references(tmp_path):
+    store = BlobStore(root=str(tmp_path / 'blobs'), threshold=16)
+    session = InterviewSession()
+    session.resume_text = store.offload('s1', 'Backend engineer. ' * 100)
+    session.add_response(QuestionResponse('Q1?', store.offload('s1', 'A long answer. ' * 100), 1, 12.5))
+    path = str(tmp_path / 'session.json')
+    session.checkpoint(path)
+
+    restored = InterviewSession.restore(path)
+    assert store.load(restored.resume_text) == 'Backend engineer. ' * 100
+    assert store.load(restored.question_responses[0].answer) == 'A long answer. ' * 100
+    assert restored.question_responses[0].seconds == 12.5
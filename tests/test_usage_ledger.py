@@ -0,0 +1,30 @@
+import pytest
+
+from usage_ledger import UsageLedger, UsageQuotaError
+
+
+def test_hedged_attempts_add_tokens_but_not_calls(tmp_path):
+    ledger = UsageLedger(str(tmp_path / 'usage.sqlite3'), operation_limits={'questions': 2})
+    ledger.check('ann', 's1', 'questions')
+    ledger.record('ann', 's1', 'questions', 'gemini-1.5-flash', 100, 50)
+    ledger.record('ann', 's1', 'questions', 'gemini-1.5-flash', 100, 40, calls=0)  # the hedge
+
+    ledger.check('ann', 's1', 'questions')  # one request so far, under the limit of two
+    ledger.record('ann', 's1', 'questions', 'gemini-1.5-flash', 100, 50)
+    with pytest.raises(UsageQuotaError):
+        ledger.check('ann', 's1', 'questions')
+
+    [row] = ledger.summary(by=[])
+    assert row['calls'] == 2
+    assert row['input_tokens'] == 300 and row['output_tokens'] == 140
+
+
+def test_counts_are_seeded_from_the_file(tmp_path):
+    path = str(tmp_path / 'usage.sqlite3')
+    UsageLedger(path).record('ann', 's1', 'questions', 'gemini-1.5-flash', 100, 50)
+    UsageLedger(path).record('ann', 's1', 'questions', 'gemini-1.5-flash', 100, 50, calls=0)
+    ledger = UsageLedger(path, operation_limits={'questions': 2})
+    ledger.check('ann', 's2', 'questions')
+    ledger.record('ann', 's2', 'questions', 'gemini-1.5-flash', 100, 50)
+    with pytest.raises(UsageQuotaError):
+        ledger.check('ann', 's3', 'questions')
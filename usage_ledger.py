@@ -0,0 +1,264 @@
+# Usage ledger - LLM token and cost accounting per day, user, session, operation and model
+# One upserted SQLite row per combination; per-user daily quotas are checked in memory before each call.
+
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# USD per million (input, output) tokens; USAGE_PRICES="model=in/out,..." overrides or adds models
+DEFAULT_PRICES = {
+    'gemini-1.5-pro': (1.25, 5.00),
+    'gemini-1.5-flash': (0.075, 0.30),
+    'gemini-1.5-flash-8b': (0.0375, 0.15),
+}
+CHARS_PER_TOKEN = 4  # estimate when a response carries no usage metadata
+GROUP_COLUMNS = ('day', 'user_id', 'session_id', 'operation', 'model')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    day TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    session_id TEXT NOT NULL,
+    operation TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    input_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cost REAL NOT NULL,
+    PRIMARY KEY (day, user_id, session_id, operation, model)
+);
+"""
+
+UPSERT = """
+INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, user_id, session_id, operation, model) DO UPDATE SET
+    calls = calls + excluded.calls, input_tokens = input_tokens + excluded.input_tokens,
+    output_tokens = output_tokens + excluded.output_tokens, cost = cost + excluded.cost
+"""
+
+
+class UsageQuotaError(RuntimeError):
+    """Raised before an LLM call when the user's daily quota is used up."""
+
+
+def parse_prices(spec: str) -> Dict[str, Tuple[float, float]]:
+    prices = dict(DEFAULT_PRICES)
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        model, _, rates = item.partition('=')
+        input_rate, _, output_rate = rates.partition('/')
+        prices[model.strip()] = (float(input_rate), float(output_rate or input_rate))
+    return prices
+
+
+def parse_limits(spec: str) -> Dict[str, int]:
+    """"overall_feedback=5,questions=20" -> {'overall_feedback': 5, 'questions': 20}."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in (spec or '').split(','))):
+        operation, _, limit = item.partition('=')
+        limits[operation.strip()] = int(limit)
+    return limits
+
+
+def response_tokens(response, prompt: str) -> Tuple[int, int]:
+    """(input, output) tokens from the response's usage metadata, estimated from text length without it."""
+    usage = getattr(response, 'usage_metadata', None)
+    if usage is not None and getattr(usage, 'total_token_count', 0):
+        return int(usage.prompt_token_count or 0), int(usage.candidates_token_count or 0)
+    return len(prompt) // CHARS_PER_TOKEN, len(response.text) // CHARS_PER_TOKEN
+
+
+def quota_subject(user_id: str, session_id: str) -> Tuple[str, str]:
+    """Quotas apply per user; anonymous traffic is limited per session instead.
+
+    The user id must come from authentication (the app's signed-in user, the
+    API's configured keys). Per-session quotas are a soft limit: anyone can
+    start a new session to get a fresh one.
+    """
+    return (user_id, '') if user_id else ('', session_id)
+
+
+class UsageLedger:
+    """Token, call and cost totals in one SQLite file, plus today's per-user counts in memory.
+
+    `record` upserts a single aggregate row per (day, user, session,
+    operation, model), so the file grows with distinct combinations rather
+    than with calls. Quota checks read the in-memory counts, seeded from the
+    file the first time a user is seen each day; several processes sharing
+    one file can each let a user run slightly over before noticing.
+    """
+
+    def __init__(self, path: str, daily_tokens: int = 0, operation_limits: Optional[Dict[str, int]] = None,
+                 prices: Optional[Dict[str, Tuple[float, float]]] = None):
+        self.path = path
+        self.daily_tokens = daily_tokens
+        self.operation_limits = operation_limits or {}
+        self.prices = prices or dict(DEFAULT_PRICES)
+        self._lock = threading.Lock()
+        self._day = None
+        self._today = {}  # (user_id, session_id) -> {'tokens': n, 'calls': {operation: n}}
+        self._totals = {}  # (operation, model) -> [calls, input tokens, output tokens, cost] since start
+        with closing(self._connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def cost(self, model: str, input_tokens: int, output_tokens: int) -> float:
+        input_rate, output_rate = self.prices.get(model, (0.0, 0.0))
+        return (input_tokens * input_rate + output_tokens * output_rate) / 1e6
+
+    def _counts(self, subject: Tuple[str, str], day: str) -> Dict:
+        """Today's counts for a quota subject (call with the lock held)."""
+        if self._day != day:
+            self._day, self._today = day, {}
+        counts = self._today.get(subject)
+        if counts is None:
+            with closing(self._connect()) as conn:
+                rows = conn.execute(
+                    'SELECT operation, SUM(calls) AS calls, SUM(input_tokens + output_tokens) AS tokens FROM usage '
+                    'WHERE day = ? AND user_id = ? AND (? = \'\' OR session_id = ?) GROUP BY operation',
+                    (day, subject[0], subject[1], subject[1])).fetchall()
+            counts = {'tokens': sum(row['tokens'] for row in rows),
+                      'calls': {row['operation']: row['calls'] for row in rows}}
+            self._today[subject] = counts
+        return counts
+
+    def check(self, user_id: str, session_id: str, operation: str):
+        """Raise UsageQuotaError if this call would go past the user's daily token or operation quota."""
+        if not self.daily_tokens and operation not in self.operation_limits:
+            return
+        with self._lock:
+            counts = self._counts(quota_subject(user_id, session_id), date.today().isoformat())
+            limit = self.operation_limits.get(operation)
+            if limit is not None and counts['calls'].get(operation, 0) >= limit:
+                raise UsageQuotaError(
+                    f"Daily limit of {limit} {operation.replace('_', ' ')} requests reached. Please try again tomorrow.")
+            if self.daily_tokens and counts['tokens'] >= self.daily_tokens:
+                raise UsageQuotaError("Daily AI usage limit reached. Please try again tomorrow.")
+
+    def record(self, user_id: str, session_id: str, operation: str, model: str,
+               input_tokens: int, output_tokens: int, calls: int = 1) -> float:
+        """Add one billed attempt's tokens; returns its cost.
+
+        `calls` is how many requests it counts toward operation limits: 0 for
+        retries and hedges of a request that was already counted.
+        """
+        day = date.today().isoformat()
+        cost = self.cost(model, input_tokens, output_tokens)
+        with closing(self._connect()) as conn:
+            conn.execute(UPSERT, (day, user_id or '', session_id or '', operation, model, calls,
+                                  input_tokens, output_tokens, cost))
+        with self._lock:
+            totals = self._totals.setdefault((operation, model), [0, 0, 0, 0.0])
+            totals[0] += calls
+            totals[1] += input_tokens
+            totals[2] += output_tokens
+            totals[3] += cost
+            # Subjects not loaded yet are seeded from the file, which already has this call
+            counts = self._today.get(quota_subject(user_id or '', session_id or '')) if self._day == day else None
+            if counts is not None:
+                counts['tokens'] += input_tokens + output_tokens
+                counts['calls'][operation] = counts['calls'].get(operation, 0) + calls
+        return cost
+
+    def summary(self, by: Sequence[str] = ('day', 'operation'), since: Optional[str] = None,
+                until: Optional[str] = None, user_id: Optional[str] = None) -> List[Dict]:
+        """Calls, tokens and cost grouped by any of day/user_id/session_id/operation/model."""
+        by = list(by)
+        unknown = set(by) - set(GROUP_COLUMNS)
+        if unknown:
+            raise ValueError(f"cannot group usage by {', '.join(sorted(unknown))}")
+        where, params = [], []
+        for clause, value in (('day >= ?', since), ('day <= ?', until), ('user_id = ?', user_id)):
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        columns = ', '.join(by)
+        query = (f"SELECT {columns + ', ' if by else ''}SUM(calls) AS calls, SUM(input_tokens) AS input_tokens, "
+                 f"SUM(output_tokens) AS output_tokens, ROUND(SUM(cost), 6) AS cost, "
+                 f"COUNT(DISTINCT CASE WHEN user_id = '' THEN 's:' || session_id ELSE 'u:' || user_id END) AS users "
+                 f"FROM usage{' WHERE ' + ' AND '.join(where) if where else ''}"
+                 f"{' GROUP BY ' + columns + ' ORDER BY ' + columns if by else ''}")
+        with closing(self._connect()) as conn:
+            return [dict(row) for row in conn.execute(query, params).fetchall()]
+
+    def metric_samples(self):
+        with self._lock:
+            totals = dict(self._totals)
+        samples = []
+        for (operation, model), (calls, input_tokens, output_tokens, cost) in sorted(totals.items()):
+            labels = {'operation': operation, 'model': model}
+            samples += [
+                ('llm_input_tokens_total', 'counter', 'Prompt tokens sent', labels, input_tokens),
+                ('llm_output_tokens_total', 'counter', 'Response tokens received', labels, output_tokens),
+                ('llm_cost_dollars_total', 'counter', 'Estimated LLM spend in USD', labels, round(cost, 6)),
+            ]
+        return samples
+
+
+_default_ledger = None
+_default_ledger_lock = threading.Lock()
+
+
+def get_default_usage_ledger() -> Optional[UsageLedger]:
+    """Process-wide ledger at USAGE_LEDGER_DB; USAGE_LEDGER=0 turns accounting off (None).
+
+    USAGE_DAILY_TOKENS caps tokens per user per day and USAGE_DAILY_LIMITS
+    ("overall_feedback=5,...") caps calls per operation; 0 / unset means no cap.
+    """
+    global _default_ledger
+    if os.getenv('USAGE_LEDGER', '1') == '0':
+        return None
+    with _default_ledger_lock:
+        if _default_ledger is None:
+            _default_ledger = UsageLedger(
+                os.getenv('USAGE_LEDGER_DB', 'llm_usage.sqlite3'),
+                daily_tokens=int(os.getenv('USAGE_DAILY_TOKENS', 0)),
+                operation_limits=parse_limits(os.getenv('USAGE_DAILY_LIMITS', '')),
+                prices=parse_prices(os.getenv('USAGE_PRICES', '')),
+            )
+        return _default_ledger
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export LLM usage totals for capacity planning.")
+    parser.add_argument('--db', default=os.getenv('USAGE_LEDGER_DB', 'llm_usage.sqlite3'))
+    parser.add_argument('--by', default='day,operation', help=f"comma-separated, any of {', '.join(GROUP_COLUMNS)}")
+    parser.add_argument('--days', type=int, default=30, help="how many days back (0 = all)")
+    parser.add_argument('--user', help="only this user")
+    parser.add_argument('--csv', help="write CSV here instead of printing a table")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"no usage recorded yet ({args.db} does not exist)", file=sys.stderr)
+        return 1
+    since = (datetime.now() - timedelta(days=args.days - 1)).date().isoformat() if args.days else None
+    rows = UsageLedger(args.db).summary([column for column in args.by.split(',') if column], since=since,
+                                        user_id=args.user)
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else ['calls'])
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"{len(rows)} rows written to {args.csv}")
+        return 0
+    if rows:
+        widths = {key: max(len(key), *(len(str(row[key])) for row in rows)) for key in rows[0]}
+        print('  '.join(key.rjust(width) for key, width in widths.items()))
+        for row in rows:
+            print('  '.join(str(row[key]).rjust(width) for key, width in widths.items()))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())